@@ -0,0 +1,491 @@
+# -*- coding: utf-8 -*-
+"""
+=============================================================================
+BENCHMARK DE RUTAS CRÍTICAS
+=============================================================================
+Mide sin interacción las operaciones del operador (ventas, cierres de día,
+compras, alertas), todos los reportes, todos los gráficos y el arranque de
+main.py sobre una copia de una BD generada con generar_datos.py.
+
+Por operación informa latencia p50/p95, sentencias SQL por operación y el
+pico de memoria (RSS) del proceso. El resultado se guarda en JSON para
+comparar dos corridas:
+
+    python generar_datos.py --ciclos 500 --dias 30 --ventas 50
+    python benchmark.py --salida bench_antes.json
+    python benchmark.py --salida bench_despues.json --comparar bench_antes.json
+"""
+
+import argparse
+import builtins
+import contextlib
+import inspect
+import io
+import json
+import os
+import platform
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:
+    resource = None     # Windows: sin medición de RSS
+
+
+# ===================================================================
+# CONFIGURACIÓN
+# ===================================================================
+
+DB_BASE = 'data/arbitraje_carga.db'
+DIRECTORIO_PROYECTO = Path(__file__).resolve().parent
+
+REPETICIONES = 20               # Mediciones por operación
+REPETICIONES_PESADAS = 3        # Reportes y gráficos (recorren ciclos completos)
+CALENTAMIENTO = 1               # Ejecuciones previas sin medir
+VENTAS_POR_DIA = 10             # Ventas del día preparado para los cierres
+
+# Cambio relativo a partir del cual la comparación marca una regresión
+UMBRAL_REGRESION = 0.10
+
+# Arranca main.py en un proceso nuevo y termina en el primer input(): mide
+# el tiempo hasta que la CLI es interactiva (intérprete, imports,
+# migraciones y alertas de inicio)
+SCRIPT_ARRANQUE = (
+    "import builtins, os\n"
+    "builtins.input = lambda *args: os._exit(0)\n"
+    "import main\n"
+    "main.main()\n"
+)
+
+
+# ===================================================================
+# MEDICIÓN
+# ===================================================================
+
+def percentil(valores: List[float], p: float) -> float:
+    """
+    Percentil con interpolación lineal entre rangos
+    
+    Args:
+        valores: Muestras
+        p: Percentil entre 0 y 100
+    
+    Returns:
+        float: Valor del percentil
+    """
+    ordenados = sorted(valores)
+    posicion = (len(ordenados) - 1) * p / 100
+    inferior = int(posicion)
+    superior = min(inferior + 1, len(ordenados) - 1)
+    return ordenados[inferior] + (ordenados[superior] - ordenados[inferior]) * (posicion - inferior)
+
+
+def rss_pico_kb() -> Optional[int]:
+    """Pico de memoria residente del proceso en KB (None si no se puede medir)"""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS informa bytes; Linux, KB
+    return pico // 1024 if sys.platform == 'darwin' else pico
+
+
+def _exigir_resultado(funcion: Callable) -> Callable:
+    """Envuelve un método de reporte/gráfico: None significa que no generó nada"""
+    def envoltura(*args):
+        resultado = funcion(*args)
+        if resultado is None or resultado == []:
+            raise RuntimeError("no se generó ningún archivo")
+        return resultado
+    return envoltura
+
+
+class ContadorSentencias:
+    """Cuenta las sentencias que el código envía a SQLite (ver db.trazar_sentencias)"""
+    
+    def __init__(self):
+        self.total = 0
+    
+    def __call__(self, sql: str):
+        self.total += 1
+
+
+# ===================================================================
+# SUITE
+# ===================================================================
+
+class SuiteBenchmark:
+    """Prepara los datos de cada caso y mide las operaciones"""
+    
+    def __init__(self, repeticiones: int = REPETICIONES,
+                 repeticiones_pesadas: int = REPETICIONES_PESADAS,
+                 calentamiento: int = CALENTAMIENTO):
+        # Importación diferida: ARBITRAJE_DB debe apuntar a la copia antes
+        # de que core.db_manager abra la BD
+        from core.db_manager import db
+        from core.queries import queries
+        
+        self.db = db
+        self.queries = queries
+        self.repeticiones = repeticiones
+        self.repeticiones_pesadas = repeticiones_pesadas
+        self.calentamiento = calentamiento
+        self.contador = ContadorSentencias()
+        db.trazar_sentencias(self.contador)
+        
+        ciclo = queries.obtener_ciclo_activo()
+        if not ciclo:
+            raise ValueError("La BD no tiene un ciclo activo (genérala con generar_datos.py)")
+        self.ciclo_id = ciclo['id']
+        
+        cerrado = db.execute_query(
+            "SELECT id FROM ciclos WHERE estado = 'cerrado' ORDER BY id DESC LIMIT 1",
+            fetch_one=True
+        )
+        self.ciclo_cerrado_id = cerrado['id'] if cerrado else self.ciclo_id
+        
+        criptos = queries.obtener_criptos_boveda(self.ciclo_id)
+        if not criptos:
+            raise ValueError("La bóveda del ciclo activo está vacía")
+        self.cripto = criptos[0]
+    
+    # ===================================================================
+    # PREPARACIÓN
+    # ===================================================================
+    
+    def _parametros_venta(self) -> tuple:
+        """Venta chica de la cripto principal con prima sobre el costo"""
+        cantidad = self.queries.obtener_cantidad_cripto(self.ciclo_id, self.cripto['id'])
+        return (self.cripto['id'], cantidad * 0.0005, self.cripto['precio_promedio'] * 1.01)
+    
+    def _dia_abierto(self) -> int:
+        """ID del día abierto del ciclo activo, abriendo uno si no hay"""
+        dia = self.queries.obtener_dia_abierto(self.ciclo_id)
+        if dia:
+            return dia['id']
+        
+        return self.db.execute_update("""
+            INSERT INTO dias (ciclo_id, numero_dia, capital_inicial, estado, fecha)
+            SELECT ?, COALESCE(MAX(numero_dia), 0) + 1, ?, 'abierto', datetime('now')
+            FROM dias WHERE ciclo_id = ?
+        """, (self.ciclo_id, self.queries.obtener_capital_boveda(self.ciclo_id), self.ciclo_id))
+    
+    def _dia_con_ventas(self) -> int:
+        """Abre un día nuevo con VENTAS_POR_DIA ventas, listo para cerrarse"""
+        from modules import dias
+        
+        dia_id = self._dia_abierto()
+        for _ in range(VENTAS_POR_DIA):
+            dias.registrar_venta(dia_id, *self._parametros_venta())
+        return dia_id
+    
+    # ===================================================================
+    # CASOS
+    # ===================================================================
+    
+    def casos(self) -> List[tuple]:
+        """
+        Operaciones a medir
+        
+        Returns:
+            list: (nombre, preparar() -> args, operacion(*args), repeticiones)
+        """
+        from modules import dias, operador, boveda
+        from features.alertas import SistemaAlertas
+        from features.reportes import GeneradorReportes
+        
+        config = self.queries.obtener_config()
+        
+        casos = [
+            ("dias.registrar_venta",
+             lambda: (self._dia_abierto(), *self._parametros_venta()),
+             dias.registrar_venta, self.repeticiones),
+            ("operador.registrar_venta_manual",
+             lambda: (self._dia_abierto(), *self._parametros_venta(), config['comision_default']),
+             operador.registrar_venta_manual, self.repeticiones),
+            ("dias.cerrar_dia",
+             lambda: (self._dia_con_ventas(), self.ciclo_id),
+             dias.cerrar_dia, self.repeticiones),
+            ("operador.cerrar_dia_operacion",
+             lambda: (self._dia_con_ventas(),),
+             operador.cerrar_dia_operacion, self.repeticiones),
+            ("boveda.registrar_compra",
+             lambda: (self.ciclo_id, self.cripto['id'], 10.0, 10.0 * self.cripto['precio_promedio'],
+                      self.cripto['precio_promedio']),
+             boveda.registrar_compra, self.repeticiones),
+            ("SistemaAlertas.verificar_todas",
+             lambda: (self.ciclo_id,),
+             SistemaAlertas.verificar_todas, self.repeticiones),
+            ("main.arranque (hasta el primer menú)",
+             lambda: (),
+             self._arrancar_main, self.repeticiones),
+        ]
+        
+        casos.extend(self._casos_generador("GeneradorReportes", GeneradorReportes))
+        
+        # matplotlib se importa al crear el generador, no con el módulo.
+        # Sin caché cada repetición dibuja; el caso "(caché)" mide un acierto.
+        try:
+            from features.graficos import GeneradorGraficos
+            casos.extend(self._casos_generador("GeneradorGraficos", GeneradorGraficos,
+                                               usar_cache=False))
+            casos.append(("GeneradorGraficos.generar_dashboard_ciclo (caché)",
+                          lambda: (self.ciclo_cerrado_id,),
+                          _exigir_resultado(GeneradorGraficos().generar_dashboard_ciclo),
+                          self.repeticiones_pesadas))
+        except ImportError as e:
+            casos.append(("GeneradorGraficos.*", None, f"omitido: {e}", 0))
+        
+        return casos
+    
+    @staticmethod
+    def _arrancar_main():
+        """Ejecuta main.py en un proceso nuevo hasta su primer input()"""
+        pythonpath = os.pathsep.join(filter(None, [str(DIRECTORIO_PROYECTO),
+                                                   os.environ.get('PYTHONPATH')]))
+        subprocess.run(
+            [sys.executable, '-c', SCRIPT_ARRANQUE],
+            env=dict(os.environ, PYTHONPATH=pythonpath),
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True
+        )
+    
+    def _casos_generador(self, nombre: str, clase, **opciones) -> List[tuple]:
+        """Un caso por método público del generador, con el ciclo cerrado si lo pide"""
+        instancia = clase(**opciones)
+        casos = []
+        
+        for metodo, funcion in inspect.getmembers(clase, inspect.isfunction):
+            if metodo.startswith('_'):
+                continue
+            
+            parametros = list(inspect.signature(funcion).parameters)[1:]
+            args = (self.ciclo_cerrado_id,) if parametros[:1] in (['ciclo'], ['ciclo_id']) else ()
+            
+            casos.append((f"{nombre}.{metodo}", lambda args=args: args,
+                          _exigir_resultado(getattr(instancia, metodo)),
+                          self.repeticiones_pesadas))
+        
+        return casos
+    
+    # ===================================================================
+    # EJECUCIÓN
+    # ===================================================================
+    
+    def medir(self, preparar: Callable, operacion: Callable, repeticiones: int) -> Dict:
+        """
+        Mide una operación; la preparación no entra en el tiempo ni en las sentencias
+        
+        Returns:
+            dict: n, p50_ms, p95_ms, media_ms, sentencias_por_op, rss_pico_kb
+        """
+        tiempos = []
+        sentencias = 0
+        
+        for i in range(self.calentamiento + repeticiones):
+            args = preparar()
+            
+            self.contador.total = 0
+            inicio = time.perf_counter()
+            resultado = operacion(*args)
+            duracion = time.perf_counter() - inicio
+            
+            if resultado is False:
+                raise RuntimeError("la operación no se completó (devolvió False)")
+            
+            if i >= self.calentamiento:
+                tiempos.append(duracion * 1000)
+                sentencias += self.contador.total
+        
+        return {
+            'n': len(tiempos),
+            'p50_ms': round(percentil(tiempos, 50), 3),
+            'p95_ms': round(percentil(tiempos, 95), 3),
+            'media_ms': round(sum(tiempos) / len(tiempos), 3),
+            'sentencias_por_op': round(sentencias / len(tiempos), 1),
+            'rss_pico_kb': rss_pico_kb(),
+        }
+    
+    def ejecutar(self, filtro: Optional[str] = None) -> Dict[str, Dict]:
+        """
+        Ejecuta todos los casos (o los que contengan filtro en el nombre)
+        
+        La salida por consola y los input() de las operaciones se silencian.
+        
+        Returns:
+            dict: {nombre: resultado de medir, o {'error': mensaje}}
+        """
+        resultados = {}
+        input_original = builtins.input
+        builtins.input = lambda *args: 's'
+        
+        try:
+            for nombre, preparar, operacion, repeticiones in self.casos():
+                if filtro and filtro not in nombre:
+                    continue
+                
+                if preparar is None:
+                    resultados[nombre] = {'error': operacion}
+                    print(f"   ⚠️  {nombre}: {operacion}")
+                    continue
+                
+                try:
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        resultados[nombre] = self.medir(preparar, operacion, repeticiones)
+                except Exception as e:
+                    resultados[nombre] = {'error': str(e)}
+                    print(f"   ❌ {nombre}: {e}")
+                    continue
+                
+                r = resultados[nombre]
+                print(f"   • {nombre:<52} p50 {r['p50_ms']:>9.2f} ms   "
+                      f"p95 {r['p95_ms']:>9.2f} ms   {r['sentencias_por_op']:>7.1f} sent/op")
+        finally:
+            builtins.input = input_original
+            self.db.trazar_sentencias(None)
+        
+        return resultados
+
+
+# ===================================================================
+# COMPARACIÓN
+# ===================================================================
+
+def comparar(anterior: Dict, actual: Dict, umbral: float = UMBRAL_REGRESION) -> List[str]:
+    """
+    Compara dos corridas e imprime la variación por operación
+    
+    Args:
+        anterior: JSON de una corrida previa
+        actual: JSON de esta corrida
+        umbral: Variación relativa que se considera regresión
+    
+    Returns:
+        list: Nombres de las operaciones con regresión
+    """
+    regresiones = []
+    
+    print(f"\n{'Operación':<52} {'p50':>10} {'p95':>10} {'sent/op':>10}")
+    print("-" * 85)
+    
+    for nombre, r in actual['resultados'].items():
+        previo = anterior.get('resultados', {}).get(nombre)
+        if 'error' in r or not previo or 'error' in previo:
+            continue
+        
+        variaciones = []
+        for campo in ('p50_ms', 'p95_ms', 'sentencias_por_op'):
+            base = previo[campo]
+            variaciones.append((r[campo] - base) / base if base else 0.0)
+        
+        peor = max(variaciones)
+        marca = " ⚠️" if peor > umbral else ""
+        if marca:
+            regresiones.append(nombre)
+        
+        print(f"{nombre:<52} " + " ".join(f"{v:>+9.1%}" for v in variaciones) + marca)
+    
+    return regresiones
+
+
+# ===================================================================
+# FUNCIÓN PRINCIPAL
+# ===================================================================
+
+def main():
+    """Punto de entrada por línea de comandos"""
+    parser = argparse.ArgumentParser(description="Benchmark de las rutas críticas del operador")
+    parser.add_argument('--base', default=DB_BASE, help=f"BD generada a usar (por defecto {DB_BASE})")
+    parser.add_argument('--repeticiones', type=int, default=REPETICIONES, help="Mediciones por operación")
+    parser.add_argument('--repeticiones-pesadas', type=int, default=REPETICIONES_PESADAS,
+                        help="Mediciones por reporte o gráfico")
+    parser.add_argument('--filtro', help="Solo las operaciones cuyo nombre contenga este texto")
+    parser.add_argument('--salida', help="Archivo JSON donde guardar los resultados")
+    parser.add_argument('--comparar', help="JSON de una corrida anterior para comparar")
+    args = parser.parse_args()
+    
+    base = Path(args.base).resolve()
+    if not base.exists():
+        print(f"❌ No existe {base}")
+        print("   Genera una con: python generar_datos.py")
+        return 1
+    
+    anterior = None
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            anterior = json.load(f)
+    salida = Path(args.salida).resolve() if args.salida else None
+    
+    print("\n" + "="*70)
+    print("BENCHMARK DE RUTAS CRÍTICAS")
+    print("="*70)
+    print(f"\n📁 Base: {base}\n")
+    
+    # Las operaciones escriben: se trabaja sobre una copia en un directorio
+    # temporal, donde también quedan logs, reportes y gráficos
+    directorio = Path(tempfile.mkdtemp(prefix='arbitraje_bench_'))
+    copia = directorio / 'data' / 'arbitraje.db'
+    copia.parent.mkdir()
+    shutil.copy2(base, copia)
+    
+    os.environ['ARBITRAJE_DB'] = str(copia)
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+    directorio_original = os.getcwd()
+    os.chdir(directorio)
+    
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            suite = SuiteBenchmark(args.repeticiones, args.repeticiones_pesadas)
+        
+        filas = {tabla: suite.db.execute_query(f"SELECT COUNT(*) as total FROM {tabla}",
+                                               fetch_one=True)['total']
+                 for tabla in ('ciclos', 'dias', 'ventas', 'compras', 'alertas')}
+        
+        resultados = suite.ejecutar(args.filtro)
+        
+        # Cerrar BD y logger antes de borrar el directorio temporal
+        from core.logger import log
+        suite.db.cerrar()
+        log.cerrar()
+    finally:
+        os.chdir(directorio_original)
+        shutil.rmtree(directorio, ignore_errors=True)
+    
+    informe = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'plataforma': platform.platform(),
+        'base': str(base),
+        'filas': filas,
+        'rss_pico_kb': rss_pico_kb(),
+        'resultados': resultados,
+    }
+    
+    if salida:
+        with open(salida, 'w', encoding='utf-8') as f:
+            json.dump(informe, f, ensure_ascii=False, indent=2)
+        print(f"\n💾 Resultados guardados en {salida}")
+    
+    if anterior:
+        regresiones = comparar(anterior, informe)
+        if regresiones:
+            print(f"\n⚠️  {len(regresiones)} operación(es) empeoraron más de {UMBRAL_REGRESION:.0%}")
+        else:
+            print("\n✅ Sin regresiones")
+    
+    return 0
+
+
+# ===================================================================
+# EJECUCIÓN DIRECTA
+# ===================================================================
+
+if __name__ == "__main__":
+    raise SystemExit(main())
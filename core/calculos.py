@@ -7,8 +7,84 @@ Todas las fórmulas y cálculos del sistema
 Completamente independiente de la BD
 """
 
-from typing import Dict, List, Tuple, Optional
+from itertools import repeat
+from typing import Dict, List, Tuple, Optional, Sequence, Union
 
+try:
+    import numpy as np
+except ImportError:
+    np = None       # Sin NumPy los cálculos por lote usan Python puro
+
+
+# ===================================================================
+# CONFIGURACIÓN
+# ===================================================================
+
+# Por debajo de este número de filas el lote se calcula en Python puro:
+# el costo de convertir a arrays supera lo que ahorra NumPy
+NUMPY_MIN_FILAS = 64
+
+CAMPOS_VENTA = ('costo_total', 'monto_venta', 'comision',
+                'efectivo_recibido', 'ganancia_bruta', 'ganancia_neta')
+
+# Dinero en punto fijo: los montos se guardan también como enteros de
+# micro-unidades (1 USD = 1_000_000) para que las sumas sean exactas
+MICRO_POR_UNIDAD = 1_000_000
+
+# A partir de 2**52 todo double ya es entero: ROUND() de SQLite lo deja igual
+_LIMITE_ENTERO_DOUBLE = 4503599627370496.0
+
+
+# ===================================================================
+# UTILIDADES DE LOTE
+# ===================================================================
+
+def _usar_numpy(n: int) -> bool:
+    """Indica si conviene calcular un lote de n filas con NumPy"""
+    return np is not None and n >= NUMPY_MIN_FILAS
+
+
+def _redondear_micro(valor: float) -> int:
+    """
+    Redondea a entero como ROUND() de SQLite: las mitades se alejan del cero
+    
+    Los triggers y migraciones convierten a micro-unidades con
+    CAST(ROUND(x * 1000000) AS INTEGER); usar la misma regla aquí (y no
+    el redondeo al par de round()) hace que una venta nueva y una fila
+    rellenada por SQL den siempre el mismo entero.
+    """
+    if valor > _LIMITE_ENTERO_DOUBLE or valor < -_LIMITE_ENTERO_DOUBLE:
+        return int(valor)
+    return int(valor + 0.5) if valor >= 0 else int(valor - 0.5)
+
+
+def _como_lista(valor: Union[float, Sequence[float]], n: int) -> list:
+    """Expande un escalar a n filas o valida el largo de una secuencia"""
+    if isinstance(valor, (int, float)):
+        return [valor] * n
+    
+    valores = list(valor)
+    if len(valores) != n:
+        raise ValueError(f"Se esperaban {n} valores, se recibieron {len(valores)}")
+    return valores
+
+
+def _redondear(valores, decimales: int) -> list:
+    """
+    Redondea con round() de Python elemento a elemento
+    
+    np.round escala y redondea, lo que difiere de round() en algunos casos
+    límite (p. ej. 0.285); así el lote da exactamente lo mismo que la
+    versión escalar.
+    """
+    if np is not None and isinstance(valores, np.ndarray):
+        valores = valores.tolist()
+    return list(map(round, valores, repeat(decimales)))
+
+
+# ===================================================================
+# CLASE CALCULADORA
+# ===================================================================
 
 class Calculadora:
     """Clase para todos los cálculos del sistema"""
@@ -75,6 +151,85 @@ class Calculadora:
         
         return round(ganancia_neta_pct, 2)
     
+    @staticmethod
+    def calcular_precios_sugeridos(costos_promedio: Sequence[float],
+                                   ganancia_objetivo_pct: Union[float, Sequence[float]],
+                                   comision_pct: Union[float, Sequence[float]] = 0.35) -> List[float]:
+        """
+        Versión por lote de calcular_precio_sugerido
+        
+        Args:
+            costos_promedio: Costos promedio de compra
+            ganancia_objetivo_pct: Ganancia objetivo en % (escalar o una por fila)
+            comision_pct: Comisión en % (escalar o una por fila)
+        
+        Returns:
+            list: Precio sugerido por fila (0 donde no es posible)
+        """
+        costos = list(costos_promedio)
+        n = len(costos)
+        ganancias = _como_lista(ganancia_objetivo_pct, n)
+        comisiones = _como_lista(comision_pct, n)
+        
+        if not _usar_numpy(n):
+            return [
+                Calculadora.calcular_precio_sugerido(c, g, k)
+                for c, g, k in zip(costos, ganancias, comisiones)
+            ]
+        
+        costo = np.asarray(costos, dtype=float)
+        factor = (np.asarray(comisiones, dtype=float) + np.asarray(ganancias, dtype=float)) / 100
+        validos = (costo > 0) & (factor < 1)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            precios = costo / (1 - factor)
+        
+        return [
+            precio if valido else 0
+            for precio, valido in zip(_redondear(precios, 4), validos.tolist())
+        ]
+    
+    @staticmethod
+    def calcular_ganancias_netas_estimadas(costos_promedio: Sequence[float],
+                                           precios_venta: Sequence[float],
+                                           comision_pct: Union[float, Sequence[float]] = 0.35) -> List[float]:
+        """
+        Versión por lote de calcular_ganancia_neta_estimada
+        
+        Args:
+            costos_promedio: Costos promedio de compra
+            precios_venta: Precios de venta (uno por costo)
+            comision_pct: Comisión en % (escalar o una por fila)
+        
+        Returns:
+            list: Ganancia neta estimada en % por fila
+        """
+        costos = list(costos_promedio)
+        n = len(costos)
+        precios = _como_lista(precios_venta, n)
+        comisiones = _como_lista(comision_pct, n)
+        
+        if not _usar_numpy(n):
+            return [
+                Calculadora.calcular_ganancia_neta_estimada(c, p, k)
+                for c, p, k in zip(costos, precios, comisiones)
+            ]
+        
+        costo = np.asarray(costos, dtype=float)
+        precio = np.asarray(precios, dtype=float)
+        validos = (costo > 0) & (precio > 0)
+        
+        efectivo_recibido = precio * (1 - np.asarray(comisiones, dtype=float) / 100)
+        ganancia_neta = efectivo_recibido - costo
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            ganancia_neta_pct = (ganancia_neta / costo) * 100
+        
+        return [
+            ganancia if valido else 0
+            for ganancia, valido in zip(_redondear(ganancia_neta_pct, 2), validos.tolist())
+        ]
+    
     # ===================================================================
     # CÁLCULOS DE VENTAS
     # ===================================================================
@@ -127,6 +282,235 @@ class Calculadora:
             'ganancia_neta': round(ganancia_neta, 2)
         }
     
+    @staticmethod
+    def calcular_ventas_columnas(cantidades: Sequence[float],
+                                 costos_unitarios: Sequence[float],
+                                 precios_venta: Sequence[float],
+                                 comision_pct: Union[float, Sequence[float]] = 0.35) -> Dict[str, list]:
+        """
+        Calcula un lote de ventas por columnas (arrays de entrada y salida)
+        
+        Usa NumPy si está instalado y el lote es grande; el resultado es el
+        mismo, con el mismo redondeo, que llamar a calcular_venta fila a fila.
+        
+        Args:
+            cantidades: Cantidad vendida por fila
+            costos_unitarios: Costo promedio por unidad por fila
+            precios_venta: Precio de venta por unidad por fila
+            comision_pct: Comisión en % (escalar o una por fila)
+        
+        Returns:
+            dict: Una lista por campo de CAMPOS_VENTA más 'valida'; las filas
+                  inválidas tienen None en todos los campos
+        """
+        cantidades = list(cantidades)
+        n = len(cantidades)
+        costos = _como_lista(costos_unitarios, n)
+        precios = _como_lista(precios_venta, n)
+        comisiones = _como_lista(comision_pct, n)
+        
+        if _usar_numpy(n):
+            cantidad = np.asarray(cantidades, dtype=float)
+            costo_unitario = np.asarray(costos, dtype=float)
+            precio_venta = np.asarray(precios, dtype=float)
+            validas = ((cantidad > 0) & (costo_unitario > 0) & (precio_venta > 0)).tolist()
+            
+            # Mismo orden de operaciones que calcular_venta
+            costo_total = cantidad * costo_unitario
+            monto_venta = cantidad * precio_venta
+            comision = monto_venta * (np.asarray(comisiones, dtype=float) / 100)
+            efectivo_recibido = monto_venta - comision
+            ganancia_bruta = monto_venta - costo_total
+            ganancia_neta = efectivo_recibido - costo_total
+        else:
+            validas = [c > 0 and cu > 0 and p > 0
+                       for c, cu, p in zip(cantidades, costos, precios)]
+            
+            costo_total = [c * cu for c, cu in zip(cantidades, costos)]
+            monto_venta = [c * p for c, p in zip(cantidades, precios)]
+            comision = [m * (k / 100) for m, k in zip(monto_venta, comisiones)]
+            efectivo_recibido = [m - k for m, k in zip(monto_venta, comision)]
+            ganancia_bruta = [m - c for m, c in zip(monto_venta, costo_total)]
+            ganancia_neta = [e - c for e, c in zip(efectivo_recibido, costo_total)]
+        
+        columnas = {'valida': validas}
+        for campo, valores in zip(CAMPOS_VENTA, (costo_total, monto_venta, comision,
+                                                 efectivo_recibido, ganancia_bruta,
+                                                 ganancia_neta)):
+            columnas[campo] = [
+                valor if valida else None
+                for valor, valida in zip(_redondear(valores, 2), validas)
+            ]
+        
+        return columnas
+    
+    @staticmethod
+    def calcular_ventas_lote(ventas: List[Tuple[float, float, float]],
+                             comision_pct: float = 0.35) -> List[Optional[Dict]]:
+        """
+        Calcula un lote de ventas con la misma comisión
+        
+        Args:
+            ventas: Lista de tuplas (cantidad, costo_unitario, precio_venta)
+            comision_pct: Comisión de la plataforma
+        
+        Returns:
+            list: Un resultado como el de calcular_venta por venta (None si es inválida)
+        """
+        if not ventas:
+            return []
+        
+        cantidades, costos, precios = zip(*ventas)
+        columnas = Calculadora.calcular_ventas_columnas(
+            cantidades, costos, precios, comision_pct
+        )
+        
+        resultados = []
+        for i, (cantidad, costo_unitario, precio_venta) in enumerate(ventas):
+            if not columnas['valida'][i]:
+                resultados.append(None)
+                continue
+            
+            venta = {
+                'cantidad': cantidad,
+                'costo_unitario': costo_unitario,
+                'precio_venta': precio_venta
+            }
+            for campo in CAMPOS_VENTA:
+                venta[campo] = columnas[campo][i]
+            venta['comision_pct'] = comision_pct
+            resultados.append(venta)
+        
+        return resultados
+    
+    # ===================================================================
+    # MONTOS EN MICRO-UNIDADES
+    # ===================================================================
+    
+    @staticmethod
+    def a_micro(monto: float) -> int:
+        """
+        Convierte un monto a entero de micro-unidades
+        
+        Args:
+            monto: Monto en USD
+        
+        Returns:
+            int: Monto en micro-unidades (1 USD = MICRO_POR_UNIDAD)
+        """
+        return _redondear_micro(monto * MICRO_POR_UNIDAD)
+    
+    @staticmethod
+    def desde_micro(micro: int) -> float:
+        """
+        Convierte micro-unidades a monto en USD
+        
+        Args:
+            micro: Monto en micro-unidades
+        
+        Returns:
+            float: Monto en USD
+        """
+        return micro / MICRO_POR_UNIDAD
+    
+    @staticmethod
+    def montos_micro(venta: Dict) -> Tuple[int, ...]:
+        """
+        Montos de una venta (resultado de calcular_venta) en micro-unidades
+        
+        Args:
+            venta: Dict con los campos de CAMPOS_VENTA
+        
+        Returns:
+            tuple: Un entero por campo, en el orden de CAMPOS_VENTA
+        """
+        return tuple(Calculadora.a_micro(venta[campo]) for campo in CAMPOS_VENTA)
+    
+    @staticmethod
+    def a_micro_lote(montos: Sequence[float]) -> List[int]:
+        """
+        Versión por lote de a_micro
+        
+        Args:
+            montos: Montos en USD
+        
+        Returns:
+            list: Montos en micro-unidades
+        """
+        montos = list(montos)
+        
+        if _usar_numpy(len(montos)):
+            # Misma regla que _redondear_micro: trunc(x ± 0.5), sin tocar
+            # los valores que ya son enteros exactos
+            valores = np.asarray(montos, dtype=float) * MICRO_POR_UNIDAD
+            redondeados = np.trunc(valores + np.copysign(0.5, valores))
+            exactos = np.abs(valores) > _LIMITE_ENTERO_DOUBLE
+            return np.where(exactos, valores, redondeados).astype(np.int64).tolist()
+        
+        return [_redondear_micro(monto * MICRO_POR_UNIDAD) for monto in montos]
+    
+    @staticmethod
+    def desde_micro_lote(micros: Sequence[int]) -> List[float]:
+        """
+        Versión por lote de desde_micro
+        
+        Args:
+            micros: Montos en micro-unidades
+        
+        Returns:
+            list: Montos en USD
+        """
+        return [micro / MICRO_POR_UNIDAD for micro in micros]
+    
+    @staticmethod
+    def sumar_montos(montos: Sequence[float]) -> float:
+        """
+        Suma montos sin el error acumulado de sumar floats
+        
+        Args:
+            montos: Montos en USD (p. ej. ganancia_neta de cada venta)
+        
+        Returns:
+            float: Total exacto en USD
+        """
+        return sum(Calculadora.a_micro_lote(montos)) / MICRO_POR_UNIDAD
+    
+    @staticmethod
+    def calcular_ventas_micro(cantidades: Sequence[float],
+                              costos_unitarios: Sequence[float],
+                              precios_venta: Sequence[float],
+                              comision_pct: Union[float, Sequence[float]] = 0.35) -> Dict[str, list]:
+        """
+        Como calcular_ventas_columnas pero con los montos en micro-unidades
+        
+        Los montos se redondean a centavos igual que en calcular_venta y
+        luego se convierten, de modo que micro == a_micro(valor en USD).
+        
+        Args:
+            cantidades: Cantidad vendida por fila
+            costos_unitarios: Costo promedio por unidad por fila
+            precios_venta: Precio de venta por unidad por fila
+            comision_pct: Comisión en % (escalar o una por fila)
+        
+        Returns:
+            dict: Una lista de enteros por campo '<campo>_micro' más 'valida';
+                  las filas inválidas tienen None
+        """
+        columnas = Calculadora.calcular_ventas_columnas(
+            cantidades, costos_unitarios, precios_venta, comision_pct
+        )
+        validas = columnas['valida']
+        
+        resultado = {'valida': validas}
+        for campo in CAMPOS_VENTA:
+            valores = [v if v is not None else 0 for v in columnas[campo]]
+            resultado[f"{campo}_micro"] = [
+                micro if valida else None
+                for micro, valida in zip(Calculadora.a_micro_lote(valores), validas)
+            ]
+        
+        return resultado
+    
     # ===================================================================
     # CÁLCULOS DE CAPITAL
     # ===================================================================
@@ -309,6 +693,13 @@ if __name__ == "__main__":
     rentable, mensaje = calc.validar_precio_rentable(1.0, 1.0235)
     print(f"   {'✅' if rentable else '❌'} {mensaje}")
     
+    # Test 6: Lote vs escalar
+    print("\n[Test 6] Cálculo por lote:")
+    lote = [(100, 1.0, 1.0235), (0.285, 1.0, 1.0), (-5, 1.0, 1.02)] * 50
+    iguales = calc.calcular_ventas_lote(lote) == [calc.calcular_venta(*v) for v in lote]
+    motor = "NumPy" if _usar_numpy(len(lote)) else "Python puro"
+    print(f"   {len(lote)} ventas ({motor}): {'✅' if iguales else '❌'} idéntico a calcular_venta")
+    
     print("\n" + "="*70)
     print("✅ TESTS COMPLETADOS")
     print("="*70)
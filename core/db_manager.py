@@ -6,17 +6,375 @@ GESTOR DE BASE DE DATOS v3.0
 Gestor centralizado y seguro de conexiones a SQLite
 """
 
+import atexit
+import json
+import os
+import queue
+import re
 import sqlite3
+import sys
+import threading
+import time
+from collections import namedtuple
 from contextlib import contextmanager
+from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Callable, Iterator
 
 
 # ===================================================================
 # CONFIGURACIÓN
 # ===================================================================
 
-DB_FILE = 'data/arbitraje.db'
+# ARBITRAJE_DB permite apuntar a otra BD (p. ej. la de generar_datos.py)
+DB_FILE = os.environ.get('ARBITRAJE_DB', 'data/arbitraje.db')
+
+# Pool de conexiones
+POOL_SIZE = 5                   # Máximo de conexiones abiertas a la vez
+POOL_TIMEOUT = 10.0             # Segundos de espera por una conexión libre
+HEALTH_CHECK_INTERVAL = 60.0    # Segundos de inactividad antes de verificar una conexión
+
+# Caché de sentencias preparadas por conexión (SQLite usa 128 por defecto)
+CACHED_STATEMENTS = 512
+
+# Formatos de fila disponibles en execute_query / fetch_iter / stream
+#   - dict: diccionario por fila (compatible con todo el sistema)
+#   - tupla: tupla simple, el formato más barato
+#   - fila: namedtuple con __slots__, acceso por atributo sin dict
+FORMATOS_FILA = ('dict', 'tupla', 'fila')
+STREAM_LOTE = 500               # Filas leídas por cada fetchmany en stream / fetch_iter
+
+# Perfiles de PRAGMA aplicados a cada conexión nueva. Se elige por
+# despliegue con la variable de entorno ARBITRAJE_PERFIL_BD.
+#   - rendimiento: WAL, lectores y escritor no se bloquean entre sí
+#   - seguro: valores por defecto de SQLite (journal DELETE, sync FULL)
+#   - lectura: solo lectura (query_only), no cambia el modo de journal;
+#     lo usan los procesos de exportación en lote
+PERFILES_PRAGMA = {
+    'rendimiento': {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'cache_size': -65536,           # KiB negativos = 64 MB de caché
+        'mmap_size': 268435456,         # 256 MB mapeados en memoria
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,           # ms
+        'wal_autocheckpoint': 1000,     # páginas antes de checkpoint automático
+    },
+    'seguro': {
+        'journal_mode': 'DELETE',
+        'synchronous': 'FULL',
+        'busy_timeout': 5000,
+    },
+    'lectura': {
+        'cache_size': -65536,
+        'mmap_size': 268435456,
+        'temp_store': 'MEMORY',
+        'busy_timeout': 5000,
+        'query_only': 'ON',
+    },
+}
+PERFIL_PRAGMA = os.environ.get('ARBITRAJE_PERFIL_BD', 'rendimiento')
+
+# Checkpoint del WAL: al cerrar el pool se trunca el archivo -wal
+CHECKPOINT_AL_CERRAR = 'TRUNCATE'
+MODOS_CHECKPOINT = ('PASSIVE', 'FULL', 'RESTART', 'TRUNCATE')
+
+# Transacciones
+MODOS_TRANSACCION = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+BUSY_REINTENTOS = 5             # Reintentos ante SQLITE_BUSY
+BUSY_ESPERA = 0.05              # Espera inicial entre reintentos (se duplica)
+
+# Perfilador SQL (opcional): ARBITRAJE_PERFIL_SQL=1 lo activa al iniciar y
+# vuelca el resultado a PERFIL_SQL_DIR al salir
+PERFIL_SQL_ACTIVO = os.environ.get('ARBITRAJE_PERFIL_SQL', '0') == '1'
+PERFIL_SQL_DIR = Path('logs')
+PERFIL_SQL_PROFUNDIDAD = 2      # Funciones de la pila registradas como origen
+
+
+# ===================================================================
+# FORMATOS DE FILA
+# ===================================================================
+
+@lru_cache(maxsize=256)
+def _clase_fila(columnas: tuple):
+    """Clase namedtuple (sin __dict__) para un conjunto de columnas"""
+    return namedtuple('Fila', columnas, rename=True)
+
+
+def _convertir_filas(cursor: sqlite3.Cursor, filas: list, formato: str) -> list:
+    """Convierte filas crudas (tuplas) al formato solicitado"""
+    if formato == 'tupla':
+        return filas
+    
+    columnas = tuple(d[0] for d in cursor.description)
+    
+    if formato == 'fila':
+        return list(map(_clase_fila(columnas)._make, filas))
+    
+    return [dict(zip(columnas, fila)) for fila in filas]
+
+
+# ===================================================================
+# PERFILADOR SQL
+# ===================================================================
+
+_PATRON_CADENA = re.compile(r"'(?:[^']|'')*'")
+_PATRON_NUMERO = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PATRON_LISTA = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_PATRON_ESPACIOS = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def normalizar_sql(sql: str) -> str:
+    """
+    Texto de una sentencia sin literales ni espacios repetidos
+    
+    Las sentencias que solo difieren en valores (o en el largo de una
+    lista IN) quedan con el mismo texto y se agrupan juntas.
+    
+    Args:
+        sql: Sentencia tal como se ejecutó
+    
+    Returns:
+        str: Sentencia normalizada
+    """
+    sql = _PATRON_CADENA.sub('?', sql)
+    sql = _PATRON_NUMERO.sub('?', sql)
+    sql = _PATRON_ESPACIOS.sub(' ', sql).strip()
+    return _PATRON_LISTA.sub('(?, ...)', sql)
+
+
+class PerfiladorSQL:
+    """
+    Acumula por sentencia normalizada: llamadas, tiempo total y máximo,
+    filas y las funciones que la ejecutaron
+    
+    Solo mide cuando está activo: las conexiones se crean entonces con
+    ConexionPerfilada, cuyos cursores le informan cada ejecución y cada
+    lectura de filas. Sin perfilador el pool usa las clases de sqlite3.
+    """
+    
+    def __init__(self, activo: bool = PERFIL_SQL_ACTIVO):
+        self.activo = activo
+        self.desde = datetime.now() if activo else None
+        self._lock = threading.Lock()
+        self._sentencias = {}
+    
+    @staticmethod
+    def _origen() -> str:
+        """Funciones de la pila fuera de db_manager que ejecutaron la sentencia"""
+        funciones = []
+        frame = sys._getframe(2)
+        
+        while frame is not None and len(funciones) < PERFIL_SQL_PROFUNDIDAD:
+            modulo = frame.f_globals.get('__name__', '')
+            if modulo not in (__name__, 'contextlib'):
+                codigo = frame.f_code
+                funciones.append(f"{modulo}.{getattr(codigo, 'co_qualname', codigo.co_name)}")
+            frame = frame.f_back
+        
+        return " ← ".join(funciones)
+    
+    def registrar(self, sql: str, duracion: float, filas: int) -> Dict:
+        """
+        Registra una ejecución
+        
+        Args:
+            sql: Sentencia ejecutada
+            duracion: Segundos que tardó execute
+            filas: Filas afectadas (las leídas se suman con sumar)
+        
+        Returns:
+            dict: Entrada de la sentencia, para sumarle las lecturas
+        """
+        clave = normalizar_sql(sql)
+        origen = self._origen()
+        
+        with self._lock:
+            entrada = self._sentencias.get(clave)
+            if entrada is None:
+                entrada = self._sentencias[clave] = {
+                    'sql': clave, 'llamadas': 0, 'tiempo_total': 0.0,
+                    'tiempo_max': 0.0, 'filas': 0, 'origenes': {}
+                }
+            
+            entrada['llamadas'] += 1
+            entrada['tiempo_total'] += duracion
+            entrada['tiempo_max'] = max(entrada['tiempo_max'], duracion)
+            entrada['filas'] += filas
+            entrada['origenes'][origen] = entrada['origenes'].get(origen, 0) + 1
+        
+        return entrada
+    
+    def sumar(self, entrada: Dict, duracion: float, filas: int):
+        """Suma a una sentencia el tiempo y las filas de un fetch"""
+        with self._lock:
+            entrada['tiempo_total'] += duracion
+            entrada['filas'] += filas
+    
+    def informe(self, orden: str = 'tiempo_total', limite: Optional[int] = None) -> List[Dict]:
+        """
+        Sentencias ordenadas de mayor a menor
+        
+        Args:
+            orden: tiempo_total, llamadas, tiempo_max, filas o tiempo_medio
+            limite: Máximo de sentencias (None = todas)
+        
+        Returns:
+            list: Copias de las entradas, con tiempo_medio y los orígenes
+                  ordenados por llamadas
+        """
+        with self._lock:
+            entradas = [dict(e, origenes=dict(e['origenes'])) for e in self._sentencias.values()]
+        
+        for entrada in entradas:
+            entrada['tiempo_medio'] = entrada['tiempo_total'] / entrada['llamadas']
+            entrada['origenes'] = dict(sorted(entrada['origenes'].items(),
+                                              key=lambda item: item[1], reverse=True))
+        
+        entradas.sort(key=lambda e: e[orden], reverse=True)
+        return entradas[:limite] if limite else entradas
+    
+    def volcar(self, ruta: Optional[Path] = None) -> Path:
+        """
+        Guarda el informe completo en JSON
+        
+        Args:
+            ruta: Archivo de salida (por defecto logs/perfil_sql_<fecha>.json)
+        
+        Returns:
+            Path: Archivo escrito
+        """
+        if ruta is None:
+            PERFIL_SQL_DIR.mkdir(exist_ok=True)
+            ruta = PERFIL_SQL_DIR / f"perfil_sql_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+        
+        with open(ruta, 'w', encoding='utf-8') as f:
+            json.dump({
+                'desde': self.desde.isoformat(timespec='seconds') if self.desde else None,
+                'hasta': datetime.now().isoformat(timespec='seconds'),
+                'sentencias': self.informe()
+            }, f, ensure_ascii=False, indent=2)
+        
+        return ruta
+    
+    def reiniciar(self):
+        """Descarta lo acumulado"""
+        with self._lock:
+            self._sentencias.clear()
+        self.desde = datetime.now() if self.activo else None
+    
+    def _volcar_al_salir(self):
+        """Vuelca el informe al terminar si hay algo medido"""
+        if self._sentencias:
+            self.volcar()
+
+
+class CursorTrazado(sqlite3.Cursor):
+    """Cursor que pasa a la traza de su conexión cada sentencia que ejecuta"""
+    
+    def execute(self, sql, parametros=()):
+        if self.connection.traza is not None:
+            self.connection.traza(sql)
+        return super().execute(sql, parametros)
+    
+    def executemany(self, sql, parametros):
+        if self.connection.traza is not None:
+            self.connection.traza(sql)
+        return super().executemany(sql, parametros)
+
+
+class ConexionTrazada(sqlite3.Connection):
+    """
+    Conexión cuyos cursores (incluidos los de execute) son CursorTrazado
+    
+    La traza ve solo lo que el código pide ejecutar, más el COMMIT o
+    ROLLBACK de commit()/rollback() si había transacción abierta.
+    """
+    
+    traza = None
+    
+    def cursor(self, factory=CursorTrazado):
+        return super().cursor(factory)
+    
+    def execute(self, sql, parametros=()):
+        return self.cursor().execute(sql, parametros)
+    
+    def executemany(self, sql, parametros):
+        return self.cursor().executemany(sql, parametros)
+    
+    def commit(self):
+        if self.traza is not None and self.in_transaction:
+            self.traza("COMMIT")
+        super().commit()
+    
+    def rollback(self):
+        if self.traza is not None and self.in_transaction:
+            self.traza("ROLLBACK")
+        super().rollback()
+
+
+class CursorPerfilado(CursorTrazado):
+    """Cursor que informa al perfilador cada ejecución y las filas leídas"""
+    
+    _entrada = None
+    
+    def execute(self, sql, parametros=()):
+        inicio = time.perf_counter()
+        try:
+            return super().execute(sql, parametros)
+        finally:
+            self._entrada = perfilador.registrar(sql, time.perf_counter() - inicio,
+                                                 max(self.rowcount, 0))
+    
+    def executemany(self, sql, parametros):
+        inicio = time.perf_counter()
+        try:
+            return super().executemany(sql, parametros)
+        finally:
+            self._entrada = perfilador.registrar(sql, time.perf_counter() - inicio,
+                                                 max(self.rowcount, 0))
+    
+    def _leidas(self, inicio: float, filas: int):
+        if self._entrada is not None:
+            perfilador.sumar(self._entrada, time.perf_counter() - inicio, filas)
+    
+    def fetchone(self):
+        inicio = time.perf_counter()
+        fila = super().fetchone()
+        self._leidas(inicio, fila is not None)
+        return fila
+    
+    def fetchmany(self, *args, **kwargs):
+        inicio = time.perf_counter()
+        filas = super().fetchmany(*args, **kwargs)
+        self._leidas(inicio, len(filas))
+        return filas
+    
+    def fetchall(self):
+        inicio = time.perf_counter()
+        filas = super().fetchall()
+        self._leidas(inicio, len(filas))
+        return filas
+    
+    def __next__(self):
+        inicio = time.perf_counter()
+        fila = super().__next__()
+        self._leidas(inicio, 1)
+        return fila
+
+
+class ConexionPerfilada(ConexionTrazada):
+    """Conexión cuyos cursores (incluidos los de execute) son CursorPerfilado"""
+    
+    def cursor(self, factory=CursorPerfilado):
+        return super().cursor(factory)
+
+
+perfilador = PerfiladorSQL()
+if perfilador.activo:
+    atexit.register(perfilador._volcar_al_salir)
 
 
 # ===================================================================
@@ -24,12 +382,42 @@ DB_FILE = 'data/arbitraje.db'
 # ===================================================================
 
 class DatabaseManager:
-    """Gestor centralizado de conexiones a la base de datos"""
+    """
+    Gestor centralizado de conexiones a la base de datos
     
-    def __init__(self):
-        """Inicializa el gestor"""
+    Mantiene un pool de conexiones persistentes: cada hilo conserva su
+    conexión entre llamadas, de modo que el costo de conectar y aplicar
+    los PRAGMA se paga una vez por proceso y no una vez por consulta.
+    """
+    
+    def __init__(self, pool_size: int = POOL_SIZE, perfil: str = PERFIL_PRAGMA):
+        """
+        Inicializa el gestor
+        
+        Args:
+            pool_size: Máximo de conexiones abiertas simultáneamente
+            perfil: Perfil de PRAGMA (ver PERFILES_PRAGMA)
+        """
         self.db_path = Path(DB_FILE)
         self._verificar_bd_existe()
+        
+        if perfil not in PERFILES_PRAGMA:
+            raise ValueError(
+                f"Perfil de BD desconocido: {perfil} "
+                f"(disponibles: {', '.join(PERFILES_PRAGMA)})"
+            )
+        self.perfil = perfil
+        
+        self.pool_size = max(1, pool_size)
+        self._lock = threading.Lock()
+        self._libres = queue.LifoQueue()
+        self._asignadas = {}    # conexión -> hilo que la usa
+        self._ultimo_uso = {}   # conexión -> timestamp del último uso
+        self._local = threading.local()
+        self._generacion = 0
+        self._traza = None      # Callback de trazar_sentencias para conexiones nuevas
+        
+        atexit.register(self.cerrar)
     
     def _verificar_bd_existe(self):
         """Verifica que la base de datos existe"""
@@ -42,11 +430,289 @@ class DatabaseManager:
                 "Ejecuta inicializar_bd.py primero"
             )
     
+    # ===================================================================
+    # POOL DE CONEXIONES
+    # ===================================================================
+    
+    def _crear_conexion(self) -> sqlite3.Connection:
+        """Abre una conexión nueva y aplica la configuración de sesión"""
+        # check_same_thread=False: la conexión puede cambiar de hilo al
+        # volver al pool, pero nunca la usan dos hilos a la vez
+        if perfilador.activo:
+            clase = ConexionPerfilada
+        elif self._traza is not None:
+            clase = ConexionTrazada
+        else:
+            clase = sqlite3.Connection
+        
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            cached_statements=CACHED_STATEMENTS,
+            factory=clase
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA foreign_keys = ON")
+        
+        for pragma, valor in PERFILES_PRAGMA[self.perfil].items():
+            conn.execute(f"PRAGMA {pragma} = {valor}")
+        
+        # La traza empieza después de la configuración de sesión
+        if self._traza is not None:
+            conn.traza = self._traza
+        
+        return conn
+    
+    def _conexion_saludable(self, conn: sqlite3.Connection) -> bool:
+        """Verifica una conexión que lleva tiempo inactiva"""
+        inactiva = time.monotonic() - self._ultimo_uso.get(conn, 0)
+        if inactiva < HEALTH_CHECK_INTERVAL:
+            return True
+        
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+    
+    def _descartar(self, conn: sqlite3.Connection):
+        """Cierra una conexión y la saca del pool"""
+        with self._lock:
+            self._asignadas.pop(conn, None)
+            self._ultimo_uso.pop(conn, None)
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+    
+    def _recuperar_huerfanas(self):
+        """Devuelve al pool las conexiones de hilos que ya terminaron"""
+        with self._lock:
+            huerfanas = [c for c, hilo in self._asignadas.items()
+                         if hilo is not None and not hilo.is_alive()]
+            for conn in huerfanas:
+                self._asignadas[conn] = None
+        
+        for conn in huerfanas:
+            if conn.in_transaction:
+                conn.rollback()
+            self._libres.put(conn)
+    
+    def _tomar_del_pool(self) -> sqlite3.Connection:
+        """Obtiene una conexión libre, creando una nueva si hay cupo"""
+        try:
+            return self._libres.get_nowait()
+        except queue.Empty:
+            pass
+        
+        with self._lock:
+            if len(self._asignadas) < self.pool_size:
+                conn = self._crear_conexion()
+                self._asignadas[conn] = None
+                self._ultimo_uso[conn] = time.monotonic()
+                return conn
+        
+        self._recuperar_huerfanas()
+        
+        try:
+            return self._libres.get(timeout=POOL_TIMEOUT)
+        except queue.Empty:
+            raise sqlite3.OperationalError(
+                f"Pool de conexiones agotado ({self.pool_size} en uso)"
+            )
+    
+    def _obtener_conexion(self) -> sqlite3.Connection:
+        """Retorna la conexión persistente del hilo actual"""
+        conn = getattr(self._local, 'conn', None)
+        
+        # Conexiones de una generación anterior a cerrar() ya no son válidas
+        if conn is not None and self._local.generacion != self._generacion:
+            conn = None
+        
+        if conn is not None and not self._conexion_saludable(conn):
+            self._descartar(conn)
+            conn = None
+        
+        while conn is None:
+            conn = self._tomar_del_pool()
+            if not self._conexion_saludable(conn):
+                self._descartar(conn)
+                conn = None
+        
+        with self._lock:
+            self._asignadas[conn] = threading.current_thread()
+        
+        self._local.conn = conn
+        self._local.generacion = self._generacion
+        return conn
+    
+    def liberar_conexion(self):
+        """
+        Devuelve al pool la conexión del hilo actual
+        
+        Útil para hilos de trabajo que terminan; el hilo principal
+        normalmente conserva su conexión durante toda la sesión.
+        """
+        conn = getattr(self._local, 'conn', None)
+        self._local.conn = None
+        
+        if conn is None or self._local.generacion != self._generacion:
+            return
+        
+        if conn.in_transaction:
+            conn.rollback()
+        
+        with self._lock:
+            self._asignadas[conn] = None
+        self._libres.put(conn)
+    
+    def checkpoint(self, modo: str = 'PASSIVE') -> Optional[Dict[str, int]]:
+        """
+        Traspasa el contenido del WAL al archivo principal de la BD
+        
+        Args:
+            modo: PASSIVE (no bloquea), FULL, RESTART o TRUNCATE
+        
+        Returns:
+            dict: Páginas en el WAL y páginas traspasadas, o None si la BD
+                  no está en modo WAL
+        """
+        modo = modo.upper()
+        if modo not in MODOS_CHECKPOINT:
+            raise ValueError(f"Modo de checkpoint inválido: {modo}")
+        
+        with self.get_cursor() as cursor:
+            cursor.execute("PRAGMA journal_mode")
+            if cursor.fetchone()[0].lower() != 'wal':
+                return None
+            
+            cursor.execute(f"PRAGMA wal_checkpoint({modo})")
+            bloqueado, paginas_wal, paginas_copiadas = cursor.fetchone()
+        
+        return {
+            'bloqueado': bloqueado,
+            'paginas_wal': paginas_wal,
+            'paginas_copiadas': paginas_copiadas
+        }
+    
+    def cerrar(self):
+        """Cierra todas las conexiones del pool (se llama al salir)"""
+        if self._asignadas and CHECKPOINT_AL_CERRAR:
+            try:
+                self.checkpoint(CHECKPOINT_AL_CERRAR)
+            except sqlite3.Error:
+                pass
+        
+        with self._lock:
+            conexiones = list(self._asignadas)
+            self._asignadas.clear()
+            self._ultimo_uso.clear()
+            self._generacion += 1
+        
+        while True:
+            try:
+                self._libres.get_nowait()
+            except queue.Empty:
+                break
+        
+        for conn in conexiones:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        
+        self._local = threading.local()
+    
+    def cambiar_perfil(self, perfil: str):
+        """
+        Cambia el perfil de PRAGMA de las conexiones del pool
+        
+        Cierra las conexiones abiertas para que las nuevas usen el perfil;
+        debe llamarse fuera de cualquier transacción.
+        
+        Args:
+            perfil: Perfil de PRAGMA (ver PERFILES_PRAGMA)
+        """
+        if perfil not in PERFILES_PRAGMA:
+            raise ValueError(
+                f"Perfil de BD desconocido: {perfil} "
+                f"(disponibles: {', '.join(PERFILES_PRAGMA)})"
+            )
+        
+        if perfil != self.perfil:
+            self.perfil = perfil
+            self.cerrar()
+    
+    def activar_perfilador(self, activo: bool = True):
+        """
+        Activa o desactiva el perfilador SQL (ver PerfiladorSQL)
+        
+        Reabre las conexiones del pool para que usen las clases
+        correspondientes; debe llamarse fuera de cualquier transacción.
+        
+        Args:
+            activo: True para empezar a medir, False para dejar de hacerlo
+        """
+        if perfilador.activo == activo:
+            return
+        
+        perfilador.activo = activo
+        if activo and perfilador.desde is None:
+            perfilador.desde = datetime.now()
+        
+        self.cerrar()
+    
+    def trazar_sentencias(self, callback: Optional[Callable[[str], None]]):
+        """
+        Registra una función que recibe el texto de cada sentencia ejecutada
+        
+        La traza se toma en el cursor (ver ConexionTrazada): una llamada por
+        execute/executemany y por COMMIT/ROLLBACK explícito. Las sentencias
+        de triggers no llegan; set_trace_callback no sirve para eso porque
+        repite la sentencia exterior por cada sentencia del trigger.
+        
+        Reabre las conexiones del pool para que usen la clase
+        correspondiente; debe llamarse fuera de cualquier transacción.
+        
+        Args:
+            callback: Función (sql) -> None, o None para desactivar
+        """
+        if self._traza is callback:
+            return
+        
+        self._traza = callback
+        self.cerrar()
+    
+    def estado_pool(self) -> Dict[str, int]:
+        """
+        Retorna el estado actual del pool
+        
+        Returns:
+            dict: Conexiones abiertas, libres y en uso
+        """
+        with self._lock:
+            abiertas = len(self._asignadas)
+            en_uso = sum(1 for hilo in self._asignadas.values() if hilo is not None)
+        
+        return {
+            'tamaño': self.pool_size,
+            'abiertas': abiertas,
+            'en_uso': en_uso,
+            'libres': abiertas - en_uso
+        }
+    
+    # ===================================================================
+    # CURSORES Y CONSULTAS
+    # ===================================================================
+    
     @contextmanager
     def get_cursor(self, commit: bool = False):
         """
         Context manager para obtener cursor de BD
         
+        Si se anida dentro de otro get_cursor del mismo hilo, comparte la
+        conexión y deja el commit/rollback al bloque exterior.
+        
         Args:
             commit: Si True, hace commit automático al salir
         
@@ -57,25 +723,150 @@ class DatabaseManager:
             with db.get_cursor(commit=True) as cursor:
                 cursor.execute("INSERT INTO ...")
         """
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        conn.execute("PRAGMA foreign_keys = ON")
+        conn = self._obtener_conexion()
+        profundidad = getattr(self._local, 'profundidad', 0)
+        self._local.profundidad = profundidad + 1
         
         cursor = conn.cursor()
         
         try:
             yield cursor
-            if commit:
-                conn.commit()
+            if profundidad == 0:
+                if commit:
+                    conn.commit()
+                elif conn.in_transaction:
+                    # Sin commit explícito los cambios se descartan
+                    conn.rollback()
         except Exception as e:
-            conn.rollback()
+            if profundidad == 0:
+                conn.rollback()
             raise e
         finally:
             cursor.close()
-            conn.close()
+            self._local.profundidad = profundidad
+            self._ultimo_uso[conn] = time.monotonic()
+    
+    # ===================================================================
+    # TRANSACCIONES
+    # ===================================================================
+    
+    @staticmethod
+    def _es_bloqueo(error: Exception) -> bool:
+        """Indica si un error corresponde a SQLITE_BUSY / base bloqueada"""
+        if not isinstance(error, sqlite3.OperationalError):
+            return False
+        
+        # sqlite_errorcode existe desde Python 3.11 (puede venir extendido)
+        codigo = getattr(error, 'sqlite_errorcode', None)
+        if codigo is not None:
+            return (codigo & 0xFF) in (5, 6)  # SQLITE_BUSY, SQLITE_LOCKED
+        
+        mensaje = str(error).lower()
+        return 'locked' in mensaje or 'busy' in mensaje
+    
+    def _con_reintentos(self, conn: sqlite3.Connection, sql: str):
+        """Ejecuta una sentencia de control reintentando si la BD está ocupada"""
+        espera = BUSY_ESPERA
+        
+        for intento in range(BUSY_REINTENTOS + 1):
+            try:
+                conn.execute(sql)
+                return
+            except sqlite3.OperationalError as e:
+                if not self._es_bloqueo(e) or intento == BUSY_REINTENTOS:
+                    raise
+                time.sleep(espera)
+                espera *= 2
+    
+    @contextmanager
+    def transaction(self, modo: str = 'IMMEDIATE'):
+        """
+        Context manager de transacción atómica
+        
+        Al nivel exterior abre BEGIN <modo> y hace un único COMMIT al salir.
+        Anidado (dentro de otra transacción o get_cursor del mismo hilo)
+        usa un SAVEPOINT, de modo que un error interno solo deshace su parte.
+        BEGIN y COMMIT se reintentan con espera creciente ante SQLITE_BUSY.
+        
+        Args:
+            modo: DEFERRED, IMMEDIATE (por defecto) o EXCLUSIVE
+        
+        Yields:
+            sqlite3.Connection: Conexión con la transacción abierta
+        
+        Example:
+            with db.transaction() as conn:
+                cursor = conn.cursor()
+                cursor.execute("INSERT INTO ...")
+                cursor.execute("UPDATE ...")
+        """
+        modo = modo.upper()
+        if modo not in MODOS_TRANSACCION:
+            raise ValueError(f"Modo de transacción inválido: {modo}")
+        
+        conn = self._obtener_conexion()
+        profundidad = getattr(self._local, 'profundidad', 0)
+        
+        if profundidad == 0:
+            self._con_reintentos(conn, f"BEGIN {modo}")
+        else:
+            savepoint = f"sp_{profundidad}"
+            conn.execute(f"SAVEPOINT {savepoint}")
+        
+        self._local.profundidad = profundidad + 1
+        
+        try:
+            yield conn
+        except BaseException:
+            self._local.profundidad = profundidad
+            if profundidad == 0:
+                conn.rollback()
+            else:
+                conn.execute(f"ROLLBACK TO {savepoint}")
+                conn.execute(f"RELEASE {savepoint}")
+            raise
+        else:
+            self._local.profundidad = profundidad
+            if profundidad == 0:
+                try:
+                    self._con_reintentos(conn, "COMMIT")
+                except Exception:
+                    conn.rollback()
+                    raise
+            else:
+                conn.execute(f"RELEASE {savepoint}")
+        finally:
+            self._ultimo_uso[conn] = time.monotonic()
+    
+    def ejecutar_en_transaccion(self, funcion, *args, modo: str = 'IMMEDIATE', **kwargs):
+        """
+        Ejecuta una función completa dentro de una transacción
+        
+        A diferencia de transaction(), si la BD está ocupada en cualquier
+        punto se deshace todo y se vuelve a ejecutar la función completa.
+        
+        Args:
+            funcion: Callable que recibe la conexión como primer argumento
+            modo: Modo de la transacción
+        
+        Returns:
+            El valor retornado por la función
+        """
+        espera = BUSY_ESPERA
+        
+        for intento in range(BUSY_REINTENTOS + 1):
+            try:
+                with self.transaction(modo) as conn:
+                    return funcion(conn, *args, **kwargs)
+            except sqlite3.OperationalError as e:
+                anidada = getattr(self._local, 'profundidad', 0) > 0
+                if anidada or not self._es_bloqueo(e) or intento == BUSY_REINTENTOS:
+                    raise
+                time.sleep(espera)
+                espera *= 2
     
     def execute_query(self, query: str, params: tuple = (), 
-                     fetch_one: bool = False) -> Optional[List[Dict]]:
+                     fetch_one: bool = False, formato: str = 'dict') -> Optional[List[Dict]]:
         """
         Ejecuta una consulta SELECT y retorna resultados
         
@@ -83,19 +874,119 @@ class DatabaseManager:
             query: Query SQL
             params: Parámetros de la query
             fetch_one: Si True, retorna solo un resultado
+            formato: 'dict' (por defecto), 'tupla' o 'fila' (namedtuple)
         
         Returns:
-            Lista de diccionarios o un diccionario (si fetch_one=True)
+            Lista de filas o una fila (si fetch_one=True) en el formato pedido
         """
+        if formato == 'dict':
+            with self.get_cursor() as cursor:
+                cursor.execute(query, params)
+                
+                if fetch_one:
+                    row = cursor.fetchone()
+                    return dict(row) if row else None
+                else:
+                    rows = cursor.fetchall()
+                    return [dict(row) for row in rows] if rows else []
+        
+        if formato not in FORMATOS_FILA:
+            raise ValueError(f"Formato de fila inválido: {formato}")
+        
         with self.get_cursor() as cursor:
+            cursor.row_factory = None
             cursor.execute(query, params)
             
             if fetch_one:
                 row = cursor.fetchone()
-                return dict(row) if row else None
+                return _convertir_filas(cursor, [row], formato)[0] if row else None
             else:
-                rows = cursor.fetchall()
-                return [dict(row) for row in rows] if rows else []
+                return _convertir_filas(cursor, cursor.fetchall(), formato)
+    
+    def stream(self, query: str, params: tuple = (),
+               batch_size: int = STREAM_LOTE, formato: str = 'dict') -> Iterator[list]:
+        """
+        Recorre el resultado de una consulta en lotes sin materializarlo
+        
+        Toma una conexión propia del pool y la mantiene abierta mientras
+        dure la iteración, de modo que la lectura no se ve afectada por los
+        commit/rollback que haga el consumidor con la conexión del hilo.
+        La memoria usada depende de batch_size y no del tamaño del resultado.
+        
+        Args:
+            query: Query SQL
+            params: Parámetros de la query
+            batch_size: Filas por lote (fetchmany)
+            formato: 'dict' (por defecto), 'tupla' o 'fila' (namedtuple)
+        
+        Yields:
+            Lista de hasta batch_size filas en el formato pedido
+        
+        Example:
+            for lote in db.stream("SELECT ...", (ciclo_id,), batch_size=1000):
+                writer.writerows(...)
+        """
+        if formato not in FORMATOS_FILA:
+            raise ValueError(f"Formato de fila inválido: {formato}")
+        if batch_size < 1:
+            raise ValueError(f"batch_size debe ser positivo: {batch_size}")
+        
+        conn = self._tomar_del_pool()
+        while not self._conexion_saludable(conn):
+            self._descartar(conn)
+            conn = self._tomar_del_pool()
+        
+        generacion = self._generacion
+        with self._lock:
+            self._asignadas[conn] = threading.current_thread()
+        
+        cursor = conn.cursor()
+        cursor.row_factory = None
+        
+        try:
+            cursor.execute(query, params)
+            
+            while True:
+                filas = cursor.fetchmany(batch_size)
+                if not filas:
+                    break
+                yield _convertir_filas(cursor, filas, formato)
+        finally:
+            cursor.close()
+            
+            # Si el pool se cerró durante la iteración la conexión ya no vale
+            if generacion == self._generacion:
+                if conn.in_transaction:
+                    conn.rollback()
+                with self._lock:
+                    self._asignadas[conn] = None
+                    self._ultimo_uso[conn] = time.monotonic()
+                self._libres.put(conn)
+            else:
+                conn.close()
+    
+    def fetch_iter(self, query: str, params: tuple = (),
+                   formato: str = 'tupla') -> Iterator:
+        """
+        Itera fila a fila sobre el resultado de una consulta
+        
+        Versión aplanada de stream(): el consumidor puede ejecutar otras
+        consultas o escrituras mientras itera.
+        
+        Args:
+            query: Query SQL
+            params: Parámetros de la query
+            formato: 'tupla' (por defecto), 'fila' (namedtuple) o 'dict'
+        
+        Yields:
+            Cada fila en el formato pedido
+        
+        Example:
+            for fila in db.fetch_iter("SELECT ...", (ciclo_id,), formato='fila'):
+                writer.writerow(fila)
+        """
+        for lote in self.stream(query, params, formato=formato):
+            yield from lote
     
     def execute_update(self, query: str, params: tuple = ()) -> int:
         """
@@ -146,8 +1037,8 @@ def verificar_conexion() -> bool:
         bool: True si la conexión es exitosa
     """
     try:
-        db_test = DatabaseManager()
-        with db_test.get_cursor() as cursor:
+        db._verificar_bd_existe()
+        with db.get_cursor() as cursor:
             cursor.execute("SELECT 1")
         return True
     except Exception:
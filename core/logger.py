@@ -7,7 +7,12 @@ Sistema de logs centralizado
 Compatible con todos los módulos del sistema
 """
 
+import atexit
+import json
 import os
+import queue
+import threading
+import time
 from datetime import datetime
 from pathlib import Path
 
@@ -19,6 +24,17 @@ from pathlib import Path
 LOGS_DIR = Path("logs")
 LOGS_DIR.mkdir(exist_ok=True)
 
+# Escritura en segundo plano: las líneas se encolan y un hilo las escribe
+# por lotes. ARBITRAJE_LOG_SINCRONO=1 vuelve a escribir línea a línea.
+LOG_ASINCRONO = os.environ.get('ARBITRAJE_LOG_SINCRONO', '0') != '1'
+LOG_LATENCIA_MAX = float(os.environ.get('ARBITRAJE_LOG_LATENCIA', '0.5'))  # segundos
+LOG_LOTE_MAX = 500              # Líneas máximas por escritura
+
+# Salida estructurada opcional: además del .log de texto, cada evento se
+# escribe como una línea JSON con campos tipados en <base>_<fecha>.jsonl
+# (ver features/consulta_logs.py). Se activa con ARBITRAJE_LOG_JSON=1.
+LOG_JSON = os.environ.get('ARBITRAJE_LOG_JSON', '0') == '1'
+
 
 # ===================================================================
 # CLASE DE LOGGING
@@ -27,16 +43,30 @@ LOGS_DIR.mkdir(exist_ok=True)
 class Logger:
     """Sistema centralizado de logs"""
     
-    def __init__(self, archivo_base="sistema"):
+    def __init__(self, archivo_base="sistema", asincrono=LOG_ASINCRONO,
+                 latencia_max=LOG_LATENCIA_MAX, json_activo=LOG_JSON):
         """
         Inicializa el logger
         
         Args:
             archivo_base: Nombre base del archivo de log
+            asincrono: Escribir por lotes desde un hilo en segundo plano
+            latencia_max: Segundos máximos que una línea espera en la cola
+            json_activo: Escribir también la salida JSON-lines
         """
         self.archivo_base = archivo_base
         self.fecha_actual = datetime.now().strftime('%Y-%m-%d')
         self.archivo_log = LOGS_DIR / f"{archivo_base}_{self.fecha_actual}.log"
+        self.archivo_json = LOGS_DIR / f"{archivo_base}_{self.fecha_actual}.jsonl"
+        self.json_activo = json_activo
+        
+        self.asincrono = asincrono
+        self.latencia_max = latencia_max
+        self._cola = queue.Queue()
+        self._hilo = None
+        self._lock_hilo = threading.Lock()
+        
+        atexit.register(self.cerrar)
     
     def _verificar_fecha(self):
         """Verifica si cambió la fecha y actualiza el archivo"""
@@ -44,8 +74,9 @@ class Logger:
         if fecha_ahora != self.fecha_actual:
             self.fecha_actual = fecha_ahora
             self.archivo_log = LOGS_DIR / f"{self.archivo_base}_{self.fecha_actual}.log"
+            self.archivo_json = LOGS_DIR / f"{self.archivo_base}_{self.fecha_actual}.jsonl"
     
-    def _escribir_log(self, nivel, mensaje, categoria="general"):
+    def _escribir_log(self, nivel, mensaje, categoria="general", evento=None, **campos):
         """
         Escribe en el log
         
@@ -53,18 +84,130 @@ class Logger:
             nivel: Nivel del log (INFO, WARNING, ERROR, etc)
             mensaje: Mensaje a registrar
             categoria: Categoría del log
+            evento: Nombre del evento de dominio (solo salida JSON)
+            **campos: Campos tipados del evento (solo salida JSON)
         """
         self._verificar_fecha()
         
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        linea = f"[{timestamp}] [{nivel}] [{categoria}] {mensaje}\n"
+        lineas = [(self.archivo_log, f"[{timestamp}] [{nivel}] [{categoria}] {mensaje}\n")]
         
+        if self.json_activo:
+            registro = {'ts': timestamp, 'nivel': nivel, 'categoria': categoria,
+                        'evento': evento, 'mensaje': mensaje}
+            registro.update(campos)
+            lineas.append((self.archivo_json,
+                           json.dumps(registro, ensure_ascii=False, default=str) + "\n"))
+        
+        if not self.asincrono:
+            for archivo, linea in lineas:
+                self._escribir_lineas(archivo, [linea])
+            return
+        
+        self._iniciar_hilo()
+        for elemento in lineas:
+            self._cola.put(elemento)
+    
+    # ===================================================================
+    # ESCRITURA EN SEGUNDO PLANO
+    # ===================================================================
+    
+    @staticmethod
+    def _escribir_lineas(archivo, lineas):
+        """Agrega un bloque de líneas al archivo con una sola apertura"""
         try:
-            with open(self.archivo_log, 'a', encoding='utf-8') as f:
-                f.write(linea)
+            with open(archivo, 'a', encoding='utf-8') as f:
+                f.write("".join(lineas))
         except Exception as e:
             print(f"⚠️  Error al escribir log: {e}")
     
+    def _iniciar_hilo(self):
+        """Arranca el hilo escritor la primera vez que se necesita"""
+        if self._hilo is not None and self._hilo.is_alive():
+            return
+        
+        with self._lock_hilo:
+            if self._hilo is None or not self._hilo.is_alive():
+                self._hilo = threading.Thread(
+                    target=self._procesar_cola, name="logger", daemon=True
+                )
+                self._hilo.start()
+    
+    def _procesar_cola(self):
+        """
+        Bucle del hilo escritor
+        
+        Espera la primera línea y sigue juntando hasta LOG_LOTE_MAX líneas
+        o hasta cumplir latencia_max; luego escribe el lote agrupado por
+        archivo. Un threading.Event en la cola marca un flush pendiente y
+        None detiene el hilo.
+        """
+        while True:
+            elemento = self._cola.get()
+            lote = []
+            avisos = []
+            detener = False
+            limite = time.monotonic() + self.latencia_max
+            
+            while True:
+                if elemento is None:
+                    detener = True
+                elif isinstance(elemento, threading.Event):
+                    avisos.append(elemento)
+                else:
+                    lote.append(elemento)
+                
+                if detener or avisos or len(lote) >= LOG_LOTE_MAX:
+                    break
+                
+                espera = limite - time.monotonic()
+                if espera <= 0:
+                    break
+                
+                try:
+                    elemento = self._cola.get(timeout=espera)
+                except queue.Empty:
+                    break
+            
+            # Agrupar por archivo (el día puede cambiar dentro de un lote)
+            por_archivo = {}
+            for archivo, linea in lote:
+                por_archivo.setdefault(archivo, []).append(linea)
+            
+            for archivo, lineas in por_archivo.items():
+                self._escribir_lineas(archivo, lineas)
+            
+            for aviso in avisos:
+                aviso.set()
+            
+            if detener:
+                return
+    
+    def flush(self, timeout=5.0):
+        """
+        Espera a que todas las líneas encoladas estén escritas
+        
+        Args:
+            timeout: Segundos máximos de espera
+        
+        Returns:
+            bool: True si la cola quedó vacía a tiempo
+        """
+        if self._hilo is None or not self._hilo.is_alive():
+            return True
+        
+        aviso = threading.Event()
+        self._cola.put(aviso)
+        return aviso.wait(timeout)
+    
+    def cerrar(self):
+        """Escribe lo pendiente y detiene el hilo escritor (se llama al salir)"""
+        if self._hilo is None or not self._hilo.is_alive():
+            return
+        
+        self._cola.put(None)
+        self._hilo.join(timeout=5.0)
+    
     # ===================================================================
     # MÉTODOS DE LOGGING
     # ===================================================================
@@ -80,7 +223,8 @@ class Logger:
     def error(self, mensaje, detalle="", categoria="general"):
         """Log de error"""
         mensaje_completo = f"{mensaje} | {detalle}" if detalle else mensaje
-        self._escribir_log("ERROR", mensaje_completo, categoria)
+        self._escribir_log("ERROR", mensaje_completo, categoria,
+                           evento="error", error=mensaje, detalle=detalle)
     
     def separador(self, categoria="general"):
         """Escribe un separador en el log"""
@@ -96,7 +240,9 @@ class Logger:
                   f"Duración: {dias} días | "
                   f"Capital: ${capital_inicial:.2f} | "
                   f"Período: {fecha_inicio} → {fecha_fin}")
-        self.info(mensaje, "ciclos")
+        self._escribir_log("INFO", mensaje, "ciclos", evento="ciclo_creado",
+                           ciclo_id=ciclo_id, dias=dias, capital_inicial=capital_inicial,
+                           fecha_inicio=fecha_inicio, fecha_fin=fecha_fin)
     
     def ciclo_cerrado(self, ciclo_id, dias_operados, inversion_inicial, 
                      ganancia_total, capital_final):
@@ -108,7 +254,10 @@ class Logger:
                   f"Ganancia: ${ganancia_total:.2f} | "
                   f"Capital final: ${capital_final:.2f} | "
                   f"ROI: {roi:.2f}%")
-        self.info(mensaje, "ciclos")
+        self._escribir_log("INFO", mensaje, "ciclos", evento="ciclo_cerrado",
+                           ciclo_id=ciclo_id, dias_operados=dias_operados,
+                           inversion_inicial=inversion_inicial, ganancia_total=ganancia_total,
+                           capital_final=capital_final, roi=round(roi, 4))
     
     def dia_iniciado(self, ciclo_id, dia_num, capital_inicial, criptos_disponibles):
         """Log de día iniciado"""
@@ -118,7 +267,10 @@ class Logger:
                   f"Ciclo: #{ciclo_id} | "
                   f"Capital: ${capital_inicial:.2f} | "
                   f"Criptos: {criptos_str}")
-        self.info(mensaje, "operaciones")
+        self._escribir_log("INFO", mensaje, "operaciones", evento="dia_iniciado",
+                           ciclo_id=ciclo_id, dia_num=dia_num, capital_inicial=capital_inicial,
+                           criptos=[{'cripto': c[0], 'cantidad': c[1], 'valor_usd': c[2]}
+                                    for c in criptos_disponibles])
     
     def dia_cerrado(self, ciclo_id, dia_num, capital_inicial, capital_final, 
                    ganancia_dia, ventas_realizadas):
@@ -131,7 +283,10 @@ class Logger:
                   f"Ganancia: ${ganancia_dia:.2f} | "
                   f"ROI: {roi_dia:.2f}% | "
                   f"Ventas: {ventas_realizadas}")
-        self.info(mensaje, "operaciones")
+        self._escribir_log("INFO", mensaje, "operaciones", evento="dia_cerrado",
+                           ciclo_id=ciclo_id, dia_num=dia_num, capital_inicial=capital_inicial,
+                           capital_final=capital_final, ganancia=ganancia_dia,
+                           roi=round(roi_dia, 4), ventas=ventas_realizadas)
     
     def precio_definido(self, cripto, costo_promedio, comision, ganancia_objetivo,
                        precio_publicado, ganancia_neta_estimada):
@@ -142,10 +297,13 @@ class Logger:
                   f"Objetivo: {ganancia_objetivo}% | "
                   f"Precio publicado: ${precio_publicado:.4f} | "
                   f"Ganancia estimada: {ganancia_neta_estimada:.2f}%")
-        self.info(mensaje, "operaciones")
+        self._escribir_log("INFO", mensaje, "operaciones", evento="precio_definido",
+                           cripto=cripto, costo_promedio=costo_promedio, comision=comision,
+                           ganancia_objetivo=ganancia_objetivo, precio_publicado=precio_publicado,
+                           ganancia_neta_estimada=ganancia_neta_estimada)
     
     def venta_registrada(self, venta_num, cripto, cantidad_vendida, precio_unitario,
-                        monto_total, comision_pagada, ganancia_neta):
+                        monto_total, comision_pagada, ganancia_neta, ciclo_id=None):
         """Log de venta registrada"""
         mensaje = (f"Venta #{venta_num} | "
                   f"{cantidad_vendida:.8f} {cripto} | "
@@ -153,7 +311,11 @@ class Logger:
                   f"Total: ${monto_total:.2f} | "
                   f"Comisión: ${comision_pagada:.2f} | "
                   f"Ganancia: ${ganancia_neta:.2f}")
-        self.info(mensaje, "operaciones")
+        self._escribir_log("INFO", mensaje, "operaciones", evento="venta_registrada",
+                           ciclo_id=ciclo_id, venta_num=venta_num, cripto=cripto,
+                           cantidad=cantidad_vendida, precio_unitario=precio_unitario,
+                           monto_total=monto_total, comision=comision_pagada,
+                           ganancia_neta=ganancia_neta)
     
     def boveda_compra(self, cripto, cantidad, monto_usd, tasa, ciclo_id):
         """Log de compra en bóveda"""
@@ -162,7 +324,9 @@ class Logger:
                   f"{cantidad:.8f} {cripto} | "
                   f"Monto: ${monto_usd:.2f} | "
                   f"Tasa: ${tasa:.4f}")
-        self.info(mensaje, "boveda")
+        self._escribir_log("INFO", mensaje, "boveda", evento="boveda_compra",
+                           ciclo_id=ciclo_id, cripto=cripto, cantidad=cantidad,
+                           monto_usd=monto_usd, tasa=tasa)
     
     def boveda_transferencia(self, cripto, cantidad, valor_usd, origen, destino):
         """Log de transferencia entre ciclos"""
@@ -170,7 +334,9 @@ class Logger:
                   f"{cantidad:.8f} {cripto} | "
                   f"Valor: ${valor_usd:.2f} | "
                   f"Ciclo #{origen} → Ciclo #{destino}")
-        self.info(mensaje, "boveda")
+        self._escribir_log("INFO", mensaje, "boveda", evento="boveda_transferencia",
+                           ciclo_id=destino, ciclo_origen=origen, cripto=cripto,
+                           cantidad=cantidad, valor_usd=valor_usd)
 
 
 # ===================================================================
@@ -199,6 +365,8 @@ if __name__ == "__main__":
     log.ciclo_creado(1, 15, 1000.0, "2025-01-01", "2025-01-15")
     log.venta_registrada(1, "USDT", 100.0, 1.0235, 102.35, 0.36, 1.99)
     
+    log.flush()
+    
     print(f"\n✅ Logs escritos en: {log.archivo_log}")
     print("\nContenido:")
     print("-"*70)
@@ -0,0 +1,479 @@
+# -*- coding: utf-8 -*-
+"""
+=============================================================================
+MÓDULO DE MIGRACIONES DE ESQUEMA
+=============================================================================
+Lleva la base de datos a la última versión del esquema con pasos
+ordenados e idempotentes. La versión aplicada se guarda en
+PRAGMA user_version, así al arrancar solo se lee un número y no se
+vuelve a ejecutar DDL.
+
+Cada paso puede:
+- ejecutarse en una sola transacción (DDL y datos pequeños), o
+- confirmar por lotes (rellenos sobre tablas grandes) para no bloquear
+  a los demás procesos durante toda la migración; si se interrumpe, al
+  reintentar continúa donde quedó.
+
+Para cambiar el esquema se agrega un paso al final de MIGRACIONES;
+nunca se modifica uno ya publicado.
+"""
+
+import sqlite3
+import threading
+from collections import namedtuple
+from typing import List, Optional
+from core.resumenes import crear_tablas_resumen, reconstruir_resumenes
+
+
+# ===================================================================
+# CONFIGURACIÓN
+# ===================================================================
+
+# Filas por lote en los pasos que rellenan tablas grandes
+LOTE_MIGRACION = 5000
+
+# Montos de ventas que también se guardan como INTEGER en micro-unidades
+# (columna <campo>_micro, 1 USD = 1_000_000) para sumas exactas
+CAMPOS_MICRO_VENTAS = ('costo_total', 'monto_venta', 'comision',
+                       'efectivo_recibido', 'ganancia_bruta', 'ganancia_neta')
+
+# Índices (nombre, tabla(columnas)). Los compuestos cubren los filtros
+# frecuentes: bóveda por ciclo+cripto, día abierto/cerrado del ciclo,
+# efectivo por día/ciclo, compras del ciclo por fecha...
+INDICES = [
+    ("idx_dias_ciclo_estado", "dias(ciclo_id, estado, numero_dia)"),
+    ("idx_ventas_dia", "ventas(dia_id)"),
+    ("idx_ventas_cripto", "ventas(cripto_id)"),
+    ("idx_boveda_ciclo_cripto", "boveda_ciclo(ciclo_id, cripto_id, cantidad, precio_promedio)"),
+    ("idx_compras_ciclo_fecha", "compras(ciclo_id, fecha)"),
+    ("idx_compras_fecha", "compras(fecha)"),
+    ("idx_efectivo_dia", "efectivo_banco(dia_id, monto)"),
+    ("idx_efectivo_ciclo", "efectivo_banco(ciclo_id, monto)"),
+    ("idx_ciclos_estado", "ciclos(estado, id)"),
+    ("idx_notas_tipo", "notas(tipo)"),
+    ("idx_notas_referencia", "notas(tipo, referencia_id)"),
+    ("idx_alertas_leida", "alertas(leida)"),
+    ("idx_alertas_tipo_referencia", "alertas(tipo, referencia_id, leida)"),
+    ("idx_alertas_fecha", "alertas(fecha_creacion)"),
+]
+
+# Índices reemplazados por un compuesto que empieza con las mismas columnas
+INDICES_OBSOLETOS = ('idx_dias_ciclo', 'idx_boveda_ciclo', 'idx_compras_ciclo')
+
+CRIPTOS_INICIALES = [
+    ('Tether', 'USDT', 'stablecoin', 'Stablecoin vinculada al dólar estadounidense'),
+    ('USD Coin', 'USDC', 'stablecoin', 'Stablecoin respaldada por dólares en reserva'),
+    ('Binance USD', 'BUSD', 'stablecoin', 'Stablecoin emitida por Binance'),
+    ('Bitcoin', 'BTC', 'criptomoneda', 'La primera y más conocida criptomoneda'),
+    ('Ethereum', 'ETH', 'criptomoneda', 'Plataforma blockchain con contratos inteligentes'),
+    ('Binance Coin', 'BNB', 'criptomoneda', 'Token nativo de Binance'),
+    ('Dai', 'DAI', 'stablecoin', 'Stablecoin descentralizada'),
+]
+
+ALERTAS_INICIALES = [
+    ('dia_abierto_largo', 1, 24),
+    ('limite_ventas', 1, None),
+    ('capital_bajo', 1, 100),
+    ('ganancia_negativa', 1, None),
+    ('ciclo_por_terminar', 1, 3),
+    ('sin_operar', 1, 3),
+    ('objetivo_alcanzado', 1, None),
+    ('rendimiento_bajo', 1, 1.0),
+]
+
+
+# ===================================================================
+# ESQUEMA BASE (v1)
+# ===================================================================
+
+SQL_TABLAS_BASE = [
+    """
+        CREATE TABLE IF NOT EXISTS config (
+            id INTEGER PRIMARY KEY,
+            comision_default REAL DEFAULT 0.35,
+            ganancia_neta_default REAL DEFAULT 2.0,
+            modo_comision TEXT DEFAULT 'manual',
+            api_comision_activa INTEGER DEFAULT 0,
+            limite_ventas_min INTEGER DEFAULT 5,
+            limite_ventas_max INTEGER DEFAULT 8,
+            actualizado TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS criptomonedas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nombre TEXT NOT NULL,
+            simbolo TEXT NOT NULL UNIQUE,
+            tipo TEXT NOT NULL,
+            descripcion TEXT
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS ciclos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            fecha_inicio DATE NOT NULL,
+            fecha_fin_estimada DATE NOT NULL,
+            fecha_cierre TIMESTAMP,
+            dias_planificados INTEGER NOT NULL,
+            dias_operados INTEGER DEFAULT 0,
+            inversion_inicial REAL DEFAULT 0,
+            capital_final REAL,
+            ganancia_total REAL DEFAULT 0,
+            roi_total REAL,
+            estado TEXT DEFAULT 'activo',
+            CHECK(estado IN ('activo', 'cerrado'))
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS dias (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ciclo_id INTEGER NOT NULL,
+            numero_dia INTEGER NOT NULL,
+            fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            fecha_cierre TIMESTAMP,
+            capital_inicial REAL NOT NULL,
+            capital_final REAL,
+            efectivo_recibido REAL DEFAULT 0,
+            cripto_operada_id INTEGER,
+            precio_publicado REAL,
+            comisiones_pagadas REAL DEFAULT 0,
+            ganancia_bruta REAL DEFAULT 0,
+            ganancia_neta REAL DEFAULT 0,
+            estado TEXT DEFAULT 'abierto',
+            FOREIGN KEY (ciclo_id) REFERENCES ciclos(id),
+            FOREIGN KEY (cripto_operada_id) REFERENCES criptomonedas(id),
+            CHECK(estado IN ('abierto', 'cerrado'))
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS ventas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            dia_id INTEGER NOT NULL,
+            cripto_id INTEGER NOT NULL,
+            cantidad REAL NOT NULL,
+            precio_unitario REAL NOT NULL,
+            costo_total REAL NOT NULL,
+            monto_venta REAL NOT NULL,
+            comision REAL NOT NULL,
+            efectivo_recibido REAL NOT NULL,
+            ganancia_bruta REAL NOT NULL,
+            ganancia_neta REAL NOT NULL,
+            fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (dia_id) REFERENCES dias(id),
+            FOREIGN KEY (cripto_id) REFERENCES criptomonedas(id)
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS boveda_ciclo (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ciclo_id INTEGER NOT NULL,
+            cripto_id INTEGER NOT NULL,
+            cantidad REAL NOT NULL DEFAULT 0,
+            precio_promedio REAL NOT NULL DEFAULT 0,
+            FOREIGN KEY (ciclo_id) REFERENCES ciclos(id),
+            FOREIGN KEY (cripto_id) REFERENCES criptomonedas(id),
+            UNIQUE(ciclo_id, cripto_id)
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS compras (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ciclo_id INTEGER NOT NULL,
+            cripto_id INTEGER NOT NULL,
+            cantidad REAL NOT NULL,
+            monto_usd REAL NOT NULL,
+            tasa REAL NOT NULL,
+            fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (ciclo_id) REFERENCES ciclos(id),
+            FOREIGN KEY (cripto_id) REFERENCES criptomonedas(id)
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS efectivo_banco (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            ciclo_id INTEGER NOT NULL,
+            dia_id INTEGER,
+            monto REAL NOT NULL,
+            concepto TEXT,
+            fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (ciclo_id) REFERENCES ciclos(id),
+            FOREIGN KEY (dia_id) REFERENCES dias(id)
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS apis_config (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nombre TEXT NOT NULL,
+            plataforma TEXT NOT NULL,
+            api_key TEXT,
+            api_secret TEXT,
+            activa INTEGER DEFAULT 1,
+            tipo TEXT,
+            fecha_registro TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            ultima_actualizacion TIMESTAMP
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS comisiones_plataforma (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            plataforma TEXT NOT NULL,
+            tipo_operacion TEXT NOT NULL,
+            comision REAL NOT NULL,
+            fecha_actualizacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS notas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tipo TEXT NOT NULL,
+            referencia_id INTEGER,
+            titulo TEXT NOT NULL,
+            contenido TEXT NOT NULL,
+            prioridad TEXT DEFAULT 'normal',
+            etiquetas TEXT,
+            fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            fecha_modificacion TIMESTAMP,
+            autor TEXT DEFAULT 'Operador'
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS alertas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tipo TEXT NOT NULL,
+            nivel TEXT NOT NULL,
+            titulo TEXT NOT NULL,
+            mensaje TEXT NOT NULL,
+            referencia_tipo TEXT,
+            referencia_id INTEGER,
+            leida INTEGER DEFAULT 0,
+            fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            fecha_lectura TIMESTAMP
+        )
+    """,
+    """
+        CREATE TABLE IF NOT EXISTS config_alertas (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tipo_alerta TEXT NOT NULL UNIQUE,
+            activa INTEGER DEFAULT 1,
+            umbral REAL,
+            parametros TEXT
+        )
+    """,
+]
+
+
+# ===================================================================
+# UTILIDADES PARA PASOS
+# ===================================================================
+
+def columnas_tabla(conn: sqlite3.Connection, tabla: str) -> set:
+    """Nombres de las columnas de una tabla"""
+    return {fila[1] for fila in conn.execute(f"PRAGMA table_info({tabla})")}
+
+
+def agregar_columna(conn: sqlite3.Connection, tabla: str, columna: str, tipo: str) -> bool:
+    """
+    Agrega una columna si no existe (ALTER TABLE no reescribe la tabla)
+    
+    Returns:
+        bool: True si se agregó
+    """
+    if columna in columnas_tabla(conn, tabla):
+        return False
+    conn.execute(f"ALTER TABLE {tabla} ADD COLUMN {columna} {tipo}")
+    return True
+
+
+def actualizar_en_lotes(conn: sqlite3.Connection, tabla: str, asignaciones: str,
+                        condicion: str, lote: int = LOTE_MIGRACION) -> int:
+    """
+    Ejecuta un UPDATE por lotes de filas, confirmando cada lote
+    
+    La condición debe dejar de cumplirse en las filas ya actualizadas
+    (p. ej. "columna IS NULL"), así el relleno es reanudable.
+    
+    Args:
+        conn: Conexión SQLite
+        tabla: Tabla a actualizar
+        asignaciones: Parte SET del UPDATE
+        condicion: Filas pendientes
+        lote: Filas por lote
+    
+    Returns:
+        int: Filas actualizadas
+    """
+    total = 0
+    
+    while True:
+        cursor = conn.execute(f"""
+            UPDATE {tabla} SET {asignaciones}
+            WHERE rowid IN (SELECT rowid FROM {tabla} WHERE {condicion} LIMIT ?)
+        """, (lote,))
+        conn.commit()
+        
+        total += cursor.rowcount
+        if cursor.rowcount < lote:
+            return total
+
+
+# ===================================================================
+# PASOS DE MIGRACIÓN
+# ===================================================================
+
+def _v1_esquema_base(conn: sqlite3.Connection):
+    """Tablas del sistema y datos iniciales (config, criptos, alertas)"""
+    for sql in SQL_TABLAS_BASE:
+        conn.execute(sql)
+    
+    conn.execute("""
+        INSERT OR IGNORE INTO config (id, comision_default, ganancia_neta_default)
+        VALUES (1, 0.35, 2.0)
+    """)
+    
+    if conn.execute("SELECT COUNT(*) FROM criptomonedas").fetchone()[0] == 0:
+        conn.executemany("""
+            INSERT INTO criptomonedas (nombre, simbolo, tipo, descripcion)
+            VALUES (?, ?, ?, ?)
+        """, CRIPTOS_INICIALES)
+    
+    conn.executemany("""
+        INSERT OR IGNORE INTO config_alertas (tipo_alerta, activa, umbral)
+        VALUES (?, ?, ?)
+    """, ALERTAS_INICIALES)
+
+
+def _v2_montos_micro(conn: sqlite3.Connection):
+    """Columnas *_micro en ventas, rellenadas por lotes"""
+    for campo in CAMPOS_MICRO_VENTAS:
+        agregar_columna(conn, 'ventas', f"{campo}_micro", 'INTEGER')
+    
+    asignaciones = ", ".join(
+        f"{campo}_micro = COALESCE({campo}_micro, CAST(ROUND({campo} * 1000000) AS INTEGER))"
+        for campo in CAMPOS_MICRO_VENTAS
+    )
+    condicion = " OR ".join(f"{campo}_micro IS NULL" for campo in CAMPOS_MICRO_VENTAS)
+    
+    actualizar_en_lotes(conn, 'ventas', asignaciones, condicion)
+
+
+def _v3_indices(conn: sqlite3.Connection):
+    """Índices compuestos para los filtros frecuentes"""
+    for nombre, definicion in INDICES:
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {nombre} ON {definicion}")
+    
+    for nombre in INDICES_OBSOLETOS:
+        conn.execute(f"DROP INDEX IF EXISTS {nombre}")
+    
+    # Refrescar estadísticas para que el planificador use los índices nuevos
+    conn.execute("ANALYZE")
+
+
+def _v4_tablas_resumen(conn: sqlite3.Connection):
+    """Tablas resumen con sus triggers, llenadas con el historial"""
+    crear_tablas_resumen(conn)
+    reconstruir_resumenes(conn)
+
+
+Migracion = namedtuple('Migracion', ['version', 'descripcion', 'aplicar', 'transaccional'])
+
+MIGRACIONES = [
+    Migracion(1, "Esquema base y datos iniciales", _v1_esquema_base, True),
+    Migracion(2, "Montos de ventas en micro-unidades", _v2_montos_micro, False),
+    Migracion(3, "Índices compuestos", _v3_indices, True),
+    Migracion(4, "Tablas resumen", _v4_tablas_resumen, True),
+]
+
+ULTIMA_VERSION = MIGRACIONES[-1].version
+
+
+# ===================================================================
+# EJECUCIÓN
+# ===================================================================
+
+def version_actual(conn: sqlite3.Connection) -> int:
+    """Versión del esquema guardada en la BD (0 = sin migraciones)"""
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrar(conn: sqlite3.Connection, hasta: Optional[int] = None) -> List[Migracion]:
+    """
+    Aplica en orden los pasos pendientes
+    
+    Cada paso transaccional se aplica junto con su número de versión en una
+    transacción BEGIN IMMEDIATE; si otro proceso ya lo aplicó mientras se
+    esperaba el bloqueo, se omite. Los pasos por lotes son idempotentes y
+    la versión se registra al terminar.
+    
+    Args:
+        conn: Conexión SQLite sin transacción abierta
+        hasta: Versión máxima a aplicar (None = la última)
+    
+    Returns:
+        list: Migraciones aplicadas
+    """
+    hasta = ULTIMA_VERSION if hasta is None else hasta
+    aplicadas = []
+    
+    for migracion in MIGRACIONES:
+        if migracion.version > hasta or migracion.version <= version_actual(conn):
+            continue
+        
+        if migracion.transaccional:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if migracion.version <= version_actual(conn):
+                    conn.rollback()
+                    continue
+                migracion.aplicar(conn)
+                conn.execute(f"PRAGMA user_version = {migracion.version}")
+                conn.commit()
+            except Exception:
+                conn.rollback()
+                raise
+        else:
+            migracion.aplicar(conn)
+            conn.execute(f"PRAGMA user_version = {migracion.version}")
+            conn.commit()
+        
+        aplicadas.append(migracion)
+    
+    return aplicadas
+
+
+_esquema_verificado = False
+_lock_esquema = threading.Lock()
+
+
+def asegurar_esquema(forzar: bool = False) -> List[Migracion]:
+    """
+    Aplica las migraciones pendientes sobre la BD del sistema
+    
+    Solo consulta la versión la primera vez por proceso; las siguientes
+    llamadas no tocan la BD (salvo con forzar=True, p. ej. tras restaurar
+    un backup).
+    
+    Args:
+        forzar: Volver a comprobar la versión aunque ya se haya hecho
+    
+    Returns:
+        list: Migraciones aplicadas
+    """
+    global _esquema_verificado
+    
+    # Importación diferida: inicializar_bd usa este módulo antes de que exista la BD
+    from core.db_manager import db
+    from core.logger import log
+    
+    with _lock_esquema:
+        if _esquema_verificado and not forzar:
+            return []
+        
+        with db.get_cursor() as cursor:
+            aplicadas = migrar(cursor.connection)
+        
+        _esquema_verificado = True
+    
+    for migracion in aplicadas:
+        log.info(f"Migración v{migracion.version} aplicada: {migracion.descripcion}", categoria='general')
+    
+    return aplicadas
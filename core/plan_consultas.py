@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+"""
+=============================================================================
+MÓDULO DE AUDITORÍA DE PLANES DE CONSULTA
+=============================================================================
+Registro de las consultas frecuentes del sistema y auditoría con
+EXPLAIN QUERY PLAN: marca las que recorren una tabla completa en vez de
+usar un índice.
+
+Al agregar una consulta en caliente (por venta, por día o por pantalla)
+conviene definirla como constante SQL_* en su módulo y registrarla aquí
+para que la auditoría la cubra.
+"""
+
+import re
+import sqlite3
+from typing import Dict, List, Tuple
+
+# Las consultas en caliente se auditan desde las mismas constantes que
+# ejecuta el código, no desde copias
+from core.queries import (
+    SQL_CICLO_ACTIVO, SQL_DIA_ABIERTO, SQL_CONTAR_DIAS_CICLO, SQL_ULTIMO_DIA_CERRADO,
+    SQL_CONTAR_VENTAS_DIA, SQL_VENTAS_DIA,
+    SQL_CAPITAL_BOVEDA, SQL_CRIPTOS_BOVEDA, SQL_CANTIDAD_CRIPTO,
+    SQL_RESUMEN_CICLO, SQL_RESUMEN_DIA, SQL_RESUMEN_CRIPTOS_CICLO,
+    SQL_EFECTIVO_CICLO, SQL_EFECTIVO_DIA
+)
+from modules.dias import (
+    SQL_CONTEXTO_VENTA, SQL_DESCONTAR_BOVEDA,
+    SQL_CRIPTOS_DISPONIBLES, SQL_RESUMEN_DIAS, SQL_SIGUIENTE_DIA
+)
+from modules.boveda import SQL_HISTORIAL_COMPRAS
+from features.alertas import (
+    SQL_ALERTA_PENDIENTE, SQL_ALERTA_PENDIENTE_HOY, SQL_ALERTAS_NO_LEIDAS,
+    SQL_ALERTAS_RECIENTES, SQL_ELIMINAR_ALERTAS_ANTIGUAS
+)
+from features.reportes import SQL_VENTAS_CICLO, SQL_VENTAS_CICLO_CERRADOS, SQL_DIAS_CICLO_CSV
+from features.graficos import SQL_DIAS_DASHBOARD, SQL_BOVEDA
+
+
+# ===================================================================
+# CONFIGURACIÓN
+# ===================================================================
+
+# Tablas de catálogo con pocas filas: recorrerlas completas es más barato
+# que usar un índice, así que no se marcan
+TABLAS_PEQUEÑAS = {'config', 'criptomonedas', 'config_alertas', 'apis_config',
+                   'comisiones_plataforma', 'resumen_global'}
+
+# Paso de tabla completa (sin USING INDEX). Desde SQLite 3.36 el plan
+# muestra el alias si lo hay ("SCAN v", "SCAN ventas"); antes mostraba
+# "SCAN TABLE ventas AS v". El alias se traduce con PATRON_ALIAS.
+PATRON_ESCANEO = re.compile(r"^SCAN (?:TABLE )?(\w+)(?: AS \w+)?$")
+
+# "FROM ventas v", "JOIN criptomonedas AS c", "UPDATE dias": tabla y alias
+PATRON_ALIAS = re.compile(
+    r"\b(?:FROM|JOIN|UPDATE)\s+(\w+)"
+    r"(?:\s+(?:AS\s+)?(?!(?:WHERE|JOIN|LEFT|RIGHT|INNER|OUTER|CROSS|NATURAL|ON|USING|"
+    r"ORDER|GROUP|HAVING|LIMIT|UNION|EXCEPT|INTERSECT|WINDOW|SET|VALUES)\b)(\w+))?",
+    re.IGNORECASE
+)
+
+
+# ===================================================================
+# REGISTRO DE CONSULTAS
+# ===================================================================
+
+# (origen, sql, parámetros de ejemplo)
+REGISTRO_CONSULTAS: List[Tuple[str, str, tuple]] = [
+    # core/queries.py
+    ("queries.obtener_ciclo_activo", SQL_CICLO_ACTIVO, ()),
+    ("queries.obtener_dia_abierto", SQL_DIA_ABIERTO, (1,)),
+    ("queries.contar_dias_ciclo", SQL_CONTAR_DIAS_CICLO, (1,)),
+    ("queries.obtener_ultimo_dia_cerrado", SQL_ULTIMO_DIA_CERRADO, (1,)),
+    ("queries.contar_ventas_dia", SQL_CONTAR_VENTAS_DIA, (1,)),
+    ("queries.obtener_ventas_dia", SQL_VENTAS_DIA, (1,)),
+    ("queries.obtener_capital_boveda", SQL_CAPITAL_BOVEDA, (1,)),
+    ("queries.obtener_criptos_boveda", SQL_CRIPTOS_BOVEDA, (1,)),
+    ("queries.obtener_cantidad_cripto", SQL_CANTIDAD_CRIPTO, (1, 1)),
+    ("queries.obtener_efectivo_total", SQL_EFECTIVO_CICLO, (1,)),
+    ("queries.obtener_efectivo_dia", SQL_EFECTIVO_DIA, (1,)),
+    ("queries.obtener_resumen_ciclo", SQL_RESUMEN_CICLO, (1,)),
+    ("queries.obtener_resumen_dia", SQL_RESUMEN_DIA, (1,)),
+    ("queries.obtener_resumen_criptos_ciclo", SQL_RESUMEN_CRIPTOS_CICLO, (1,)),
+    
+    # modules/dias.py
+    ("dias.registrar_venta (contexto)", SQL_CONTEXTO_VENTA, (1, 1)),
+    ("dias.registrar_venta (bóveda)", SQL_DESCONTAR_BOVEDA, (1, 1, 1, 1)),
+    ("dias.obtener_criptos_disponibles", SQL_CRIPTOS_DISPONIBLES, (1,)),
+    ("dias.obtener_resumen_dias", SQL_RESUMEN_DIAS, (1,)),
+    ("dias.iniciar_dia (siguiente día)", SQL_SIGUIENTE_DIA, (1,)),
+    
+    # modules/boveda.py
+    ("boveda.ver_historial", SQL_HISTORIAL_COMPRAS, ()),
+    
+    # features/alertas.py
+    ("alertas.alerta_existente", SQL_ALERTA_PENDIENTE, ('capital_bajo', 1)),
+    ("alertas.alerta_existente (hoy)", SQL_ALERTA_PENDIENTE_HOY, ('sin_operar', 1)),
+    ("alertas.obtener_alertas_no_leidas", SQL_ALERTAS_NO_LEIDAS, (20,)),
+    ("alertas.obtener_alertas_recientes", SQL_ALERTAS_RECIENTES, (24, 50)),
+    ("alertas.eliminar_alertas_antiguas", SQL_ELIMINAR_ALERTAS_ANTIGUAS, (30,)),
+    
+    # features/reportes.py
+    ("reportes._stream_ventas_ciclo", SQL_VENTAS_CICLO, (1,)),
+    ("reportes._stream_ventas_ciclo (días cerrados)", SQL_VENTAS_CICLO_CERRADOS, (1,)),
+    ("reportes.generar_reporte_ciclo_csv", SQL_DIAS_CICLO_CSV, (1,)),
+    
+    # features/graficos.py
+    ("graficos._leer_dias_dashboard", SQL_DIAS_DASHBOARD, (1,)),
+    ("graficos._leer_boveda", SQL_BOVEDA, (1,)),
+]
+
+
+# ===================================================================
+# AUDITORÍA
+# ===================================================================
+
+def obtener_plan(conn: sqlite3.Connection, sql: str, params: tuple = ()) -> List[str]:
+    """
+    Ejecuta EXPLAIN QUERY PLAN y devuelve el detalle de cada paso
+    
+    Args:
+        conn: Conexión SQLite
+        sql: Consulta a analizar
+        params: Parámetros de ejemplo
+    
+    Returns:
+        list: Texto de cada paso del plan
+    """
+    # La última columna es el detalle en todas las versiones de SQLite
+    return [fila[-1] for fila in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+
+
+def tablas_por_alias(sql: str) -> Dict[str, str]:
+    """
+    Tabla a la que se refiere cada alias de la consulta
+    
+    Args:
+        sql: Consulta SQL
+    
+    Returns:
+        dict: {alias: tabla}; cada tabla también se mapea a sí misma
+    """
+    tablas = {}
+    
+    for tabla, alias in PATRON_ALIAS.findall(sql):
+        tablas[tabla] = tabla
+        if alias:
+            tablas[alias] = tabla
+    
+    return tablas
+
+
+def escaneos_completos(plan: List[str], sql: str = "") -> List[str]:
+    """
+    Tablas que el plan recorre completas (sin índice)
+    
+    Args:
+        plan: Detalle devuelto por obtener_plan
+        sql: Consulta del plan, para traducir los alias a tablas
+    
+    Returns:
+        list: Nombres de tabla (sin las de TABLAS_PEQUEÑAS)
+    """
+    alias = tablas_por_alias(sql)
+    tablas = []
+    
+    for paso in plan:
+        coincidencia = PATRON_ESCANEO.match(paso.strip())
+        if not coincidencia:
+            continue
+        
+        tabla = alias.get(coincidencia.group(1), coincidencia.group(1))
+        if tabla not in TABLAS_PEQUEÑAS:
+            tablas.append(tabla)
+    
+    return tablas
+
+
+def auditar_consultas(conn: sqlite3.Connection) -> List[Dict]:
+    """
+    Analiza todas las consultas del registro
+    
+    Args:
+        conn: Conexión SQLite
+    
+    Returns:
+        list: [{'origen', 'plan', 'escaneos', 'error'}] en el orden del registro
+    """
+    resultados = []
+    
+    for origen, sql, params in REGISTRO_CONSULTAS:
+        resultado = {'origen': origen, 'plan': [], 'escaneos': [], 'error': None}
+        
+        try:
+            resultado['plan'] = obtener_plan(conn, sql, params)
+            resultado['escaneos'] = escaneos_completos(resultado['plan'], sql)
+        except sqlite3.Error as e:
+            resultado['error'] = str(e)
+        
+        resultados.append(resultado)
+    
+    return resultados
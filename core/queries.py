@@ -5,9 +5,198 @@ MÓDULO DE QUERIES
 =============================================================================
 Queries SQL reutilizables para evitar duplicación
 Todas las queries comunes en un solo lugar
+Las tablas de solo-lectura frecuente (config, criptomonedas, config_alertas)
+se sirven desde una caché en memoria con invalidación explícita
 """
 
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
 from core.db_manager import db
+from core.resumenes import convertir_montos
+
+
+# ===================================================================
+# CONFIGURACIÓN
+# ===================================================================
+
+# Segundos que vive una entrada de la caché; 0 = sin vencimiento
+# (solo se invalida explícitamente desde los módulos que escriben)
+CACHE_TTL = float(os.environ.get('ARBITRAJE_CACHE_TTL', '60'))
+
+GRUPOS_CACHE = ('config', 'criptomonedas', 'config_alertas')
+
+
+# ===================================================================
+# CONSULTAS
+# ===================================================================
+# Consultas en caliente (por venta, por día o por pantalla);
+# core/plan_consultas.py audita estas mismas constantes
+
+# Ciclos y días
+SQL_CICLO_ACTIVO = """
+    SELECT * FROM ciclos
+    WHERE estado = 'activo'
+    ORDER BY id DESC
+    LIMIT 1
+"""
+
+SQL_DIA_ABIERTO = """
+    SELECT * FROM dias
+    WHERE ciclo_id = ? AND estado = 'abierto'
+    ORDER BY numero_dia DESC
+    LIMIT 1
+"""
+
+SQL_CONTAR_DIAS_CICLO = """
+    SELECT COUNT(*) as total
+    FROM dias
+    WHERE ciclo_id = ?
+"""
+
+SQL_ULTIMO_DIA_CERRADO = """
+    SELECT * FROM dias
+    WHERE ciclo_id = ? AND estado = 'cerrado'
+    ORDER BY numero_dia DESC
+    LIMIT 1
+"""
+
+# Ventas
+SQL_CONTAR_VENTAS_DIA = "SELECT COUNT(*) as total FROM ventas WHERE dia_id = ?"
+
+SQL_VENTAS_DIA = """
+    SELECT v.*, c.nombre, c.simbolo
+    FROM ventas v
+    JOIN criptomonedas c ON v.cripto_id = c.id
+    WHERE v.dia_id = ?
+    ORDER BY v.fecha
+"""
+
+# Bóveda
+SQL_CAPITAL_BOVEDA = """
+    SELECT COALESCE(SUM(cantidad * precio_promedio), 0) as capital
+    FROM boveda_ciclo
+    WHERE ciclo_id = ?
+"""
+
+SQL_CRIPTOS_BOVEDA = """
+    SELECT 
+        c.id,
+        c.nombre,
+        c.simbolo,
+        bc.cantidad,
+        bc.precio_promedio,
+        (bc.cantidad * bc.precio_promedio) as valor_usd
+    FROM boveda_ciclo bc
+    JOIN criptomonedas c ON bc.cripto_id = c.id
+    WHERE bc.ciclo_id = ? AND bc.cantidad > 0
+    ORDER BY valor_usd DESC
+"""
+
+SQL_CANTIDAD_CRIPTO = """
+    SELECT cantidad
+    FROM boveda_ciclo
+    WHERE ciclo_id = ? AND cripto_id = ?
+"""
+
+# Resúmenes
+SQL_RESUMEN_CICLO = "SELECT * FROM resumen_ciclo WHERE ciclo_id = ?"
+SQL_RESUMEN_DIA = "SELECT * FROM resumen_dia WHERE dia_id = ?"
+
+SQL_RESUMEN_CRIPTOS_CICLO = """
+    SELECT rc.*, c.nombre, c.simbolo
+    FROM resumen_cripto rc
+    JOIN criptomonedas c ON c.id = rc.cripto_id
+    WHERE rc.ciclo_id = ?
+    ORDER BY rc.ganancia_neta_micro DESC
+"""
+
+# Efectivo
+SQL_EFECTIVO_CICLO = """
+    SELECT COALESCE(SUM(monto), 0) as total
+    FROM efectivo_banco
+    WHERE ciclo_id = ?
+"""
+
+SQL_EFECTIVO_DIA = """
+    SELECT COALESCE(SUM(monto), 0) as total
+    FROM efectivo_banco
+    WHERE dia_id = ?
+"""
+
+
+# ===================================================================
+# CACHÉ EN MEMORIA
+# ===================================================================
+
+class CacheConsultas:
+    """Caché por grupo de tabla con TTL opcional"""
+    
+    def __init__(self, ttl: Optional[float] = CACHE_TTL):
+        """
+        Args:
+            ttl: Segundos de vida de cada entrada (None o 0 = sin vencimiento)
+        """
+        self.ttl = ttl or None
+        self._entradas: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+    
+    def obtener(self, grupo: str, cargar: Callable):
+        """
+        Devuelve el valor del grupo, cargándolo si no está o venció
+        
+        Args:
+            grupo: Nombre del grupo (una tabla)
+            cargar: Función sin argumentos que lee el valor de la BD
+        
+        Returns:
+            Valor en caché
+        """
+        ahora = time.monotonic()
+        
+        with self._lock:
+            entrada = self._entradas.get(grupo)
+            if entrada and (self.ttl is None or ahora - entrada[1] < self.ttl):
+                self.aciertos += 1
+                return entrada[0]
+            self.fallos += 1
+        
+        # La carga se hace fuera del lock para no bloquear otros hilos
+        valor = cargar()
+        
+        with self._lock:
+            self._entradas[grupo] = (valor, ahora)
+        
+        return valor
+    
+    def invalidar(self, grupo: Optional[str] = None):
+        """
+        Descarta un grupo de la caché (o todos si no se indica)
+        
+        Args:
+            grupo: Nombre del grupo a descartar
+        """
+        with self._lock:
+            if grupo is None:
+                self._entradas.clear()
+            else:
+                self._entradas.pop(grupo, None)
+    
+    def estadisticas(self) -> Dict:
+        """Aciertos, fallos y grupos cargados"""
+        with self._lock:
+            return {
+                'aciertos': self.aciertos,
+                'fallos': self.fallos,
+                'grupos': sorted(self._entradas),
+                'ttl': self.ttl
+            }
+
+
+cache = CacheConsultas()
 
 
 class Queries:
@@ -19,11 +208,24 @@ class Queries:
     
     @staticmethod
     def obtener_config():
-        """Obtiene la configuración completa del sistema"""
-        return db.execute_query(
+        """Obtiene la configuración completa del sistema (desde caché)"""
+        config = cache.obtener('config', lambda: db.execute_query(
             "SELECT * FROM config WHERE id = 1",
             fetch_one=True
-        )
+        ))
+        return dict(config) if config else None
+    
+    @staticmethod
+    def invalidar_cache(grupo: Optional[str] = None):
+        """
+        Invalida la caché tras modificar config, criptomonedas o config_alertas
+        
+        Args:
+            grupo: 'config', 'criptomonedas', 'config_alertas' o None (todos)
+        """
+        if grupo is not None and grupo not in GRUPOS_CACHE:
+            raise ValueError(f"Grupo de caché desconocido: {grupo}")
+        cache.invalidar(grupo)
     
     @staticmethod
     def obtener_comision():
@@ -52,12 +254,7 @@ class Queries:
     @staticmethod
     def obtener_ciclo_activo():
         """Obtiene el ciclo activo"""
-        return db.execute_query("""
-            SELECT * FROM ciclos
-            WHERE estado = 'activo'
-            ORDER BY id DESC
-            LIMIT 1
-        """, fetch_one=True)
+        return db.execute_query(SQL_CICLO_ACTIVO, fetch_one=True)
     
     @staticmethod
     def obtener_ciclo_por_id(ciclo_id: int):
@@ -102,32 +299,18 @@ class Queries:
     @staticmethod
     def obtener_dia_abierto(ciclo_id: int):
         """Obtiene día abierto del ciclo"""
-        return db.execute_query("""
-            SELECT * FROM dias
-            WHERE ciclo_id = ? AND estado = 'abierto'
-            ORDER BY numero_dia DESC
-            LIMIT 1
-        """, (ciclo_id,), fetch_one=True)
+        return db.execute_query(SQL_DIA_ABIERTO, (ciclo_id,), fetch_one=True)
     
     @staticmethod
     def contar_dias_ciclo(ciclo_id: int):
         """Cuenta días de un ciclo"""
-        resultado = db.execute_query("""
-            SELECT COUNT(*) as total
-            FROM dias
-            WHERE ciclo_id = ?
-        """, (ciclo_id,), fetch_one=True)
+        resultado = db.execute_query(SQL_CONTAR_DIAS_CICLO, (ciclo_id,), fetch_one=True)
         return resultado['total']
     
     @staticmethod
     def obtener_ultimo_dia_cerrado(ciclo_id: int):
         """Obtiene último día cerrado"""
-        return db.execute_query("""
-            SELECT * FROM dias
-            WHERE ciclo_id = ? AND estado = 'cerrado'
-            ORDER BY numero_dia DESC
-            LIMIT 1
-        """, (ciclo_id,), fetch_one=True)
+        return db.execute_query(SQL_ULTIMO_DIA_CERRADO, (ciclo_id,), fetch_one=True)
     
     # ===================================================================
     # VENTAS
@@ -137,7 +320,7 @@ class Queries:
     def contar_ventas_dia(dia_id: int):
         """Cuenta ventas de un día"""
         resultado = db.execute_query(
-            "SELECT COUNT(*) as total FROM ventas WHERE dia_id = ?",
+            SQL_CONTAR_VENTAS_DIA,
             (dia_id,),
             fetch_one=True
         )
@@ -146,13 +329,7 @@ class Queries:
     @staticmethod
     def obtener_ventas_dia(dia_id: int):
         """Obtiene todas las ventas de un día"""
-        return db.execute_query("""
-            SELECT v.*, c.nombre, c.simbolo
-            FROM ventas v
-            JOIN criptomonedas c ON v.cripto_id = c.id
-            WHERE v.dia_id = ?
-            ORDER BY v.fecha
-        """, (dia_id,))
+        return db.execute_query(SQL_VENTAS_DIA, (dia_id,))
     
     @staticmethod
     def calcular_totales_ventas_dia(dia_id: int):
@@ -161,9 +338,9 @@ class Queries:
             SELECT 
                 COUNT(*) as num_ventas,
                 COALESCE(SUM(cantidad), 0) as cantidad_total,
-                COALESCE(SUM(monto_venta), 0) as monto_total,
-                COALESCE(SUM(comision), 0) as comisiones_total,
-                COALESCE(SUM(ganancia_neta), 0) as ganancia_total
+                COALESCE(SUM(monto_venta_micro), 0) / 1000000.0 as monto_total,
+                COALESCE(SUM(comision_micro), 0) / 1000000.0 as comisiones_total,
+                COALESCE(SUM(ganancia_neta_micro), 0) / 1000000.0 as ganancia_total
             FROM ventas
             WHERE dia_id = ?
         """, (dia_id,), fetch_one=True)
@@ -175,38 +352,18 @@ class Queries:
     @staticmethod
     def obtener_capital_boveda(ciclo_id: int):
         """Obtiene capital total en bóveda del ciclo"""
-        resultado = db.execute_query("""
-            SELECT COALESCE(SUM(cantidad * precio_promedio), 0) as capital
-            FROM boveda_ciclo
-            WHERE ciclo_id = ?
-        """, (ciclo_id,), fetch_one=True)
+        resultado = db.execute_query(SQL_CAPITAL_BOVEDA, (ciclo_id,), fetch_one=True)
         return resultado['capital']
     
     @staticmethod
     def obtener_criptos_boveda(ciclo_id: int):
         """Obtiene todas las criptos en bóveda"""
-        return db.execute_query("""
-            SELECT 
-                c.id,
-                c.nombre,
-                c.simbolo,
-                bc.cantidad,
-                bc.precio_promedio,
-                (bc.cantidad * bc.precio_promedio) as valor_usd
-            FROM boveda_ciclo bc
-            JOIN criptomonedas c ON bc.cripto_id = c.id
-            WHERE bc.ciclo_id = ? AND bc.cantidad > 0
-            ORDER BY valor_usd DESC
-        """, (ciclo_id,))
+        return db.execute_query(SQL_CRIPTOS_BOVEDA, (ciclo_id,))
     
     @staticmethod
     def obtener_cantidad_cripto(ciclo_id: int, cripto_id: int):
         """Obtiene cantidad disponible de una cripto"""
-        resultado = db.execute_query("""
-            SELECT cantidad
-            FROM boveda_ciclo
-            WHERE ciclo_id = ? AND cripto_id = ?
-        """, (ciclo_id, cripto_id), fetch_one=True)
+        resultado = db.execute_query(SQL_CANTIDAD_CRIPTO, (ciclo_id, cripto_id), fetch_one=True)
         return resultado['cantidad'] if resultado else 0
     
     @staticmethod
@@ -223,31 +380,77 @@ class Queries:
     # CRIPTOMONEDAS
     # ===================================================================
     
+    @staticmethod
+    def _catalogo_criptos() -> Dict:
+        """
+        Catálogo completo de criptomonedas, indexado por ID y por símbolo
+        
+        Returns:
+            dict: {'lista', 'por_id', 'por_simbolo'} (desde caché)
+        """
+        def cargar():
+            lista = db.execute_query("""
+                SELECT * FROM criptomonedas
+                ORDER BY tipo, nombre
+            """)
+            return {
+                'lista': lista,
+                'por_id': {c['id']: c for c in lista},
+                'por_simbolo': {c['simbolo']: c for c in lista}
+            }
+        
+        return cache.obtener('criptomonedas', cargar)
+    
     @staticmethod
     def listar_criptomonedas():
         """Lista todas las criptomonedas"""
-        return db.execute_query("""
-            SELECT * FROM criptomonedas
-            ORDER BY tipo, nombre
-        """)
+        return [dict(c) for c in Queries._catalogo_criptos()['lista']]
     
     @staticmethod
     def obtener_cripto_por_id(cripto_id: int):
         """Obtiene una criptomoneda por ID"""
-        return db.execute_query(
-            "SELECT * FROM criptomonedas WHERE id = ?",
-            (cripto_id,),
-            fetch_one=True
-        )
+        cripto = Queries._catalogo_criptos()['por_id'].get(cripto_id)
+        return dict(cripto) if cripto else None
     
     @staticmethod
     def obtener_cripto_por_simbolo(simbolo: str):
         """Obtiene una criptomoneda por símbolo"""
-        return db.execute_query(
-            "SELECT * FROM criptomonedas WHERE simbolo = ?",
-            (simbolo.upper(),),
-            fetch_one=True
-        )
+        cripto = Queries._catalogo_criptos()['por_simbolo'].get(simbolo.upper())
+        return dict(cripto) if cripto else None
+    
+    # ===================================================================
+    # CONFIGURACIÓN DE ALERTAS
+    # ===================================================================
+    
+    @staticmethod
+    def _config_alertas() -> Dict:
+        """Configuración de alertas indexada por tipo (desde caché)"""
+        return cache.obtener('config_alertas', lambda: {
+            c['tipo_alerta']: c
+            for c in db.execute_query("SELECT * FROM config_alertas ORDER BY tipo_alerta")
+        })
+    
+    @staticmethod
+    def obtener_config_alerta(tipo_alerta: str, solo_activa: bool = True):
+        """
+        Obtiene la configuración de un tipo de alerta
+        
+        Args:
+            tipo_alerta: Tipo de alerta (dia_abierto_largo, capital_bajo...)
+            solo_activa: Si es True, devuelve None cuando la alerta está desactivada
+        
+        Returns:
+            dict o None
+        """
+        config = Queries._config_alertas().get(tipo_alerta)
+        if not config or (solo_activa and not config['activa']):
+            return None
+        return dict(config)
+    
+    @staticmethod
+    def listar_config_alertas():
+        """Lista la configuración de todas las alertas"""
+        return [dict(c) for c in Queries._config_alertas().values()]
     
     # ===================================================================
     # ESTADÍSTICAS
@@ -255,36 +458,59 @@ class Queries:
     
     @staticmethod
     def obtener_estadisticas_generales():
-        """Obtiene estadísticas generales del sistema"""
-        with db.get_cursor(commit=False) as cursor:
-            stats = {}
-            
-            # Ciclos
-            cursor.execute("SELECT COUNT(*) as total FROM ciclos")
-            stats['total_ciclos'] = cursor.fetchone()['total']
-            
-            cursor.execute("SELECT COUNT(*) as total FROM ciclos WHERE estado='activo'")
-            stats['ciclos_activos'] = cursor.fetchone()['total']
-            
-            # Días
-            cursor.execute("SELECT COUNT(*) as total FROM dias WHERE estado='cerrado'")
-            stats['dias_operados'] = cursor.fetchone()['total']
-            
-            # Ventas
-            cursor.execute("SELECT COUNT(*) as total FROM ventas")
-            stats['total_ventas'] = cursor.fetchone()['total']
-            
-            cursor.execute("SELECT COALESCE(SUM(ganancia_neta), 0) as total FROM ventas")
-            stats['ganancia_total'] = cursor.fetchone()['total']
-            
-            # Compras
-            cursor.execute("SELECT COUNT(*) as total FROM compras")
-            stats['total_compras'] = cursor.fetchone()['total']
-            
-            cursor.execute("SELECT COALESCE(SUM(monto_usd), 0) as total FROM compras")
-            stats['capital_invertido'] = cursor.fetchone()['total']
-            
-            return stats
+        """Obtiene estadísticas generales del sistema (desde resumen_global)"""
+        resumen = Queries.obtener_resumen_global()
+        
+        return {
+            'total_ciclos': resumen['total_ciclos'],
+            'ciclos_activos': resumen['ciclos_activos'],
+            'dias_operados': resumen['dias_operados'],
+            'total_ventas': resumen['num_ventas'],
+            'ganancia_total': resumen['ganancia_neta'],
+            'total_compras': resumen['total_compras'],
+            'capital_invertido': resumen['capital_invertido']
+        }
+    
+    # ===================================================================
+    # RESÚMENES
+    # ===================================================================
+    
+    @staticmethod
+    def obtener_resumen_global() -> Dict:
+        """
+        Totales globales precalculados (montos en USD)
+        
+        Returns:
+            dict: Fila de resumen_global con los *_micro convertidos
+        """
+        fila = db.execute_query("SELECT * FROM resumen_global WHERE id = 1", fetch_one=True)
+        return convertir_montos(fila)
+    
+    @staticmethod
+    def obtener_resumen_ciclo(ciclo_id: int) -> Optional[Dict]:
+        """Totales precalculados de un ciclo (ventas y días cerrados)"""
+        fila = db.execute_query(
+            SQL_RESUMEN_CICLO,
+            (ciclo_id,),
+            fetch_one=True
+        )
+        return convertir_montos(fila) if fila else None
+    
+    @staticmethod
+    def obtener_resumen_dia(dia_id: int) -> Optional[Dict]:
+        """Totales precalculados de las ventas de un día"""
+        fila = db.execute_query(
+            SQL_RESUMEN_DIA,
+            (dia_id,),
+            fetch_one=True
+        )
+        return convertir_montos(fila) if fila else None
+    
+    @staticmethod
+    def obtener_resumen_criptos_ciclo(ciclo_id: int):
+        """Totales precalculados por criptomoneda dentro de un ciclo"""
+        filas = db.execute_query(SQL_RESUMEN_CRIPTOS_CICLO, (ciclo_id,))
+        return [convertir_montos(f) for f in filas]
     
     # ===================================================================
     # EFECTIVO
@@ -293,21 +519,13 @@ class Queries:
     @staticmethod
     def obtener_efectivo_total(ciclo_id: int):
         """Obtiene efectivo total acumulado en el ciclo"""
-        resultado = db.execute_query("""
-            SELECT COALESCE(SUM(monto), 0) as total
-            FROM efectivo_banco
-            WHERE ciclo_id = ?
-        """, (ciclo_id,), fetch_one=True)
+        resultado = db.execute_query(SQL_EFECTIVO_CICLO, (ciclo_id,), fetch_one=True)
         return resultado['total']
     
     @staticmethod
     def obtener_efectivo_dia(dia_id: int):
         """Obtiene efectivo del día"""
-        resultado = db.execute_query("""
-            SELECT COALESCE(SUM(monto), 0) as total
-            FROM efectivo_banco
-            WHERE dia_id = ?
-        """, (dia_id,), fetch_one=True)
+        resultado = db.execute_query(SQL_EFECTIVO_DIA, (dia_id,), fetch_one=True)
         return resultado['total']
 
 
@@ -357,4 +575,13 @@ if __name__ == "__main__":
     for cripto in criptos[:3]:
         print(f"      • {cripto['nombre']} ({cripto['simbolo']})")
     
+    # Test caché
+    print("\n[Test 5] Caché de consultas:")
+    queries.invalidar_cache()
+    for _ in range(100):
+        queries.obtener_comision()
+        queries.obtener_cripto_por_simbolo('usdt')
+    stats = cache.estadisticas()
+    print(f"   ✅ Aciertos: {stats['aciertos']} | Fallos: {stats['fallos']} | TTL: {stats['ttl']}")
+    
     print("\n" + "="*60)
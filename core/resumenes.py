@@ -0,0 +1,410 @@
+# -*- coding: utf-8 -*-
+"""
+=============================================================================
+MÓDULO DE TABLAS RESUMEN
+=============================================================================
+Totales precalculados por día, por ciclo, por cripto (dentro del ciclo) y
+globales, para que los tableros lean una fila en vez de recorrer el
+historial de ventas.
+
+Los resúmenes se mantienen con triggers de SQLite, así cualquier camino
+que escriba (registro de ventas, importación masiva, limpieza de ciclos)
+los deja al día:
+- ventas y compras se aplican por diferencias (+fila nueva / -fila vieja)
+- días y ciclos cambian pocas veces por ciclo: sus agregados se recalculan
+  para la fila afectada
+
+Las funciones reciben una conexión SQLite para poder usarse tanto desde
+db_manager como desde las migraciones (core/migraciones.py)
+"""
+
+import sqlite3
+from typing import Dict, List
+
+
+# ===================================================================
+# CONFIGURACIÓN
+# ===================================================================
+
+# Montos de ventas acumulados en micro-unidades (1 USD = 1_000_000)
+CAMPOS_MONTO = ('costo_total', 'monto_venta', 'comision',
+                'efectivo_recibido', 'ganancia_bruta', 'ganancia_neta')
+
+MICRO_POR_UNIDAD = 1_000_000
+
+# Tolerancia al comparar columnas REAL en la verificación
+TOLERANCIA_VERIFICACION = 1e-6
+
+_COLUMNAS_MONTO = ",\n".join(
+    f"            {campo}_micro INTEGER NOT NULL DEFAULT 0" for campo in CAMPOS_MONTO
+)
+
+TABLAS_RESUMEN = {
+    'resumen_dia': ('dia_id',),
+    'resumen_cripto': ('ciclo_id', 'cripto_id'),
+    'resumen_ciclo': ('ciclo_id',),
+    'resumen_global': ('id',),
+}
+
+
+# ===================================================================
+# ESQUEMA
+# ===================================================================
+
+SQL_TABLAS = [
+    f"""
+        CREATE TABLE IF NOT EXISTS resumen_dia (
+            dia_id INTEGER PRIMARY KEY,
+            ciclo_id INTEGER NOT NULL,
+            num_ventas INTEGER NOT NULL DEFAULT 0,
+            cantidad_vendida REAL NOT NULL DEFAULT 0,
+{_COLUMNAS_MONTO}
+        )
+    """,
+    f"""
+        CREATE TABLE IF NOT EXISTS resumen_cripto (
+            ciclo_id INTEGER NOT NULL,
+            cripto_id INTEGER NOT NULL,
+            num_ventas INTEGER NOT NULL DEFAULT 0,
+            cantidad_vendida REAL NOT NULL DEFAULT 0,
+{_COLUMNAS_MONTO},
+            PRIMARY KEY (ciclo_id, cripto_id)
+        )
+    """,
+    f"""
+        CREATE TABLE IF NOT EXISTS resumen_ciclo (
+            ciclo_id INTEGER PRIMARY KEY,
+            num_ventas INTEGER NOT NULL DEFAULT 0,
+            cantidad_vendida REAL NOT NULL DEFAULT 0,
+{_COLUMNAS_MONTO},
+            dias_cerrados INTEGER NOT NULL DEFAULT 0,
+            ganancia_dias REAL NOT NULL DEFAULT 0,
+            mejor_dia REAL,
+            peor_dia REAL
+        )
+    """,
+    f"""
+        CREATE TABLE IF NOT EXISTS resumen_global (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            num_ventas INTEGER NOT NULL DEFAULT 0,
+            cantidad_vendida REAL NOT NULL DEFAULT 0,
+{_COLUMNAS_MONTO},
+            dias_operados INTEGER NOT NULL DEFAULT 0,
+            total_compras INTEGER NOT NULL DEFAULT 0,
+            capital_invertido_micro INTEGER NOT NULL DEFAULT 0,
+            total_ciclos INTEGER NOT NULL DEFAULT 0,
+            ciclos_activos INTEGER NOT NULL DEFAULT 0,
+            ciclos_cerrados INTEGER NOT NULL DEFAULT 0,
+            dias_promedio_cerrados REAL,
+            ganancia_ciclos_cerrados REAL NOT NULL DEFAULT 0,
+            roi_promedio_cerrados REAL
+        )
+    """,
+    "INSERT OR IGNORE INTO resumen_global (id) VALUES (1)",
+    "CREATE INDEX IF NOT EXISTS idx_resumen_dia_ciclo ON resumen_dia(ciclo_id)",
+]
+
+
+def _micro(ref: str, campo: str) -> str:
+    """Monto de una venta en micro-unidades (usa la columna *_micro si existe)"""
+    return (f"COALESCE({ref}.{campo}_micro, "
+            f"CAST(ROUND({ref}.{campo} * {MICRO_POR_UNIDAD}) AS INTEGER))")
+
+
+def _sql_aplicar_venta(ref: str, signo: str) -> str:
+    """
+    Sentencias de trigger que suman (o restan) una venta en los resúmenes
+    
+    Args:
+        ref: 'NEW' o 'OLD'
+        signo: '+' para sumar, '-' para restar
+    
+    Returns:
+        str: Cuerpo del trigger
+    """
+    ciclo = f"(SELECT ciclo_id FROM dias WHERE id = {ref}.dia_id)"
+    deltas = ",\n".join(
+        [f"                num_ventas = num_ventas {signo} 1",
+         f"                cantidad_vendida = cantidad_vendida {signo} {ref}.cantidad"]
+        + [f"                {c}_micro = {c}_micro {signo} {_micro(ref, c)}" for c in CAMPOS_MONTO]
+    )
+    
+    sentencias = [
+        f"INSERT OR IGNORE INTO resumen_dia (dia_id, ciclo_id) "
+        f"SELECT id, ciclo_id FROM dias WHERE id = {ref}.dia_id",
+        f"UPDATE resumen_dia SET\n{deltas}\n            WHERE dia_id = {ref}.dia_id",
+        f"INSERT OR IGNORE INTO resumen_cripto (ciclo_id, cripto_id) "
+        f"SELECT ciclo_id, {ref}.cripto_id FROM dias WHERE id = {ref}.dia_id",
+        f"UPDATE resumen_cripto SET\n{deltas}\n"
+        f"            WHERE ciclo_id = {ciclo} AND cripto_id = {ref}.cripto_id",
+        f"INSERT OR IGNORE INTO resumen_ciclo (ciclo_id) "
+        f"SELECT ciclo_id FROM dias WHERE id = {ref}.dia_id",
+        f"UPDATE resumen_ciclo SET\n{deltas}\n            WHERE ciclo_id = {ciclo}",
+        f"UPDATE resumen_global SET\n{deltas}\n            WHERE id = 1",
+    ]
+    
+    if signo == '-':
+        # Una cripto sin ventas no tiene fila (igual que al reconstruir)
+        sentencias.append(
+            f"DELETE FROM resumen_cripto "
+            f"WHERE ciclo_id = {ciclo} AND cripto_id = {ref}.cripto_id AND num_ventas = 0"
+        )
+    
+    return ";\n            ".join(sentencias) + ";"
+
+
+def _sql_refrescar_dias_ciclo(ciclo: str) -> str:
+    """Recalcula los agregados de días cerrados de un ciclo"""
+    filtro = f"FROM dias WHERE ciclo_id = {ciclo} AND estado = 'cerrado'"
+    return f"""INSERT OR IGNORE INTO resumen_ciclo (ciclo_id) VALUES ({ciclo});
+            UPDATE resumen_ciclo SET
+                dias_cerrados = (SELECT COUNT(*) {filtro}),
+                ganancia_dias = (SELECT COALESCE(SUM(ganancia_neta), 0) {filtro}),
+                mejor_dia = (SELECT MAX(ganancia_neta) {filtro}),
+                peor_dia = (SELECT MIN(ganancia_neta) {filtro})
+            WHERE ciclo_id = {ciclo};"""
+
+
+SQL_REFRESCAR_CICLOS_GLOBAL = """UPDATE resumen_global SET
+                total_ciclos = (SELECT COUNT(*) FROM ciclos),
+                ciclos_activos = (SELECT COUNT(*) FROM ciclos WHERE estado = 'activo'),
+                ciclos_cerrados = (SELECT COUNT(*) FROM ciclos WHERE estado = 'cerrado'),
+                dias_promedio_cerrados = (SELECT AVG(dias_operados) FROM ciclos WHERE estado = 'cerrado'),
+                ganancia_ciclos_cerrados = (SELECT COALESCE(SUM(ganancia_total), 0) FROM ciclos WHERE estado = 'cerrado'),
+                roi_promedio_cerrados = (SELECT AVG(roi_total) FROM ciclos WHERE estado = 'cerrado')
+            WHERE id = 1;"""
+
+
+def _sql_compra(ref: str, signo: str) -> str:
+    """Suma (o resta) una compra en el resumen global"""
+    return f"""UPDATE resumen_global SET
+                total_compras = total_compras {signo} 1,
+                capital_invertido_micro = capital_invertido_micro {signo} CAST(ROUND({ref}.monto_usd * {MICRO_POR_UNIDAD}) AS INTEGER)
+            WHERE id = 1;"""
+
+
+SQL_TRIGGERS = {
+    # Ventas: diferencias
+    'trg_resumen_ventas_ai': f"AFTER INSERT ON ventas BEGIN\n            {_sql_aplicar_venta('NEW', '+')}\n        END",
+    'trg_resumen_ventas_ad': f"AFTER DELETE ON ventas BEGIN\n            {_sql_aplicar_venta('OLD', '-')}\n        END",
+    'trg_resumen_ventas_au': (f"AFTER UPDATE ON ventas BEGIN\n            {_sql_aplicar_venta('OLD', '-')}\n"
+                              f"            {_sql_aplicar_venta('NEW', '+')}\n        END"),
+    
+    # Días: fila propia + agregados del ciclo
+    'trg_resumen_dias_ai': f"""AFTER INSERT ON dias BEGIN
+            INSERT OR IGNORE INTO resumen_dia (dia_id, ciclo_id) VALUES (NEW.id, NEW.ciclo_id);
+            UPDATE resumen_global SET dias_operados = dias_operados + (NEW.estado = 'cerrado') WHERE id = 1;
+            {_sql_refrescar_dias_ciclo('NEW.ciclo_id')}
+        END""",
+    'trg_resumen_dias_au': f"""AFTER UPDATE OF ciclo_id, estado, ganancia_neta ON dias BEGIN
+            UPDATE resumen_dia SET ciclo_id = NEW.ciclo_id WHERE dia_id = NEW.id;
+            UPDATE resumen_global SET
+                dias_operados = dias_operados + (NEW.estado = 'cerrado') - (OLD.estado = 'cerrado')
+            WHERE id = 1;
+            {_sql_refrescar_dias_ciclo('OLD.ciclo_id')}
+            {_sql_refrescar_dias_ciclo('NEW.ciclo_id')}
+        END""",
+    'trg_resumen_dias_ad': f"""AFTER DELETE ON dias BEGIN
+            DELETE FROM resumen_dia WHERE dia_id = OLD.id;
+            UPDATE resumen_global SET dias_operados = dias_operados - (OLD.estado = 'cerrado') WHERE id = 1;
+            {_sql_refrescar_dias_ciclo('OLD.ciclo_id')}
+        END""",
+    
+    # Ciclos: pocas filas, se recalculan los agregados globales
+    'trg_resumen_ciclos_ai': f"""AFTER INSERT ON ciclos BEGIN
+            INSERT OR IGNORE INTO resumen_ciclo (ciclo_id) VALUES (NEW.id);
+            {SQL_REFRESCAR_CICLOS_GLOBAL}
+        END""",
+    'trg_resumen_ciclos_au': f"""AFTER UPDATE OF estado, dias_operados, ganancia_total, roi_total ON ciclos BEGIN
+            {SQL_REFRESCAR_CICLOS_GLOBAL}
+        END""",
+    'trg_resumen_ciclos_ad': f"""AFTER DELETE ON ciclos BEGIN
+            DELETE FROM resumen_ciclo WHERE ciclo_id = OLD.id;
+            DELETE FROM resumen_cripto WHERE ciclo_id = OLD.id;
+            {SQL_REFRESCAR_CICLOS_GLOBAL}
+        END""",
+    
+    # Compras: diferencias
+    'trg_resumen_compras_ai': f"AFTER INSERT ON compras BEGIN\n            {_sql_compra('NEW', '+')}\n        END",
+    'trg_resumen_compras_ad': f"AFTER DELETE ON compras BEGIN\n            {_sql_compra('OLD', '-')}\n        END",
+    'trg_resumen_compras_au': (f"AFTER UPDATE OF monto_usd ON compras BEGIN\n            {_sql_compra('OLD', '-')}\n"
+                               f"            {_sql_compra('NEW', '+')}\n        END"),
+}
+
+
+# ===================================================================
+# RECONSTRUCCIÓN DESDE LAS TABLAS BASE
+# ===================================================================
+
+_SUMAS_VENTAS = ",\n".join(
+    ["                COUNT(v.id)", "                COALESCE(SUM(v.cantidad), 0)"]
+    + [f"                COALESCE(SUM({_micro('v', c)}), 0)" for c in CAMPOS_MONTO]
+)
+_COLUMNAS_VENTAS = ['num_ventas', 'cantidad_vendida'] + [f"{c}_micro" for c in CAMPOS_MONTO]
+
+# tabla -> (columnas, SELECT que produce su contenido completo)
+CONSULTAS_RECONSTRUCCION = {
+    'resumen_dia': (
+        ['dia_id', 'ciclo_id'] + _COLUMNAS_VENTAS,
+        f"""
+            SELECT d.id, d.ciclo_id,
+{_SUMAS_VENTAS}
+            FROM dias d
+            LEFT JOIN ventas v ON v.dia_id = d.id
+            GROUP BY d.id
+        """
+    ),
+    'resumen_cripto': (
+        ['ciclo_id', 'cripto_id'] + _COLUMNAS_VENTAS,
+        f"""
+            SELECT d.ciclo_id, v.cripto_id,
+{_SUMAS_VENTAS}
+            FROM ventas v
+            JOIN dias d ON d.id = v.dia_id
+            GROUP BY d.ciclo_id, v.cripto_id
+        """
+    ),
+    'resumen_ciclo': (
+        ['ciclo_id'] + _COLUMNAS_VENTAS
+        + ['dias_cerrados', 'ganancia_dias', 'mejor_dia', 'peor_dia'],
+        f"""
+            SELECT c.id,
+{_SUMAS_VENTAS},
+                (SELECT COUNT(*) FROM dias WHERE ciclo_id = c.id AND estado = 'cerrado'),
+                (SELECT COALESCE(SUM(ganancia_neta), 0) FROM dias WHERE ciclo_id = c.id AND estado = 'cerrado'),
+                (SELECT MAX(ganancia_neta) FROM dias WHERE ciclo_id = c.id AND estado = 'cerrado'),
+                (SELECT MIN(ganancia_neta) FROM dias WHERE ciclo_id = c.id AND estado = 'cerrado')
+            FROM ciclos c
+            LEFT JOIN dias d ON d.ciclo_id = c.id
+            LEFT JOIN ventas v ON v.dia_id = d.id
+            GROUP BY c.id
+        """
+    ),
+    'resumen_global': (
+        ['id'] + _COLUMNAS_VENTAS
+        + ['dias_operados', 'total_compras', 'capital_invertido_micro',
+           'total_ciclos', 'ciclos_activos', 'ciclos_cerrados',
+           'dias_promedio_cerrados', 'ganancia_ciclos_cerrados', 'roi_promedio_cerrados'],
+        f"""
+            SELECT 1,
+{_SUMAS_VENTAS},
+                (SELECT COUNT(*) FROM dias WHERE estado = 'cerrado'),
+                (SELECT COUNT(*) FROM compras),
+                (SELECT COALESCE(SUM(CAST(ROUND(monto_usd * {MICRO_POR_UNIDAD}) AS INTEGER)), 0) FROM compras),
+                (SELECT COUNT(*) FROM ciclos),
+                (SELECT COUNT(*) FROM ciclos WHERE estado = 'activo'),
+                (SELECT COUNT(*) FROM ciclos WHERE estado = 'cerrado'),
+                (SELECT AVG(dias_operados) FROM ciclos WHERE estado = 'cerrado'),
+                (SELECT COALESCE(SUM(ganancia_total), 0) FROM ciclos WHERE estado = 'cerrado'),
+                (SELECT AVG(roi_total) FROM ciclos WHERE estado = 'cerrado')
+            FROM ventas v
+        """
+    ),
+}
+
+
+# ===================================================================
+# FUNCIONES PÚBLICAS
+# ===================================================================
+
+def crear_tablas_resumen(conn: sqlite3.Connection):
+    """
+    Crea las tablas resumen y sus triggers (idempotente)
+    
+    Args:
+        conn: Conexión SQLite
+    """
+    for sql in SQL_TABLAS:
+        conn.execute(sql)
+    
+    for nombre, cuerpo in SQL_TRIGGERS.items():
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS {nombre}\n        {cuerpo}")
+
+
+def reconstruir_resumenes(conn: sqlite3.Connection) -> Dict[str, int]:
+    """
+    Vacía y recalcula todas las tablas resumen desde ventas, días, ciclos y compras
+    
+    No hace commit: debe llamarse dentro de una transacción.
+    
+    Args:
+        conn: Conexión SQLite
+    
+    Returns:
+        dict: Filas escritas por tabla
+    """
+    filas = {}
+    
+    for tabla, (columnas, consulta) in CONSULTAS_RECONSTRUCCION.items():
+        conn.execute(f"DELETE FROM {tabla}")
+        cursor = conn.execute(f"INSERT INTO {tabla} ({', '.join(columnas)}) {consulta}")
+        filas[tabla] = cursor.rowcount
+    
+    return filas
+
+
+def _distintos(esperado, actual) -> bool:
+    """Compara dos valores de resumen (los REAL con tolerancia)"""
+    if esperado is None or actual is None:
+        return esperado is not actual
+    if isinstance(esperado, float) or isinstance(actual, float):
+        return abs(esperado - actual) > TOLERANCIA_VERIFICACION
+    return esperado != actual
+
+
+def verificar_resumenes(conn: sqlite3.Connection) -> List[str]:
+    """
+    Compara las tablas resumen con lo que daría una reconstrucción completa
+    
+    Args:
+        conn: Conexión SQLite
+    
+    Returns:
+        list: Descripción de cada diferencia (vacía si todo cuadra)
+    """
+    diferencias = []
+    
+    for tabla, (columnas, consulta) in CONSULTAS_RECONSTRUCCION.items():
+        n_clave = len(TABLAS_RESUMEN[tabla])
+        
+        esperadas = {tuple(f[:n_clave]): tuple(f) for f in conn.execute(consulta)}
+        actuales = {
+            tuple(f[:n_clave]): tuple(f)
+            for f in conn.execute(f"SELECT {', '.join(columnas)} FROM {tabla}")
+        }
+        
+        for clave in sorted(esperadas.keys() | actuales.keys()):
+            esperada = esperadas.get(clave)
+            actual = actuales.get(clave)
+            
+            if esperada is None or actual is None:
+                estado = 'sobra' if esperada is None else 'falta'
+                diferencias.append(f"{tabla} {clave}: fila {estado}")
+                continue
+            
+            for columna, e, a in zip(columnas[n_clave:], esperada[n_clave:], actual[n_clave:]):
+                if _distintos(e, a):
+                    diferencias.append(f"{tabla} {clave}: {columna} = {a} (esperado {e})")
+    
+    return diferencias
+
+
+def convertir_montos(fila) -> Dict:
+    """
+    Convierte una fila de resumen a dict con los *_micro pasados a USD
+    
+    Args:
+        fila: Fila de una tabla resumen (dict o sqlite3.Row)
+    
+    Returns:
+        dict: Misma fila; 'ganancia_neta_micro' pasa a 'ganancia_neta', etc.
+    """
+    resultado = {}
+    
+    for clave, valor in dict(fila).items():
+        if clave.endswith('_micro'):
+            resultado[clave[:-len('_micro')]] = valor / MICRO_POR_UNIDAD
+        else:
+            resultado[clave] = valor
+    
+    return resultado
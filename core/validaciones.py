@@ -6,7 +6,7 @@ MÓDULO DE VALIDACIONES (COMPLETO)
 Validaciones centralizadas del sistema
 """
 
-from typing import Tuple, Optional
+from typing import Tuple, Optional, List, Dict
 
 
 # ===================================================================
@@ -98,6 +98,40 @@ def validar_venta(cantidad: float, cantidad_disponible: float,
     return True, ""
 
 
+def validar_ventas_lote(ventas: List[Tuple[int, float, float]],
+                        disponibles: Dict[int, float]) -> List[Tuple[int, str]]:
+    """
+    Valida un lote de ventas en una sola pasada
+    
+    La disponibilidad se descuenta a medida que se recorre el lote, de modo
+    que varias ventas de la misma cripto no pueden superar entre todas lo
+    que hay en bóveda.
+    
+    Args:
+        ventas: Lista de tuplas (cripto_id, cantidad, precio)
+        disponibles: Cantidad disponible en bóveda por cripto_id
+    
+    Returns:
+        list: Tuplas (número de fila desde 1, mensaje_error); vacía si todo es válido
+    """
+    errores = []
+    restante = dict(disponibles)
+    
+    for fila, (cripto_id, cantidad, precio) in enumerate(ventas, 1):
+        if cripto_id not in restante:
+            errores.append((fila, "La cripto no está en la bóveda del ciclo"))
+            continue
+        
+        valido, msg = validar_venta(cantidad, restante[cripto_id], precio)
+        if not valido:
+            errores.append((fila, msg))
+            continue
+        
+        restante[cripto_id] -= cantidad
+    
+    return errores
+
+
 def validar_compra(cantidad: float, monto_usd: float, tasa: float) -> Tuple[bool, str]:
     """
     Valida los parámetros de una compra
@@ -12,6 +12,61 @@ from typing import List, Dict, Optional
 from core.db_manager import db
 from core.queries import queries
 from core.logger import log
+from core.migraciones import asegurar_esquema
+
+
+# ===================================================================
+# CONSULTAS
+# ===================================================================
+# core/plan_consultas.py audita estas mismas constantes
+
+# Alerta sin leer de un tipo para una referencia, para no duplicarla.
+# Parámetros: (tipo, referencia_id)
+SQL_ALERTA_PENDIENTE = """
+    SELECT id FROM alertas
+    WHERE tipo = ?
+    AND referencia_id = ?
+    AND leida = 0
+"""
+
+# Igual que SQL_ALERTA_PENDIENTE pero solo entre las creadas hoy
+SQL_ALERTA_PENDIENTE_HOY = """
+    SELECT id FROM alertas
+    WHERE tipo = ?
+    AND referencia_id = ?
+    AND leida = 0
+    AND date(fecha_creacion) = date('now')
+"""
+
+# No leídas por gravedad. Parámetros: (limite,)
+SQL_ALERTAS_NO_LEIDAS = """
+    SELECT * FROM alertas
+    WHERE leida = 0
+    ORDER BY 
+        CASE nivel
+            WHEN 'critico' THEN 1
+            WHEN 'error' THEN 2
+            WHEN 'advertencia' THEN 3
+            WHEN 'exito' THEN 4
+            WHEN 'info' THEN 5
+        END,
+        fecha_creacion DESC
+    LIMIT ?
+"""
+
+# Creadas en las últimas horas. Parámetros: (horas, limite)
+SQL_ALERTAS_RECIENTES = """
+    SELECT * FROM alertas
+    WHERE fecha_creacion >= datetime('now', '-' || ? || ' hours')
+    ORDER BY fecha_creacion DESC
+    LIMIT ?
+"""
+
+# Borrado de las creadas hace más de N días. Parámetros: (dias,)
+SQL_ELIMINAR_ALERTAS_ANTIGUAS = """
+    DELETE FROM alertas
+    WHERE fecha_creacion < datetime('now', '-' || ? || ' days')
+"""
 
 
 # ===================================================================
@@ -21,49 +76,9 @@ from core.logger import log
 def inicializar_tabla_alertas():
     """Crea las tablas de alertas si no existen"""
     
-    with db.get_cursor(commit=True) as cursor:
-        # Tabla de alertas generadas
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS alertas (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                tipo TEXT NOT NULL,
-                nivel TEXT NOT NULL,
-                titulo TEXT NOT NULL,
-                mensaje TEXT NOT NULL,
-                referencia_tipo TEXT,
-                referencia_id INTEGER,
-                leida INTEGER DEFAULT 0,
-                fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                fecha_lectura TIMESTAMP
-            )
-        """)
-        
-        # Tabla de configuración de alertas
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS config_alertas (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                tipo_alerta TEXT NOT NULL UNIQUE,
-                activa INTEGER DEFAULT 1,
-                umbral REAL,
-                parametros TEXT
-            )
-        """)
-        
-        # Insertar configuraciones por defecto
-        cursor.execute("""
-            INSERT OR IGNORE INTO config_alertas (tipo_alerta, activa, umbral)
-            VALUES 
-                ('dia_abierto_largo', 1, 24),
-                ('limite_ventas', 1, NULL),
-                ('capital_bajo', 1, 100),
-                ('ganancia_negativa', 1, NULL),
-                ('ciclo_por_terminar', 1, 3),
-                ('sin_operar', 1, 3),
-                ('objetivo_alcanzado', 1, NULL),
-                ('rendimiento_bajo', 1, 1.0)
-        """)
-    
-    log.info("Sistema de alertas inicializado", categoria='general')
+    # Tablas y umbrales por defecto vienen de la migración v1
+    if asegurar_esquema():
+        queries.invalidar_cache('config_alertas')
 
 
 # Inicializar al importar
@@ -126,10 +141,7 @@ class SistemaAlertas:
     def verificar_dia_abierto_largo(ciclo_id: int):
         """Verifica si hay un día abierto por mucho tiempo"""
         
-        config = db.execute_query("""
-            SELECT umbral FROM config_alertas
-            WHERE tipo_alerta = 'dia_abierto_largo' AND activa = 1
-        """, fetch_one=True)
+        config = queries.obtener_config_alerta('dia_abierto_largo')
         
         if not config:
             return
@@ -149,12 +161,9 @@ class SistemaAlertas:
         
         if horas_transcurridas >= horas_limite:
             # Verificar si ya existe alerta
-            alerta_existente = db.execute_query("""
-                SELECT id FROM alertas
-                WHERE tipo = 'dia_abierto_largo'
-                AND referencia_id = ?
-                AND leida = 0
-            """, (dia_abierto['id'],), fetch_one=True)
+            alerta_existente = db.execute_query(
+                SQL_ALERTA_PENDIENTE, ('dia_abierto_largo', dia_abierto['id']), fetch_one=True
+            )
             
             if not alerta_existente:
                 SistemaAlertas.crear_alerta(
@@ -170,10 +179,7 @@ class SistemaAlertas:
     def verificar_limite_ventas(dia_id: int):
         """Verifica si se está acercando o pasando el límite de ventas"""
         
-        config = db.execute_query("""
-            SELECT activa FROM config_alertas
-            WHERE tipo_alerta = 'limite_ventas' AND activa = 1
-        """, fetch_one=True)
+        config = queries.obtener_config_alerta('limite_ventas')
         
         if not config:
             return
@@ -187,12 +193,9 @@ class SistemaAlertas:
         
         # Alerta si alcanzó el máximo
         if num_ventas >= max_ventas:
-            alerta_existente = db.execute_query("""
-                SELECT id FROM alertas
-                WHERE tipo = 'limite_ventas_max'
-                AND referencia_id = ?
-                AND leida = 0
-            """, (dia_id,), fetch_one=True)
+            alerta_existente = db.execute_query(
+                SQL_ALERTA_PENDIENTE, ('limite_ventas_max', dia_id), fetch_one=True
+            )
             
             if not alerta_existente:
                 SistemaAlertas.crear_alerta(
@@ -206,12 +209,9 @@ class SistemaAlertas:
         
         # Alerta si está cerca del máximo
         elif num_ventas >= max_ventas - 1:
-            alerta_existente = db.execute_query("""
-                SELECT id FROM alertas
-                WHERE tipo = 'limite_ventas_cerca'
-                AND referencia_id = ?
-                AND leida = 0
-            """, (dia_id,), fetch_one=True)
+            alerta_existente = db.execute_query(
+                SQL_ALERTA_PENDIENTE, ('limite_ventas_cerca', dia_id), fetch_one=True
+            )
             
             if not alerta_existente:
                 SistemaAlertas.crear_alerta(
@@ -227,10 +227,7 @@ class SistemaAlertas:
     def verificar_capital_bajo(ciclo_id: int):
         """Verifica si el capital está bajo"""
         
-        config = db.execute_query("""
-            SELECT umbral FROM config_alertas
-            WHERE tipo_alerta = 'capital_bajo' AND activa = 1
-        """, fetch_one=True)
+        config = queries.obtener_config_alerta('capital_bajo')
         
         if not config:
             return
@@ -239,12 +236,9 @@ class SistemaAlertas:
         capital = queries.obtener_capital_boveda(ciclo_id)
         
         if capital <= umbral and capital > 0:
-            alerta_existente = db.execute_query("""
-                SELECT id FROM alertas
-                WHERE tipo = 'capital_bajo'
-                AND referencia_id = ?
-                AND leida = 0
-            """, (ciclo_id,), fetch_one=True)
+            alerta_existente = db.execute_query(
+                SQL_ALERTA_PENDIENTE, ('capital_bajo', ciclo_id), fetch_one=True
+            )
             
             if not alerta_existente:
                 SistemaAlertas.crear_alerta(
@@ -260,10 +254,7 @@ class SistemaAlertas:
     def verificar_ganancia_negativa(dia_id: int):
         """Verifica si hubo ganancia negativa (pérdida)"""
         
-        config = db.execute_query("""
-            SELECT activa FROM config_alertas
-            WHERE tipo_alerta = 'ganancia_negativa' AND activa = 1
-        """, fetch_one=True)
+        config = queries.obtener_config_alerta('ganancia_negativa')
         
         if not config:
             return
@@ -288,10 +279,7 @@ class SistemaAlertas:
     def verificar_ciclo_por_terminar(ciclo_id: int):
         """Verifica si el ciclo está por terminar"""
         
-        config = db.execute_query("""
-            SELECT umbral FROM config_alertas
-            WHERE tipo_alerta = 'ciclo_por_terminar' AND activa = 1
-        """, fetch_one=True)
+        config = queries.obtener_config_alerta('ciclo_por_terminar')
         
         if not config:
             return
@@ -313,12 +301,9 @@ class SistemaAlertas:
         dias_restantes = ciclo['dias_planificados'] - dias_operados
         
         if 0 < dias_restantes <= dias_limite:
-            alerta_existente = db.execute_query("""
-                SELECT id FROM alertas
-                WHERE tipo = 'ciclo_por_terminar'
-                AND referencia_id = ?
-                AND leida = 0
-            """, (ciclo_id,), fetch_one=True)
+            alerta_existente = db.execute_query(
+                SQL_ALERTA_PENDIENTE, ('ciclo_por_terminar', ciclo_id), fetch_one=True
+            )
             
             if not alerta_existente:
                 SistemaAlertas.crear_alerta(
@@ -334,10 +319,7 @@ class SistemaAlertas:
     def verificar_sin_operar(ciclo_id: int):
         """Verifica si lleva días sin operar"""
         
-        config = db.execute_query("""
-            SELECT umbral FROM config_alertas
-            WHERE tipo_alerta = 'sin_operar' AND activa = 1
-        """, fetch_one=True)
+        config = queries.obtener_config_alerta('sin_operar')
         
         if not config:
             return
@@ -361,13 +343,9 @@ class SistemaAlertas:
         dias_sin_operar = (datetime.now() - fecha_ultimo).days
         
         if dias_sin_operar >= dias_limite:
-            alerta_existente = db.execute_query("""
-                SELECT id FROM alertas
-                WHERE tipo = 'sin_operar'
-                AND referencia_id = ?
-                AND leida = 0
-                AND date(fecha_creacion) = date('now')
-            """, (ciclo_id,), fetch_one=True)
+            alerta_existente = db.execute_query(
+                SQL_ALERTA_PENDIENTE_HOY, ('sin_operar', ciclo_id), fetch_one=True
+            )
             
             if not alerta_existente:
                 SistemaAlertas.crear_alerta(
@@ -383,10 +361,7 @@ class SistemaAlertas:
     def verificar_objetivo_alcanzado(ciclo_id: int, objetivo_usd: float):
         """Verifica si se alcanzó un objetivo de ganancia"""
         
-        config = db.execute_query("""
-            SELECT activa FROM config_alertas
-            WHERE tipo_alerta = 'objetivo_alcanzado' AND activa = 1
-        """, fetch_one=True)
+        config = queries.obtener_config_alerta('objetivo_alcanzado')
         
         if not config:
             return
@@ -401,12 +376,9 @@ class SistemaAlertas:
         """, (ciclo_id,), fetch_one=True)['total']
         
         if ganancia_total >= objetivo_usd:
-            alerta_existente = db.execute_query("""
-                SELECT id FROM alertas
-                WHERE tipo = 'objetivo_alcanzado'
-                AND referencia_id = ?
-                AND leida = 0
-            """, (ciclo_id,), fetch_one=True)
+            alerta_existente = db.execute_query(
+                SQL_ALERTA_PENDIENTE, ('objetivo_alcanzado', ciclo_id), fetch_one=True
+            )
             
             if not alerta_existente:
                 SistemaAlertas.crear_alerta(
@@ -422,10 +394,7 @@ class SistemaAlertas:
     def verificar_rendimiento_bajo(dia_id: int):
         """Verifica si el rendimiento del día fue bajo"""
         
-        config = db.execute_query("""
-            SELECT umbral FROM config_alertas
-            WHERE tipo_alerta = 'rendimiento_bajo' AND activa = 1
-        """, fetch_one=True)
+        config = queries.obtener_config_alerta('rendimiento_bajo')
         
         if not config:
             return
@@ -495,30 +464,12 @@ class SistemaAlertas:
     @staticmethod
     def obtener_alertas_no_leidas(limite: int = 20):
         """Obtiene alertas no leídas"""
-        return db.execute_query("""
-            SELECT * FROM alertas
-            WHERE leida = 0
-            ORDER BY 
-                CASE nivel
-                    WHEN 'critico' THEN 1
-                    WHEN 'error' THEN 2
-                    WHEN 'advertencia' THEN 3
-                    WHEN 'exito' THEN 4
-                    WHEN 'info' THEN 5
-                END,
-                fecha_creacion DESC
-            LIMIT ?
-        """, (limite,))
+        return db.execute_query(SQL_ALERTAS_NO_LEIDAS, (limite,))
     
     @staticmethod
     def obtener_alertas_recientes(horas: int = 24, limite: int = 50):
         """Obtiene alertas recientes"""
-        return db.execute_query("""
-            SELECT * FROM alertas
-            WHERE datetime(fecha_creacion) >= datetime('now', '-' || ? || ' hours')
-            ORDER BY fecha_creacion DESC
-            LIMIT ?
-        """, (horas, limite))
+        return db.execute_query(SQL_ALERTAS_RECIENTES, (horas, limite))
     
     @staticmethod
     def contar_alertas_no_leidas():
@@ -551,10 +502,7 @@ class SistemaAlertas:
     @staticmethod
     def eliminar_alertas_antiguas(dias: int = 30):
         """Elimina alertas antiguas"""
-        db.execute_update("""
-            DELETE FROM alertas
-            WHERE datetime(fecha_creacion) < datetime('now', '-' || ? || ' days')
-        """, (dias,))
+        db.execute_update(SQL_ELIMINAR_ALERTAS_ANTIGUAS, (dias,))
         log.info(f"Alertas de más de {dias} días eliminadas", categoria='alertas')
     
     # ===================================================================
@@ -569,13 +517,14 @@ class SistemaAlertas:
             SET activa = ?, umbral = ?
             WHERE tipo_alerta = ?
         """, (1 if activa else 0, umbral, tipo_alerta))
+        queries.invalidar_cache('config_alertas')
         
         log.info(f"Alerta '{tipo_alerta}' configurada: activa={activa}, umbral={umbral}", categoria='alertas')
     
     @staticmethod
     def obtener_configuracion():
         """Obtiene configuración de todas las alertas"""
-        return db.execute_query("SELECT * FROM config_alertas ORDER BY tipo_alerta")
+        return queries.listar_config_alertas()
 
 
 # ===================================================================
@@ -0,0 +1,313 @@
+# -*- coding: utf-8 -*-
+"""
+=============================================================================
+MÓDULO DE CONSULTA DE LOGS
+=============================================================================
+Consulta los logs estructurados (JSON-lines) por categoría, ciclo, evento
+y rango de fechas. Cada archivo .jsonl tiene un índice pequeño de bloques
+con sus offsets, de modo que solo se leen los bloques que pueden contener
+resultados.
+Requiere ARBITRAJE_LOG_JSON=1 para que el logger genere los .jsonl
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+from core.logger import log, LOGS_DIR
+
+
+# ===================================================================
+# CONFIGURACIÓN
+# ===================================================================
+
+INDICE_DIR = LOGS_DIR / ".indice"
+LINEAS_POR_BLOQUE = 256         # Líneas resumidas por cada entrada del índice
+VERSION_INDICE = 1
+
+PATRON_ARCHIVO = re.compile(r"_(\d{4}-\d{2}-\d{2})\.jsonl$")
+
+
+# ===================================================================
+# CLASE DE CONSULTA
+# ===================================================================
+
+class ConsultorLogs:
+    """Consulta indexada de los logs JSON-lines"""
+    
+    def __init__(self):
+        self.bloques_leidos = 0
+        self.bloques_totales = 0
+    
+    # ===================================================================
+    # ÍNDICE
+    # ===================================================================
+    
+    @staticmethod
+    def _ruta_indice(archivo: Path) -> Path:
+        """Ruta del índice asociado a un archivo de log"""
+        return INDICE_DIR / f"{archivo.name}.idx.json"
+    
+    @staticmethod
+    def _indexar(archivo: Path, offset: int, bloques: List[Dict]) -> int:
+        """
+        Agrega al índice los bloques desde offset hasta el final del archivo
+        
+        Solo se indexan líneas completas; una línea a medio escribir queda
+        para la próxima actualización.
+        
+        Args:
+            archivo: Archivo .jsonl
+            offset: Byte desde el que indexar
+            bloques: Lista de bloques a completar
+        
+        Returns:
+            int: Bytes indexados (fin del último bloque)
+        """
+        bloque = None
+        
+        with open(archivo, 'rb') as f:
+            f.seek(offset)
+            
+            for linea in f:
+                if not linea.endswith(b"\n"):
+                    break
+                
+                if bloque is None:
+                    bloque = {'offset': offset, 'fin': offset, 'lineas': 0,
+                              'desde': None, 'hasta': None,
+                              'categorias': set(), 'ciclos': set(), 'eventos': set()}
+                
+                offset += len(linea)
+                bloque['fin'] = offset
+                bloque['lineas'] += 1
+                
+                try:
+                    registro = json.loads(linea)
+                except ValueError:
+                    registro = {}
+                
+                ts = registro.get('ts')
+                if ts:
+                    if bloque['desde'] is None or ts < bloque['desde']:
+                        bloque['desde'] = ts
+                    if bloque['hasta'] is None or ts > bloque['hasta']:
+                        bloque['hasta'] = ts
+                
+                bloque['categorias'].add(registro.get('categoria'))
+                bloque['eventos'].add(registro.get('evento'))
+                if registro.get('ciclo_id') is not None:
+                    bloque['ciclos'].add(registro['ciclo_id'])
+                
+                if bloque['lineas'] >= LINEAS_POR_BLOQUE:
+                    bloques.append(bloque)
+                    bloque = None
+        
+        if bloque is not None:
+            bloques.append(bloque)
+        
+        for b in bloques:
+            for campo in ('categorias', 'ciclos', 'eventos'):
+                b[campo] = sorted(b[campo], key=str)
+        
+        return bloques[-1]['fin'] if bloques else offset
+    
+    def obtener_indice(self, archivo: Path) -> Dict:
+        """
+        Carga el índice de un archivo, actualizándolo si el archivo creció
+        
+        Los logs solo crecen por el final: se reindexa a partir del último
+        bloque (que puede estar incompleto). Si el archivo es más chico que
+        lo indexado, se reconstruye completo.
+        
+        Args:
+            archivo: Archivo .jsonl
+        
+        Returns:
+            dict: {'version', 'tamaño', 'bloques'}
+        """
+        ruta = self._ruta_indice(archivo)
+        tamaño = archivo.stat().st_size
+        indice = None
+        
+        if ruta.exists():
+            try:
+                with open(ruta, encoding='utf-8') as f:
+                    indice = json.load(f)
+            except (OSError, ValueError):
+                indice = None
+        
+        if (not indice or indice.get('version') != VERSION_INDICE
+                or indice.get('tamaño', 0) > tamaño):
+            indice = {'version': VERSION_INDICE, 'tamaño': 0, 'bloques': []}
+        
+        if indice['tamaño'] == tamaño:
+            return indice
+        
+        # Reabrir el último bloque y seguir desde su inicio
+        bloques = indice['bloques']
+        offset = bloques.pop()['offset'] if bloques else 0
+        indice['tamaño'] = self._indexar(archivo, offset, bloques)
+        
+        INDICE_DIR.mkdir(exist_ok=True)
+        with open(ruta, 'w', encoding='utf-8') as f:
+            json.dump(indice, f, ensure_ascii=False)
+        
+        return indice
+    
+    # ===================================================================
+    # CONSULTA
+    # ===================================================================
+    
+    @staticmethod
+    def archivos(desde: Optional[str] = None, hasta: Optional[str] = None) -> List[Path]:
+        """
+        Archivos .jsonl cuyo día está dentro del rango (por nombre, sin abrirlos)
+        
+        Args:
+            desde: Fecha inicial 'YYYY-MM-DD' (incluida)
+            hasta: Fecha final 'YYYY-MM-DD' (incluida)
+        
+        Returns:
+            list: Archivos ordenados por fecha
+        """
+        seleccion = []
+        
+        for archivo in LOGS_DIR.glob("*.jsonl"):
+            coincidencia = PATRON_ARCHIVO.search(archivo.name)
+            if not coincidencia:
+                continue
+            
+            fecha = coincidencia.group(1)
+            if (desde and fecha < desde) or (hasta and fecha > hasta):
+                continue
+            
+            seleccion.append((fecha, archivo))
+        
+        return [archivo for _, archivo in sorted(seleccion)]
+    
+    @staticmethod
+    def _bloque_coincide(bloque: Dict, categoria, ciclo_id, evento,
+                         desde: Optional[str], hasta: Optional[str]) -> bool:
+        """Indica si un bloque puede contener registros que cumplan el filtro"""
+        if categoria and categoria not in bloque['categorias']:
+            return False
+        if ciclo_id is not None and ciclo_id not in bloque['ciclos']:
+            return False
+        if evento and evento not in bloque['eventos']:
+            return False
+        if desde and bloque['hasta'] and bloque['hasta'][:10] < desde:
+            return False
+        if hasta and bloque['desde'] and bloque['desde'][:10] > hasta:
+            return False
+        return True
+    
+    def consultar(self, categoria: Optional[str] = None,
+                  ciclo_id: Optional[int] = None,
+                  evento: Optional[str] = None,
+                  desde: Optional[str] = None,
+                  hasta: Optional[str] = None) -> Iterator[Dict]:
+        """
+        Recorre los registros que cumplen todos los filtros indicados
+        
+        Args:
+            categoria: Categoría del log (operaciones, ciclos, boveda...)
+            ciclo_id: ID del ciclo
+            evento: Evento de dominio (venta_registrada, dia_cerrado...)
+            desde: Fecha inicial 'YYYY-MM-DD' (incluida)
+            hasta: Fecha final 'YYYY-MM-DD' (incluida)
+        
+        Yields:
+            dict: Registro JSON en orden cronológico
+        """
+        # Incluir lo que el escritor del logger aún tiene en cola
+        log.flush()
+        
+        self.bloques_leidos = 0
+        self.bloques_totales = 0
+        
+        for archivo in self.archivos(desde, hasta):
+            indice = self.obtener_indice(archivo)
+            self.bloques_totales += len(indice['bloques'])
+            
+            with open(archivo, 'rb') as f:
+                for bloque in indice['bloques']:
+                    if not self._bloque_coincide(bloque, categoria, ciclo_id,
+                                                 evento, desde, hasta):
+                        continue
+                    
+                    self.bloques_leidos += 1
+                    f.seek(bloque['offset'])
+                    datos = f.read(bloque['fin'] - bloque['offset'])
+                    
+                    for linea in datos.splitlines():
+                        try:
+                            registro = json.loads(linea)
+                        except ValueError:
+                            continue
+                        
+                        if categoria and registro.get('categoria') != categoria:
+                            continue
+                        if ciclo_id is not None and registro.get('ciclo_id') != ciclo_id:
+                            continue
+                        if evento and registro.get('evento') != evento:
+                            continue
+                        
+                        fecha = (registro.get('ts') or '')[:10]
+                        if (desde and fecha < desde) or (hasta and fecha > hasta):
+                            continue
+                        
+                        yield registro
+
+
+# ===================================================================
+# INSTANCIA GLOBAL
+# ===================================================================
+
+consultor = ConsultorLogs()
+
+
+# ===================================================================
+# MENÚ INTERACTIVO
+# ===================================================================
+
+def menu_consulta_logs():
+    """Consulta interactiva de los logs estructurados"""
+    
+    print("\n" + "="*60)
+    print("CONSULTA DE LOGS ESTRUCTURADOS")
+    print("="*60)
+    
+    if not consultor.archivos():
+        print("\n⚠️  No hay logs JSON-lines")
+        print("   Activa la salida estructurada con ARBITRAJE_LOG_JSON=1")
+        return
+    
+    print("\nDeja vacío cualquier filtro para no aplicarlo")
+    categoria = input("Categoría (operaciones, ciclos, boveda...): ").strip() or None
+    evento = input("Evento (venta_registrada, dia_cerrado...): ").strip() or None
+    ciclo = input("ID de ciclo: ").strip()
+    desde = input("Desde (YYYY-MM-DD): ").strip() or None
+    hasta = input("Hasta (YYYY-MM-DD): ").strip() or None
+    
+    try:
+        ciclo_id = int(ciclo) if ciclo else None
+    except ValueError:
+        print("❌ ID de ciclo inválido")
+        return
+    
+    limite = 50
+    total = 0
+    
+    print("\n" + "-"*60)
+    for registro in consultor.consultar(categoria, ciclo_id, evento, desde, hasta):
+        total += 1
+        if total <= limite:
+            print(f"[{registro.get('ts')}] [{registro.get('categoria')}] {registro.get('mensaje')}")
+    print("-"*60)
+    
+    if total > limite:
+        print(f"... se muestran {limite} de {total} registros")
+    
+    print(f"\n✅ {total} registro(s) encontrados")
+    print(f"📊 Bloques leídos: {consultor.bloques_leidos} de {consultor.bloques_totales}")
@@ -8,26 +8,747 @@ Requiere: matplotlib
 Instalación: pip install matplotlib --break-system-packages
 """
 
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
+import atexit
+import hashlib
+import html
+import importlib.util
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
+from itertools import accumulate
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterable, Optional, Union
+from core.calculos import NUMPY_MIN_FILAS
 from core.db_manager import db
+from core.logger import log
 from core.queries import queries
 
+try:
+    import numpy as np
+except ImportError:
+    np = None       # Sin NumPy las series se derivan en Python puro
+
 
 # ===================================================================
 # CONFIGURACIÓN
 # ===================================================================
 
 GRAFICOS_DIR = Path("graficos")
-GRAFICOS_DIR.mkdir(exist_ok=True)
+HTML_DIR = GRAFICOS_DIR / "html"        # Dashboards HTML (ver ExportadorHTML)
+
+# Caché de gráficos: el nombre de cada archivo incluye una huella del tipo
+# de gráfico, sus datos y las opciones de salida, así que si nada cambió
+# se devuelve el archivo existente sin volver a dibujarlo. Subir
+# VERSION_GRAFICOS al cambiar cómo se dibuja un gráfico.
+VERSION_GRAFICOS = 2
+CACHE_MAX_MB = 200              # Tamaño máximo de graficos/
+CACHE_MAX_DIAS = 30             # Antigüedad máxima (desde el último uso)
+
+# Salida: resolución y formato por defecto (configurables por generador)
+FORMATOS_GRAFICO = ('png', 'svg')
+DPI_GRAFICOS = int(os.environ.get('ARBITRAJE_GRAFICOS_DPI', 300))
+FORMATO_GRAFICOS = os.environ.get('ARBITRAJE_GRAFICOS_FORMATO', 'png')
+
+# Procesos que dibujan los gráficos de un dashboard en paralelo (matplotlib
+# no es seguro entre hilos). El dashboard de un ciclo tiene 5 gráficos.
+GRAFICOS_TRABAJADORES = int(os.environ.get('ARBITRAJE_TRABAJADORES', 0)) or min(os.cpu_count() or 1, 5)
+
+COLORES = {
+    'ganancia': '#2ecc71',
+    'perdida': '#e74c3c',
+    'capital': '#3498db',
+    'comision': '#e67e22',
+    'objetivo': '#9b59b6'
+}
+
+# Los gráficos solo se guardan a archivo: Agg no necesita pantalla y es el
+# backend que menos tarda en cargar
+BACKEND_MATPLOTLIB = 'Agg'
+
+# matplotlib se importa al crear el primer GeneradorGraficos (ver
+# _cargar_matplotlib), no al importar este módulo
+plt = None
+mdates = None
+
+
+def _cargar_matplotlib():
+    """Importa matplotlib con el backend Agg y aplica el estilo (una sola vez)"""
+    global plt, mdates
+    
+    if plt is not None:
+        return
+    
+    import matplotlib
+    matplotlib.use(BACKEND_MATPLOTLIB)
+    import matplotlib.pyplot as pyplot
+    import matplotlib.dates as dates
+    
+    # Estilo de gráficos
+    pyplot.style.use('seaborn-v0_8-darkgrid')
+    pyplot.rcParams['figure.figsize'] = (12, 6)
+    pyplot.rcParams['font.size'] = 10
+    
+    plt, mdates = pyplot, dates
+
+
+# ===================================================================
+# CONSULTAS
+# ===================================================================
+# core/plan_consultas.py audita estas mismas constantes
+
+# Series diarias del dashboard (días cerrados). Parámetros: (ciclo_id,)
+SQL_DIAS_DASHBOARD = """
+    SELECT
+        d.numero_dia,
+        d.capital_inicial,
+        d.capital_final,
+        d.ganancia_neta,
+        d.comisiones_pagadas,
+        COALESCE(rd.num_ventas, 0) as num_ventas
+    FROM dias d
+    LEFT JOIN resumen_dia rd ON rd.dia_id = d.id
+    WHERE d.ciclo_id = ? AND d.estado = 'cerrado'
+    ORDER BY d.numero_dia
+"""
+
+# Valor en USD de cada cripto con saldo. Parámetros: (ciclo_id,)
+SQL_BOVEDA = """
+    SELECT
+        c.simbolo,
+        (bc.cantidad * bc.precio_promedio) as valor_usd
+    FROM boveda_ciclo bc
+    JOIN criptomonedas c ON bc.cripto_id = c.id
+    WHERE bc.ciclo_id = ? AND bc.cantidad > 0
+    ORDER BY valor_usd DESC
+"""
+
+
+# ===================================================================
+# LECTURA DE DATOS
+# ===================================================================
+
+def _usar_numpy(n: int) -> bool:
+    """Indica si conviene derivar una serie de n días con NumPy"""
+    return np is not None and n >= NUMPY_MIN_FILAS
+
+
+def _leer_columnas(query: str, params: tuple = ()) -> Dict[str, list]:
+    """
+    Lee una consulta por lotes directamente a listas por columna
+    
+    Evita materializar una lista de dicts por fila: matplotlib solo
+    necesita una secuencia por serie.
+    
+    Args:
+        query: Query SQL
+        params: Parámetros de la query
+    
+    Returns:
+        dict: {columna: [valores]}, vacío si no hay filas
+    """
+    columnas = {}
+    
+    for lote in db.stream(query, params, formato='fila'):
+        campos = lote[0]._fields
+        if not columnas:
+            columnas = {campo: [] for campo in campos}
+        
+        for campo, valores in zip(campos, zip(*lote)):
+            columnas[campo].extend(valores)
+    
+    return columnas
+
+
+def _leer_dias_dashboard(ciclo_id: int) -> Dict[str, list]:
+    """
+    Todas las series diarias del dashboard de un ciclo en una sola lectura
+    
+    Args:
+        ciclo_id: ID del ciclo
+    
+    Returns:
+        dict: Columnas de los días cerrados (ver _leer_columnas)
+    """
+    return _leer_columnas(SQL_DIAS_DASHBOARD, (ciclo_id,))
+
+
+def _leer_boveda(ciclo_id: int) -> Dict[str, list]:
+    """Símbolo y valor en USD de cada cripto de la bóveda, de mayor a menor"""
+    return _leer_columnas(SQL_BOVEDA, (ciclo_id,))
+
+
+def _leer_ciclos_comparativo() -> Dict[str, list]:
+    """Ganancia y ROI de los ciclos cerrados"""
+    return _leer_columnas("""
+        SELECT
+            id,
+            ganancia_total,
+            roi_total
+        FROM ciclos
+        WHERE estado = 'cerrado'
+        ORDER BY id
+    """)
+
+
+def _leer_ciclos_eficiencia() -> Dict[str, list]:
+    """Días operados y ganancia de los ciclos cerrados con al menos un día"""
+    return _leer_columnas("""
+        SELECT
+            id,
+            dias_operados,
+            ganancia_total
+        FROM ciclos
+        WHERE estado = 'cerrado' AND dias_operados > 0
+        ORDER BY id
+    """)
+
+
+# ===================================================================
+# DATOS DE UN CICLO
+# ===================================================================
+
+class DatosCiclo:
+    """
+    Todo lo que dibujan los gráficos de un ciclo, leído una sola vez
+    
+    Guarda los días cerrados y la bóveda como listas por columna y deriva
+    de ellas las series de los gráficos (ROI acumulado, comisiones, ventas
+    por día). Todos los métodos grafico_* de un ciclo aceptan un DatosCiclo
+    en lugar del ID, así que varios gráficos del mismo ciclo comparten una
+    sola lectura de la BD.
+    """
+    
+    def __init__(self, ciclo_id: int, inversion_inicial: Optional[float],
+                 dias: Dict[str, list], boveda: Dict[str, list]):
+        """
+        Args:
+            ciclo_id: ID del ciclo
+            inversion_inicial: Inversión del ciclo (None si no existe)
+            dias: Columnas de los días cerrados (ver _leer_dias_dashboard)
+            boveda: Columnas de la bóveda (ver _leer_boveda)
+        """
+        self.ciclo_id = ciclo_id
+        self.inversion_inicial = inversion_inicial
+        self.dias = dias
+        self.boveda = boveda
+    
+    @classmethod
+    def cargar(cls, ciclo_id: int) -> 'DatosCiclo':
+        """
+        Lee el ciclo, sus días cerrados y su bóveda
+        
+        Args:
+            ciclo_id: ID del ciclo
+        
+        Returns:
+            DatosCiclo
+        """
+        ciclo = queries.obtener_ciclo_por_id(ciclo_id)
+        
+        return cls(ciclo_id,
+                   ciclo['inversion_inicial'] if ciclo else None,
+                   _leer_dias_dashboard(ciclo_id),
+                   _leer_boveda(ciclo_id))
+    
+    @classmethod
+    def obtener(cls, ciclo: Union[int, 'DatosCiclo']) -> 'DatosCiclo':
+        """Usa los datos ya cargados o los lee si se pasó un ID"""
+        return ciclo if isinstance(ciclo, cls) else cls.cargar(ciclo)
+    
+    @property
+    def existe(self) -> bool:
+        """True si el ciclo está en la BD"""
+        return self.inversion_inicial is not None
+    
+    @property
+    def num_dias(self) -> int:
+        """Días cerrados leídos"""
+        return len(self.dias.get('numero_dia', ()))
+    
+    def columna(self, nombre: str) -> list:
+        """Copia de una columna de los días (vacía si no hay días)"""
+        return list(self.dias.get(nombre, ()))
+    
+    def roi_acumulado(self) -> list:
+        """ROI acumulado (%) al cierre de cada día"""
+        ganancias = self.columna('ganancia_neta')
+        inversion = self.inversion_inicial or 0
+        
+        if inversion <= 0:
+            return [0] * len(ganancias)
+        
+        if _usar_numpy(len(ganancias)):
+            # cumsum suma en el mismo orden que el bucle: resultado idéntico
+            return (np.cumsum(np.asarray(ganancias, dtype=float)) / inversion * 100).tolist()
+        
+        return [acumulada / inversion * 100 for acumulada in accumulate(ganancias)]
+    
+    def comisiones(self) -> list:
+        """Comisiones pagadas por día (0 donde no se registraron)"""
+        return [c if c else 0 for c in self.columna('comisiones_pagadas')]
+    
+    def num_ventas(self) -> list:
+        """Número de ventas de cada día (de resumen_dia)"""
+        return self.columna('num_ventas')
+
+
+# ===================================================================
+# DATOS DE CADA GRÁFICO
+# ===================================================================
+# Convierten lo leído de la BD en los datos exactos que se dibujan
+# (diccionarios de listas que pueden enviarse a otro proceso). Devuelven
+# None si no alcanzan para el gráfico. Los usan tanto los gráficos sueltos
+# como el dashboard, así que ambos comparten la caché.
+
+def _datos_progreso(datos: DatosCiclo) -> Optional[Dict]:
+    """Capital inicial/final y ganancia por día (necesita al menos 2 días)"""
+    if datos.num_dias < 2:
+        return None
+    
+    return {
+        'ciclo_id': datos.ciclo_id,
+        'numero_dia': datos.columna('numero_dia'),
+        'capital_inicial': datos.columna('capital_inicial'),
+        'capital_final': datos.columna('capital_final'),
+        'ganancia_neta': datos.columna('ganancia_neta'),
+    }
+
+
+def _datos_roi(datos: DatosCiclo, ganancia_objetivo: float) -> Optional[Dict]:
+    """ROI acumulado por día y objetivo acumulado del ciclo"""
+    if not datos.existe or not datos.num_dias:
+        return None
+    
+    return {
+        'ciclo_id': datos.ciclo_id,
+        'numero_dia': datos.columna('numero_dia'),
+        'roi_acumulado': datos.roi_acumulado(),
+        'roi_objetivo': ganancia_objetivo * datos.num_dias,
+    }
+
+
+def _datos_comisiones(datos: DatosCiclo) -> Optional[Dict]:
+    """Comisiones pagadas por día"""
+    if not datos.num_dias:
+        return None
+    
+    return {
+        'ciclo_id': datos.ciclo_id,
+        'numero_dia': datos.columna('numero_dia'),
+        'comisiones': datos.comisiones(),
+    }
+
+
+def _datos_ventas_dia(datos: DatosCiclo, limites: tuple) -> Optional[Dict]:
+    """Número de ventas por día y límites recomendados"""
+    if not datos.num_dias:
+        return None
+    
+    return {
+        'ciclo_id': datos.ciclo_id,
+        'numero_dia': datos.columna('numero_dia'),
+        'num_ventas': datos.num_ventas(),
+        'limites': tuple(limites),
+    }
+
+
+def _datos_distribucion(datos: DatosCiclo) -> Optional[Dict]:
+    """Valor en USD de cada cripto de la bóveda"""
+    if not datos.boveda:
+        return None
+    
+    return {
+        'ciclo_id': datos.ciclo_id,
+        'nombres': [f"{simbolo}\n${valor:.2f}"
+                    for simbolo, valor in zip(datos.boveda['simbolo'], datos.boveda['valor_usd'])],
+        'valores': list(datos.boveda['valor_usd']),
+    }
+
+
+def _datos_comparativo(ciclos: Dict[str, list]) -> Optional[Dict]:
+    """Ganancia y ROI por ciclo cerrado (necesita al menos 2)"""
+    if not ciclos or len(ciclos['id']) < 2:
+        return None
+    
+    return {
+        'ids': [f"#{i}" for i in ciclos['id']],
+        'ganancias': list(ciclos['ganancia_total']),
+        'rois': list(ciclos['roi_total']),
+    }
+
+
+def _datos_eficiencia(ciclos: Dict[str, list]) -> Optional[Dict]:
+    """Ganancia promedio por día de cada ciclo cerrado"""
+    if not ciclos:
+        return None
+    
+    return {
+        'ids': [f"#{i}" for i in ciclos['id']],
+        'eficiencia': [g / d for g, d in zip(ciclos['ganancia_total'], ciclos['dias_operados'])],
+    }
+
+
+def _trabajos_dashboard(ciclo: DatosCiclo) -> List[tuple]:
+    """
+    Datos de todos los gráficos del dashboard de un ciclo
+    
+    Args:
+        ciclo: Datos del ciclo
+    
+    Returns:
+        list: (tipo, nombre, datos o None si no alcanzan), en el orden
+              del dashboard
+    """
+    prefijo = f"ciclo_{ciclo.ciclo_id}"
+    
+    return [
+        ('progreso', f"{prefijo}_progreso", _datos_progreso(ciclo)),
+        ('roi', f"{prefijo}_roi", _datos_roi(ciclo, queries.obtener_ganancia_objetivo())),
+        ('comisiones', f"{prefijo}_comisiones", _datos_comisiones(ciclo)),
+        ('ventas_dia', f"{prefijo}_ventas_dia",
+         _datos_ventas_dia(ciclo, queries.obtener_limites_ventas())),
+        ('distribucion', f"{prefijo}_distribucion", _datos_distribucion(ciclo)),
+    ]
+
+
+# ===================================================================
+# DIBUJO
+# ===================================================================
+# Funciones de módulo (no métodos) para poder ejecutarlas en los procesos
+# del pool: reciben solo datos y opciones, nunca tocan la BD.
+
+def _dibujar_progreso(d: Dict, colores: Dict):
+    """Evolución del capital y ganancia neta por día"""
+    # Crear figura con subplots
+    fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
+    
+    # Subplot 1: Capital
+    ax1.plot(d['numero_dia'], d['capital_inicial'], 'o-',
+            label='Capital Inicial', color=colores['capital'], linewidth=2)
+    ax1.plot(d['numero_dia'], d['capital_final'], 's-',
+            label='Capital Final', color=colores['ganancia'], linewidth=2)
+    ax1.set_xlabel('Día')
+    ax1.set_ylabel('Capital (USD)')
+    ax1.set_title(f"Evolución del Capital - Ciclo #{d['ciclo_id']}")
+    ax1.legend()
+    ax1.grid(True, alpha=0.3)
+    
+    # Subplot 2: Ganancias diarias
+    colores_barras = [colores['ganancia'] if g >= 0 else colores['perdida']
+                     for g in d['ganancia_neta']]
+    ax2.bar(d['numero_dia'], d['ganancia_neta'], color=colores_barras, alpha=0.7)
+    ax2.axhline(y=0, color='black', linestyle='-', linewidth=0.5)
+    ax2.set_xlabel('Día')
+    ax2.set_ylabel('Ganancia Neta (USD)')
+    ax2.set_title('Ganancia Neta por Día')
+    ax2.grid(True, alpha=0.3)
+
+
+def _dibujar_roi(d: Dict, colores: Dict):
+    """ROI acumulado con línea de objetivo"""
+    numeros_dia = d['numero_dia']
+    roi_acumulado = d['roi_acumulado']
+    
+    # Crear gráfico
+    fig, ax = plt.subplots(figsize=(12, 6))
+    
+    ax.plot(numeros_dia, roi_acumulado, 'o-',
+            color=colores['ganancia'], linewidth=2, markersize=8)
+    ax.fill_between(numeros_dia, 0, roi_acumulado,
+                    alpha=0.3, color=colores['ganancia'])
+    
+    ax.set_xlabel('Día')
+    ax.set_ylabel('ROI Acumulado (%)')
+    ax.set_title(f"ROI Acumulado - Ciclo #{d['ciclo_id']}")
+    ax.grid(True, alpha=0.3)
+    
+    # Línea de objetivo
+    ax.axhline(y=d['roi_objetivo'], color=colores['objetivo'],
+              linestyle='--', label=f"Objetivo: {d['roi_objetivo']:.1f}%")
+    ax.legend()
+    
+    # Anotación final
+    roi_final = roi_acumulado[-1]
+    ax.annotate(f'ROI Final: {roi_final:.2f}%',
+               xy=(numeros_dia[-1], roi_final),
+               xytext=(10, 10), textcoords='offset points',
+               bbox=dict(boxstyle='round,pad=0.5', fc='yellow', alpha=0.7),
+               arrowprops=dict(arrowstyle='->', connectionstyle='arc3,rad=0'))
+
+
+def _dibujar_comisiones(d: Dict, colores: Dict):
+    """Comisiones por día con promedio y total"""
+    comisiones = d['comisiones']
+    
+    # Crear gráfico
+    fig, ax = plt.subplots(figsize=(12, 6))
+    
+    ax.bar(d['numero_dia'], comisiones, color=colores['comision'], alpha=0.7)
+    ax.set_xlabel('Día')
+    ax.set_ylabel('Comisiones Pagadas (USD)')
+    ax.set_title(f"Comisiones por Día - Ciclo #{d['ciclo_id']}")
+    ax.grid(True, alpha=0.3, axis='y')
+    
+    # Línea promedio
+    promedio = sum(comisiones) / len(comisiones) if comisiones else 0
+    ax.axhline(y=promedio, color='red', linestyle='--',
+              label=f'Promedio: ${promedio:.2f}')
+    ax.legend()
+    
+    # Total acumulado
+    total = sum(comisiones)
+    ax.text(0.02, 0.98, f'Total comisiones: ${total:.2f}',
+           transform=ax.transAxes, verticalalignment='top',
+           bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
+
+
+def _dibujar_ventas_dia(d: Dict, colores: Dict):
+    """Ventas por día con límites recomendados"""
+    ventas = d['num_ventas']
+    limites = d['limites']
+    
+    # Crear gráfico
+    fig, ax = plt.subplots(figsize=(12, 6))
+    
+    ax.bar(d['numero_dia'], ventas, color=colores['capital'], alpha=0.7)
+    ax.set_xlabel('Día')
+    ax.set_ylabel('Número de Ventas')
+    ax.set_title(f"Ventas Realizadas por Día - Ciclo #{d['ciclo_id']}")
+    ax.grid(True, alpha=0.3, axis='y')
+    
+    # Límites recomendados
+    ax.axhline(y=limites[0], color='green', linestyle='--', alpha=0.5,
+              label=f'Mínimo recomendado: {limites[0]}')
+    ax.axhline(y=limites[1], color='red', linestyle='--', alpha=0.5,
+              label=f'Máximo recomendado: {limites[1]}')
+    ax.legend()
+    
+    # Promedio
+    promedio = sum(ventas) / len(ventas) if ventas else 0
+    ax.text(0.02, 0.98, f'Promedio: {promedio:.1f} ventas/día',
+           transform=ax.transAxes, verticalalignment='top',
+           bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
+
+
+def _dibujar_distribucion(d: Dict, colores: Dict):
+    """Pastel de capital por cripto"""
+    valores = d['valores']
+    
+    # Crear gráfico
+    fig, ax = plt.subplots(figsize=(10, 8))
+    
+    colores_pastel = plt.cm.Set3(range(len(valores)))
+    
+    wedges, texts, autotexts = ax.pie(
+        valores,
+        labels=d['nombres'],
+        autopct='%1.1f%%',
+        colors=colores_pastel,
+        startangle=90
+    )
+    
+    # Mejorar legibilidad
+    for autotext in autotexts:
+        autotext.set_color('white')
+        autotext.set_fontweight('bold')
+    
+    ax.set_title(f"Distribución de Capital por Cripto - Ciclo #{d['ciclo_id']}")
+    
+    # Total
+    total = sum(valores)
+    plt.text(0, -1.3, f'Total: ${total:.2f}',
+            ha='center', fontsize=12, fontweight='bold',
+            bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.5))
+
+
+def _dibujar_comparativo(d: Dict, colores: Dict):
+    """Ganancia y ROI de cada ciclo"""
+    # Crear figura con subplots
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
+    
+    # Subplot 1: Ganancias
+    ax1.bar(d['ids'], d['ganancias'], color=colores['ganancia'], alpha=0.7)
+    ax1.set_xlabel('Ciclo')
+    ax1.set_ylabel('Ganancia Total (USD)')
+    ax1.set_title('Ganancia Total por Ciclo')
+    ax1.grid(True, alpha=0.3, axis='y')
+    
+    # Subplot 2: ROI
+    ax2.bar(d['ids'], d['rois'], color=colores['objetivo'], alpha=0.7)
+    ax2.set_xlabel('Ciclo')
+    ax2.set_ylabel('ROI (%)')
+    ax2.set_title('ROI por Ciclo')
+    ax2.grid(True, alpha=0.3, axis='y')
+
+
+def _dibujar_eficiencia(d: Dict, colores: Dict):
+    """Ganancia por día de cada ciclo"""
+    eficiencia = d['eficiencia']
+    
+    # Crear gráfico
+    fig, ax = plt.subplots(figsize=(12, 6))
+    
+    colores_barras = [colores['ganancia'] if e > 0 else colores['perdida']
+                     for e in eficiencia]
+    ax.bar(d['ids'], eficiencia, color=colores_barras, alpha=0.7)
+    
+    ax.set_xlabel('Ciclo')
+    ax.set_ylabel('Ganancia Promedio por Día (USD)')
+    ax.set_title('Eficiencia por Ciclo (Ganancia/Día)')
+    ax.grid(True, alpha=0.3, axis='y')
+    
+    # Línea promedio global
+    promedio_global = sum(eficiencia) / len(eficiencia)
+    ax.axhline(y=promedio_global, color='red', linestyle='--',
+              label=f'Promedio: ${promedio_global:.2f}/día')
+    ax.legend()
+
+
+DIBUJANTES = {
+    'progreso': _dibujar_progreso,
+    'roi': _dibujar_roi,
+    'comisiones': _dibujar_comisiones,
+    'ventas_dia': _dibujar_ventas_dia,
+    'distribucion': _dibujar_distribucion,
+    'comparativo_ciclos': _dibujar_comparativo,
+    'eficiencia_ciclos': _dibujar_eficiencia,
+}
+
+
+def _renderizar(tipo: str, datos: Dict, archivo: Path, colores: Dict,
+                dpi: int, formato: str) -> float:
+    """
+    Dibuja un gráfico y lo guarda (en este proceso o en uno del pool)
+    
+    Args:
+        tipo: Clave de DIBUJANTES
+        datos: Datos del gráfico (ver _datos_*)
+        archivo: Ruta final
+        colores: Paleta del generador
+        dpi: Resolución
+        formato: png o svg
+    
+    Returns:
+        float: Segundos que tardó el dibujo
+    """
+    inicio = time.perf_counter()
+    _cargar_matplotlib()
+    
+    # Se escribe a un temporal y se renombra: otro proceso que genere
+    # el mismo gráfico a la vez nunca ve un archivo a medio escribir
+    temporal = archivo.with_name(f".{archivo.stem}.{os.getpid()}.tmp")
+    
+    try:
+        DIBUJANTES[tipo](datos, colores)
+        plt.tight_layout()
+        plt.savefig(temporal, dpi=dpi, bbox_inches='tight', format=formato)
+        os.replace(temporal, archivo)
+    finally:
+        plt.close('all')
+        temporal.unlink(missing_ok=True)
+    
+    return time.perf_counter() - inicio
+
+
+# ===================================================================
+# POOL DE DIBUJO
+# ===================================================================
+
+_pool = None
+_pool_trabajadores = 0
+
+
+def _obtener_pool(trabajadores: int) -> ProcessPoolExecutor:
+    """
+    Pool de procesos para dibujar, creado la primera vez y reutilizado
+    
+    Los procesos importan matplotlib una sola vez, así que a partir del
+    segundo dashboard solo cuesta dibujar.
+    
+    Args:
+        trabajadores: Procesos mínimos que debe tener el pool
+    
+    Returns:
+        ProcessPoolExecutor
+    """
+    global _pool, _pool_trabajadores
+    
+    if _pool is None or _pool_trabajadores < trabajadores:
+        _cerrar_pool()
+        # spawn: los procesos no heredan las conexiones abiertas de este
+        _pool = ProcessPoolExecutor(trabajadores, mp_context=multiprocessing.get_context('spawn'),
+                                    initializer=_cargar_matplotlib)
+        _pool_trabajadores = trabajadores
+    
+    return _pool
+
+
+def _cerrar_pool():
+    """Termina los procesos de dibujo (se llama al salir)"""
+    global _pool, _pool_trabajadores
+    
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+        _pool_trabajadores = 0
+
+
+atexit.register(_cerrar_pool)
+
 
-# Estilo de gráficos
-plt.style.use('seaborn-v0_8-darkgrid')
-plt.rcParams['figure.figsize'] = (12, 6)
-plt.rcParams['font.size'] = 10
+# ===================================================================
+# CACHÉ DE GRÁFICOS
+# ===================================================================
+
+def limpiar_cache_graficos(max_mb: float = CACHE_MAX_MB, max_dias: int = CACHE_MAX_DIAS) -> int:
+    """
+    Elimina gráficos sin usar hace más de max_dias y, si graficos/ sigue
+    ocupando más de max_mb, los menos usados recientemente
+    
+    Cada acierto de caché actualiza la fecha del archivo, así que la
+    antigüedad cuenta desde el último uso.
+    
+    Args:
+        max_mb: Tamaño máximo del directorio en MB
+        max_dias: Días sin uso tras los cuales se elimina un gráfico
+    
+    Returns:
+        int: Número de archivos eliminados
+    """
+    if not GRAFICOS_DIR.exists():
+        return 0
+    
+    limite_fecha = time.time() - max_dias * 86400
+    limite_bytes = max_mb * 1024 * 1024
+    extensiones = tuple(f".{formato}" for formato in FORMATOS_GRAFICO)
+    
+    archivos = []
+    for entrada in os.scandir(GRAFICOS_DIR):
+        if entrada.is_file() and entrada.name.endswith(extensiones):
+            stat = entrada.stat()
+            archivos.append((stat.st_mtime, stat.st_size, entrada.path))
+    
+    # Del más reciente al más antiguo: se conservan mientras quepan
+    archivos.sort(reverse=True)
+    eliminados = 0
+    total = 0
+    
+    for mtime, tamaño, ruta in archivos:
+        total += tamaño
+        if mtime >= limite_fecha and total <= limite_bytes:
+            continue
+        
+        try:
+            os.remove(ruta)
+            eliminados += 1
+        except OSError:
+            pass    # Otro proceso ya lo eliminó
+    
+    return eliminados
 
 
 # ===================================================================
@@ -37,220 +758,154 @@ plt.rcParams['font.size'] = 10
 class GeneradorGraficos:
     """Genera gráficos de rendimiento y estadísticas"""
     
-    def __init__(self):
-        self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        self.colores = {
-            'ganancia': '#2ecc71',
-            'perdida': '#e74c3c',
-            'capital': '#3498db',
-            'comision': '#e67e22',
-            'objetivo': '#9b59b6'
-        }
+    def __init__(self, usar_cache: bool = True, dpi: int = DPI_GRAFICOS,
+                 formato: str = FORMATO_GRAFICOS, trabajadores: int = GRAFICOS_TRABAJADORES):
+        """
+        Args:
+            usar_cache: Si es False, siempre vuelve a dibujar los gráficos
+            dpi: Resolución de los gráficos
+            formato: png o svg
+            trabajadores: Procesos para dibujar el dashboard (1 = sin pool)
+        """
+        if formato not in FORMATOS_GRAFICO:
+            raise ValueError(f"Formato de gráfico inválido: {formato} "
+                             f"(disponibles: {', '.join(FORMATOS_GRAFICO)})")
+        if dpi < 1:
+            raise ValueError(f"dpi debe ser positivo: {dpi}")
+        
+        _cargar_matplotlib()
+        GRAFICOS_DIR.mkdir(exist_ok=True)
+        
+        self.usar_cache = usar_cache
+        self.dpi = dpi
+        self.formato = formato
+        self.trabajadores = max(1, trabajadores)
+        self.colores = dict(COLORES)
+        
+        # Segundos de dibujo de cada gráfico del último dashboard (None = caché)
+        self.tiempos = {}
+    
+    # ===================================================================
+    # CACHÉ Y DIBUJO
+    # ===================================================================
+    
+    def _archivo(self, nombre: str, tipo: str, datos: Dict) -> Path:
+        """
+        Ruta del gráfico para estos datos y opciones de salida
+        
+        Args:
+            nombre: Tipo de gráfico y parámetros (ej. ciclo_3_roi)
+            tipo: Clave de DIBUJANTES
+            datos: Todo lo que se dibuja (ver _datos_*)
+        
+        Returns:
+            Path: graficos/<nombre>_<huella>.<formato>
+        """
+        contenido = repr((VERSION_GRAFICOS, tipo, datos, self.colores, self.dpi, self.formato))
+        huella = hashlib.sha256(contenido.encode('utf-8')).hexdigest()[:16]
+        return GRAFICOS_DIR / f"{nombre}_{huella}.{self.formato}"
+    
+    def _en_cache(self, archivo: Path) -> bool:
+        """True si el gráfico ya existe (y lo marca como recién usado)"""
+        if not self.usar_cache:
+            return False
+        
+        try:
+            os.utime(archivo)
+        except OSError:
+            return False
+        
+        return True
+    
+    def _generar(self, tipo: str, nombre: str, datos: Dict, mensaje: str) -> Path:
+        """
+        Devuelve el gráfico de la caché o lo dibuja en este proceso
+        
+        Args:
+            tipo: Clave de DIBUJANTES
+            nombre: Prefijo del archivo
+            datos: Datos del gráfico
+            mensaje: Texto a mostrar al generarlo
+        
+        Returns:
+            Path: Ruta del gráfico
+        """
+        archivo = self._archivo(nombre, tipo, datos)
+        
+        if self._en_cache(archivo):
+            print(f"✅ Gráfico sin cambios: {archivo.name}")
+            return archivo
+        
+        _renderizar(tipo, datos, archivo, self.colores, self.dpi, self.formato)
+        limpiar_cache_graficos()
+        
+        print(f"✅ {mensaje}: {archivo.name}")
+        return archivo
     
     # ===================================================================
     # GRÁFICOS DE CICLO
     # ===================================================================
     
-    def grafico_progreso_ciclo(self, ciclo_id: int) -> Optional[Path]:
+    def grafico_progreso_ciclo(self, ciclo: Union[int, DatosCiclo]) -> Optional[Path]:
         """
         Gráfico de progreso diario del ciclo
         
         Args:
-            ciclo_id: ID del ciclo
+            ciclo: ID del ciclo o sus datos ya cargados (DatosCiclo)
         
         Returns:
             Path: Ruta del gráfico generado
         """
-        # Obtener días del ciclo
-        dias = db.execute_query("""
-            SELECT 
-                numero_dia,
-                fecha,
-                capital_inicial,
-                capital_final,
-                ganancia_neta
-            FROM dias
-            WHERE ciclo_id = ? AND estado = 'cerrado'
-            ORDER BY numero_dia
-        """, (ciclo_id,))
-        
-        if not dias or len(dias) < 2:
+        ciclo = DatosCiclo.obtener(ciclo)
+        
+        datos = _datos_progreso(ciclo)
+        if datos is None:
             print("❌ No hay suficientes datos para generar gráfico")
             return None
         
-        # Preparar datos
-        numeros_dia = [dia['numero_dia'] for dia in dias]
-        capital_inicial = [dia['capital_inicial'] for dia in dias]
-        capital_final = [dia['capital_final'] for dia in dias]
-        ganancias = [dia['ganancia_neta'] for dia in dias]
-        
-        # Crear figura con subplots
-        fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
-        
-        # Subplot 1: Capital
-        ax1.plot(numeros_dia, capital_inicial, 'o-', 
-                label='Capital Inicial', color=self.colores['capital'], linewidth=2)
-        ax1.plot(numeros_dia, capital_final, 's-', 
-                label='Capital Final', color=self.colores['ganancia'], linewidth=2)
-        ax1.set_xlabel('Día')
-        ax1.set_ylabel('Capital (USD)')
-        ax1.set_title(f'Evolución del Capital - Ciclo #{ciclo_id}')
-        ax1.legend()
-        ax1.grid(True, alpha=0.3)
-        
-        # Subplot 2: Ganancias diarias
-        colores_barras = [self.colores['ganancia'] if g >= 0 else self.colores['perdida'] 
-                         for g in ganancias]
-        ax2.bar(numeros_dia, ganancias, color=colores_barras, alpha=0.7)
-        ax2.axhline(y=0, color='black', linestyle='-', linewidth=0.5)
-        ax2.set_xlabel('Día')
-        ax2.set_ylabel('Ganancia Neta (USD)')
-        ax2.set_title('Ganancia Neta por Día')
-        ax2.grid(True, alpha=0.3)
-        
-        # Guardar
-        archivo = GRAFICOS_DIR / f"ciclo_{ciclo_id}_progreso_{self.timestamp}.png"
-        plt.tight_layout()
-        plt.savefig(archivo, dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        print(f"✅ Gráfico generado: {archivo.name}")
-        return archivo
+        return self._generar('progreso', f"ciclo_{ciclo.ciclo_id}_progreso", datos, "Gráfico generado")
     
-    def grafico_roi_ciclo(self, ciclo_id: int) -> Optional[Path]:
+    def grafico_roi_ciclo(self, ciclo: Union[int, DatosCiclo]) -> Optional[Path]:
         """
         Gráfico de ROI acumulado del ciclo
         
         Args:
-            ciclo_id: ID del ciclo
+            ciclo: ID del ciclo o sus datos ya cargados (DatosCiclo)
         
         Returns:
             Path: Ruta del gráfico generado
         """
-        # Obtener ciclo
-        ciclo = queries.obtener_ciclo_por_id(ciclo_id)
-        if not ciclo:
+        ciclo = DatosCiclo.obtener(ciclo)
+        if not ciclo.existe:
             print("❌ Ciclo no encontrado")
             return None
         
-        # Obtener días
-        dias = db.execute_query("""
-            SELECT 
-                numero_dia,
-                ganancia_neta
-            FROM dias
-            WHERE ciclo_id = ? AND estado = 'cerrado'
-            ORDER BY numero_dia
-        """, (ciclo_id,))
-        
-        if not dias:
+        datos = _datos_roi(ciclo, queries.obtener_ganancia_objetivo())
+        if datos is None:
             print("❌ No hay datos")
             return None
         
-        # Calcular ROI acumulado
-        numeros_dia = []
-        roi_acumulado = []
-        ganancia_acumulada = 0
-        
-        for dia in dias:
-            ganancia_acumulada += dia['ganancia_neta']
-            roi = (ganancia_acumulada / ciclo['inversion_inicial'] * 100) if ciclo['inversion_inicial'] > 0 else 0
-            numeros_dia.append(dia['numero_dia'])
-            roi_acumulado.append(roi)
-        
-        # Crear gráfico
-        fig, ax = plt.subplots(figsize=(12, 6))
-        
-        ax.plot(numeros_dia, roi_acumulado, 'o-', 
-                color=self.colores['ganancia'], linewidth=2, markersize=8)
-        ax.fill_between(numeros_dia, 0, roi_acumulado, 
-                        alpha=0.3, color=self.colores['ganancia'])
-        
-        ax.set_xlabel('Día')
-        ax.set_ylabel('ROI Acumulado (%)')
-        ax.set_title(f'ROI Acumulado - Ciclo #{ciclo_id}')
-        ax.grid(True, alpha=0.3)
-        
-        # Línea de objetivo si existe
-        ganancia_objetivo = queries.obtener_ganancia_objetivo()
-        dias_operados = len(dias)
-        roi_objetivo_acumulado = ganancia_objetivo * dias_operados
-        ax.axhline(y=roi_objetivo_acumulado, color=self.colores['objetivo'], 
-                  linestyle='--', label=f'Objetivo: {roi_objetivo_acumulado:.1f}%')
-        ax.legend()
-        
-        # Anotación final
-        roi_final = roi_acumulado[-1]
-        ax.annotate(f'ROI Final: {roi_final:.2f}%',
-                   xy=(numeros_dia[-1], roi_final),
-                   xytext=(10, 10), textcoords='offset points',
-                   bbox=dict(boxstyle='round,pad=0.5', fc='yellow', alpha=0.7),
-                   arrowprops=dict(arrowstyle='->', connectionstyle='arc3,rad=0'))
-        
-        # Guardar
-        archivo = GRAFICOS_DIR / f"ciclo_{ciclo_id}_roi_{self.timestamp}.png"
-        plt.tight_layout()
-        plt.savefig(archivo, dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        print(f"✅ Gráfico ROI generado: {archivo.name}")
-        return archivo
+        return self._generar('roi', f"ciclo_{ciclo.ciclo_id}_roi", datos, "Gráfico ROI generado")
     
-    def grafico_comisiones_ciclo(self, ciclo_id: int) -> Optional[Path]:
+    def grafico_comisiones_ciclo(self, ciclo: Union[int, DatosCiclo]) -> Optional[Path]:
         """
         Gráfico de comisiones pagadas por día
         
         Args:
-            ciclo_id: ID del ciclo
+            ciclo: ID del ciclo o sus datos ya cargados (DatosCiclo)
         
         Returns:
             Path: Ruta del gráfico generado
         """
-        dias = db.execute_query("""
-            SELECT 
-                numero_dia,
-                comisiones_pagadas
-            FROM dias
-            WHERE ciclo_id = ? AND estado = 'cerrado'
-            ORDER BY numero_dia
-        """, (ciclo_id,))
+        ciclo = DatosCiclo.obtener(ciclo)
         
-        if not dias:
+        datos = _datos_comisiones(ciclo)
+        if datos is None:
             print("❌ No hay datos")
             return None
         
-        numeros_dia = [dia['numero_dia'] for dia in dias]
-        comisiones = [dia['comisiones_pagadas'] if dia['comisiones_pagadas'] else 0 for dia in dias]
-        
-        # Crear gráfico
-        fig, ax = plt.subplots(figsize=(12, 6))
-        
-        ax.bar(numeros_dia, comisiones, color=self.colores['comision'], alpha=0.7)
-        ax.set_xlabel('Día')
-        ax.set_ylabel('Comisiones Pagadas (USD)')
-        ax.set_title(f'Comisiones por Día - Ciclo #{ciclo_id}')
-        ax.grid(True, alpha=0.3, axis='y')
-        
-        # Línea promedio
-        promedio = sum(comisiones) / len(comisiones) if comisiones else 0
-        ax.axhline(y=promedio, color='red', linestyle='--', 
-                  label=f'Promedio: ${promedio:.2f}')
-        ax.legend()
-        
-        # Total acumulado
-        total = sum(comisiones)
-        ax.text(0.02, 0.98, f'Total comisiones: ${total:.2f}',
-               transform=ax.transAxes, verticalalignment='top',
-               bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
-        
-        # Guardar
-        archivo = GRAFICOS_DIR / f"ciclo_{ciclo_id}_comisiones_{self.timestamp}.png"
-        plt.tight_layout()
-        plt.savefig(archivo, dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        print(f"✅ Gráfico de comisiones generado: {archivo.name}")
-        return archivo
+        return self._generar('comisiones', f"ciclo_{ciclo.ciclo_id}_comisiones", datos,
+                             "Gráfico de comisiones generado")
     
     # ===================================================================
     # GRÁFICOS COMPARATIVOS
@@ -263,50 +918,13 @@ class GeneradorGraficos:
         Returns:
             Path: Ruta del gráfico generado
         """
-        ciclos = db.execute_query("""
-            SELECT 
-                id,
-                dias_operados,
-                ganancia_total,
-                roi_total
-            FROM ciclos
-            WHERE estado = 'cerrado'
-            ORDER BY id
-        """)
-        
-        if not ciclos or len(ciclos) < 2:
+        datos = _datos_comparativo(_leer_ciclos_comparativo())
+        if datos is None:
             print("❌ Se necesitan al menos 2 ciclos cerrados")
             return None
         
-        ids = [f"#{c['id']}" for c in ciclos]
-        ganancias = [c['ganancia_total'] for c in ciclos]
-        rois = [c['roi_total'] for c in ciclos]
-        
-        # Crear figura con subplots
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
-        
-        # Subplot 1: Ganancias
-        ax1.bar(ids, ganancias, color=self.colores['ganancia'], alpha=0.7)
-        ax1.set_xlabel('Ciclo')
-        ax1.set_ylabel('Ganancia Total (USD)')
-        ax1.set_title('Ganancia Total por Ciclo')
-        ax1.grid(True, alpha=0.3, axis='y')
-        
-        # Subplot 2: ROI
-        ax2.bar(ids, rois, color=self.colores['objetivo'], alpha=0.7)
-        ax2.set_xlabel('Ciclo')
-        ax2.set_ylabel('ROI (%)')
-        ax2.set_title('ROI por Ciclo')
-        ax2.grid(True, alpha=0.3, axis='y')
-        
-        # Guardar
-        archivo = GRAFICOS_DIR / f"comparativo_ciclos_{self.timestamp}.png"
-        plt.tight_layout()
-        plt.savefig(archivo, dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        print(f"✅ Gráfico comparativo generado: {archivo.name}")
-        return archivo
+        return self._generar('comparativo_ciclos', "comparativo_ciclos", datos,
+                             "Gráfico comparativo generado")
     
     def grafico_eficiencia_ciclos(self) -> Optional[Path]:
         """
@@ -315,214 +933,549 @@ class GeneradorGraficos:
         Returns:
             Path: Ruta del gráfico generado
         """
-        ciclos = db.execute_query("""
-            SELECT 
-                id,
-                dias_operados,
-                ganancia_total
-            FROM ciclos
-            WHERE estado = 'cerrado' AND dias_operados > 0
-            ORDER BY id
-        """)
-        
-        if not ciclos:
+        datos = _datos_eficiencia(_leer_ciclos_eficiencia())
+        if datos is None:
             print("❌ No hay ciclos cerrados")
             return None
         
-        ids = [f"#{c['id']}" for c in ciclos]
-        eficiencia = [c['ganancia_total'] / c['dias_operados'] for c in ciclos]
-        
-        # Crear gráfico
-        fig, ax = plt.subplots(figsize=(12, 6))
-        
-        colores_barras = [self.colores['ganancia'] if e > 0 else self.colores['perdida'] 
-                         for e in eficiencia]
-        ax.bar(ids, eficiencia, color=colores_barras, alpha=0.7)
-        
-        ax.set_xlabel('Ciclo')
-        ax.set_ylabel('Ganancia Promedio por Día (USD)')
-        ax.set_title('Eficiencia por Ciclo (Ganancia/Día)')
-        ax.grid(True, alpha=0.3, axis='y')
-        
-        # Línea promedio global
-        promedio_global = sum(eficiencia) / len(eficiencia)
-        ax.axhline(y=promedio_global, color='red', linestyle='--',
-                  label=f'Promedio: ${promedio_global:.2f}/día')
-        ax.legend()
-        
-        # Guardar
-        archivo = GRAFICOS_DIR / f"eficiencia_ciclos_{self.timestamp}.png"
-        plt.tight_layout()
-        plt.savefig(archivo, dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        print(f"✅ Gráfico de eficiencia generado: {archivo.name}")
-        return archivo
+        return self._generar('eficiencia_ciclos', "eficiencia_ciclos", datos,
+                             "Gráfico de eficiencia generado")
     
     # ===================================================================
     # GRÁFICOS DE VENTAS
     # ===================================================================
     
-    def grafico_ventas_por_dia(self, ciclo_id: int) -> Optional[Path]:
+    def grafico_ventas_por_dia(self, ciclo: Union[int, DatosCiclo]) -> Optional[Path]:
         """
         Gráfico de número de ventas por día
         
         Args:
-            ciclo_id: ID del ciclo
+            ciclo: ID del ciclo o sus datos ya cargados (DatosCiclo)
         
         Returns:
             Path: Ruta del gráfico generado
         """
-        # Obtener datos
-        datos = db.execute_query("""
-            SELECT 
-                d.numero_dia,
-                COUNT(v.id) as num_ventas
-            FROM dias d
-            LEFT JOIN ventas v ON d.id = v.dia_id
-            WHERE d.ciclo_id = ? AND d.estado = 'cerrado'
-            GROUP BY d.id
-            ORDER BY d.numero_dia
-        """, (ciclo_id,))
-        
-        if not datos:
+        ciclo = DatosCiclo.obtener(ciclo)
+        
+        datos = _datos_ventas_dia(ciclo, queries.obtener_limites_ventas())
+        if datos is None:
             print("❌ No hay datos")
             return None
         
-        dias = [d['numero_dia'] for d in datos]
-        ventas = [d['num_ventas'] for d in datos]
-        
-        # Crear gráfico
-        fig, ax = plt.subplots(figsize=(12, 6))
-        
-        ax.bar(dias, ventas, color=self.colores['capital'], alpha=0.7)
-        ax.set_xlabel('Día')
-        ax.set_ylabel('Número de Ventas')
-        ax.set_title(f'Ventas Realizadas por Día - Ciclo #{ciclo_id}')
-        ax.grid(True, alpha=0.3, axis='y')
-        
-        # Límites recomendados
-        limites = queries.obtener_limites_ventas()
-        ax.axhline(y=limites[0], color='green', linestyle='--', alpha=0.5,
-                  label=f'Mínimo recomendado: {limites[0]}')
-        ax.axhline(y=limites[1], color='red', linestyle='--', alpha=0.5,
-                  label=f'Máximo recomendado: {limites[1]}')
-        ax.legend()
-        
-        # Promedio
-        promedio = sum(ventas) / len(ventas) if ventas else 0
-        ax.text(0.02, 0.98, f'Promedio: {promedio:.1f} ventas/día',
-               transform=ax.transAxes, verticalalignment='top',
-               bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
-        
-        # Guardar
-        archivo = GRAFICOS_DIR / f"ciclo_{ciclo_id}_ventas_dia_{self.timestamp}.png"
-        plt.tight_layout()
-        plt.savefig(archivo, dpi=300, bbox_inches='tight')
-        plt.close()
-        
-        print(f"✅ Gráfico de ventas generado: {archivo.name}")
-        return archivo
+        return self._generar('ventas_dia', f"ciclo_{ciclo.ciclo_id}_ventas_dia", datos,
+                             "Gráfico de ventas generado")
     
-    def grafico_distribucion_criptos(self, ciclo_id: int) -> Optional[Path]:
+    def grafico_distribucion_criptos(self, ciclo: Union[int, DatosCiclo]) -> Optional[Path]:
         """
         Gráfico de pastel de distribución de capital por cripto
         
         Args:
-            ciclo_id: ID del ciclo
+            ciclo: ID del ciclo o sus datos ya cargados (DatosCiclo)
         
         Returns:
             Path: Ruta del gráfico generado
         """
-        criptos = queries.obtener_criptos_boveda(ciclo_id)
+        ciclo = DatosCiclo.obtener(ciclo)
         
-        if not criptos:
+        datos = _datos_distribucion(ciclo)
+        if datos is None:
             print("❌ No hay criptos en bóveda")
             return None
         
-        nombres = [f"{c['simbolo']}\n${c['valor_usd']:.2f}" for c in criptos]
-        valores = [c['valor_usd'] for c in criptos]
+        return self._generar('distribucion', f"ciclo_{ciclo.ciclo_id}_distribucion", datos,
+                             "Gráfico de distribución generado")
+    
+    # ===================================================================
+    # DASHBOARD COMPLETO
+    # ===================================================================
+    
+    def generar_dashboard_ciclo(self, ciclo: Union[int, DatosCiclo]) -> List[Path]:
+        """
+        Genera todos los gráficos de un ciclo
+        
+        Lee los datos del ciclo una sola vez (DatosCiclo) y dibuja los
+        gráficos que no están en caché en paralelo en el pool de procesos,
+        de modo que el dashboard tarda más o menos lo que su gráfico más
+        lento. Los tiempos de cada gráfico quedan en self.tiempos.
         
-        # Crear gráfico
-        fig, ax = plt.subplots(figsize=(10, 8))
+        Args:
+            ciclo: ID del ciclo o sus datos ya cargados (DatosCiclo)
         
-        colores_pastel = plt.cm.Set3(range(len(criptos)))
+        Returns:
+            Lista de archivos generados
+        """
+        ciclo_id = ciclo.ciclo_id if isinstance(ciclo, DatosCiclo) else ciclo
+        print(f"\n📊 Generando dashboard completo del ciclo #{ciclo_id}...")
         
-        wedges, texts, autotexts = ax.pie(
-            valores, 
-            labels=nombres,
-            autopct='%1.1f%%',
-            colors=colores_pastel,
-            startangle=90
-        )
+        inicio = time.perf_counter()
+        trabajos = _trabajos_dashboard(DatosCiclo.obtener(ciclo))
+        self.tiempos = {}
+        archivos = {}
+        pendientes = []
+        
+        for tipo, nombre, datos in trabajos:
+            if datos is None:
+                continue
+            
+            archivo = self._archivo(nombre, tipo, datos)
+            if self._en_cache(archivo):
+                archivos[tipo] = archivo
+                self.tiempos[tipo] = None
+            else:
+                pendientes.append((tipo, datos, archivo))
         
-        # Mejorar legibilidad
-        for autotext in autotexts:
-            autotext.set_color('white')
-            autotext.set_fontweight('bold')
+        def registrar(tipo, archivo, obtener_duracion):
+            try:
+                self.tiempos[tipo] = obtener_duracion()
+                archivos[tipo] = archivo
+            except Exception as e:
+                print(f"   ❌ {tipo}: {e}")
+                log.error(f"Error al dibujar el gráfico {tipo} del ciclo #{ciclo_id}", str(e))
+                if isinstance(e, BrokenProcessPool):
+                    _cerrar_pool()
+        
+        opciones = (self.colores, self.dpi, self.formato)
+        
+        if self.trabajadores > 1 and len(pendientes) > 1:
+            pool = _obtener_pool(min(self.trabajadores, len(pendientes)))
+            futuros = {pool.submit(_renderizar, tipo, datos, archivo, *opciones): (tipo, archivo)
+                       for tipo, datos, archivo in pendientes}
+            for futuro in as_completed(futuros):
+                registrar(*futuros[futuro], futuro.result)
+        else:
+            for tipo, datos, archivo in pendientes:
+                registrar(tipo, archivo, lambda: _renderizar(tipo, datos, archivo, *opciones))
+        
+        if pendientes:
+            limpiar_cache_graficos()
+        
+        # Tiempos por gráfico, en el orden del dashboard
+        for tipo, _, datos in trabajos:
+            if datos is None:
+                print(f"   ⚠️  {tipo:<14} sin datos suficientes")
+            elif tipo in self.tiempos:
+                duracion = self.tiempos[tipo]
+                print(f"   ✅ {tipo:<14} {'sin cambios' if duracion is None else f'{duracion:.2f} s'}")
+        
+        print(f"\n✅ {len(archivos)} gráfico(s) generado(s) en {time.perf_counter() - inicio:.2f} s "
+              f"({self.dpi} dpi, {self.formato.upper()})")
+        print(f"📂 Ubicación: {GRAFICOS_DIR.absolute()}")
         
-        ax.set_title(f'Distribución de Capital por Cripto - Ciclo #{ciclo_id}')
+        return [archivos[tipo] for tipo, _, _ in trabajos if tipo in archivos]
+
+
+# ===================================================================
+# EXPORTACIÓN HTML
+# ===================================================================
+# Cada página lleva sus datos como JSON y los dibuja en el navegador con
+# SVG (sin bibliotecas externas ni conexión), así que exportar un ciclo
+# solo cuesta leerlo de la BD y escribir el archivo: no hace falta
+# matplotlib y se pueden publicar cientos de ciclos en segundos.
+
+PLANTILLA_HTML = """<!DOCTYPE html>
+<html lang="es">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>__TITULO__</title>
+<style>
+body { font-family: system-ui, sans-serif; margin: 0 auto; max-width: 1100px; padding: 1em; color: #2c3e50; background: #f4f6f8; }
+h1 { font-size: 1.4em; }
+nav a { margin-right: 1em; }
+figure { background: #fff; margin: 0 0 1.2em; padding: .5em; border-radius: 6px; box-shadow: 0 1px 3px rgba(0,0,0,.1); }
+figcaption { font-size: .85em; padding: 0 .5em; }
+figcaption span { margin-right: 1.2em; white-space: nowrap; }
+figcaption i { display: inline-block; width: .9em; height: .9em; margin-right: .3em; vertical-align: middle; }
+svg { width: 100%; height: auto; }
+svg text { font-size: 11px; fill: #2c3e50; }
+svg .titulo { font-size: 14px; font-weight: bold; text-anchor: middle; }
+svg .rejilla { stroke: #dfe4ea; }
+table { border-collapse: collapse; background: #fff; width: 100%; font-size: .9em; }
+th, td { padding: .35em .7em; border-bottom: 1px solid #dfe4ea; text-align: right; }
+th:first-child, td:first-child { text-align: left; }
+.aviso { color: #7f8c8d; }
+</style>
+</head>
+<body>
+<h1>__TITULO__</h1>
+<nav>__NAVEGACION__</nav>
+<main id="vistas"></main>
+<script type="application/json" id="datos">__DATOS__</script>
+<script>
+(function () {
+  'use strict';
+  var NS = 'http://www.w3.org/2000/svg';
+  var ANCHO = 760, ALTO = 320, M = {izq: 64, der: 20, sup: 34, inf: 44};
+  var SET3 = ['#8dd3c7', '#ffffb3', '#bebada', '#fb8072', '#80b1d3', '#fdb462',
+              '#b3de69', '#fccde5', '#d9d9d9', '#bc80bd', '#ccebc5', '#ffed6f'];
+  var pagina = JSON.parse(document.getElementById('datos').textContent);
+  var C = pagina.colores;
+  var main = document.getElementById('vistas');
+
+  function el(tag, attrs, padre, texto) {
+    var e = document.createElementNS(NS, tag);
+    for (var k in attrs) { e.setAttribute(k, attrs[k]); }
+    if (texto !== undefined) { e.textContent = texto; }
+    if (padre) { padre.appendChild(e); }
+    return e;
+  }
+  function fmt(v, dec) { return Number(v).toFixed(dec === undefined ? 2 : dec); }
+  function suma(vs) { return vs.reduce(function (a, b) { return a + b; }, 0); }
+  function promedio(vs) { return vs.length ? suma(vs) / vs.length : 0; }
+  function signo(vs) { return vs.map(function (v) { return v >= 0 ? C.ganancia : C.perdida; }); }
+
+  function figura(titulo, leyenda, nota) {
+    var fig = document.createElement('figure');
+    main.appendChild(fig);
+    var svg = el('svg', {viewBox: '0 0 ' + ANCHO + ' ' + ALTO, role: 'img'}, fig);
+    el('text', {x: ANCHO / 2, y: 20, 'class': 'titulo'}, svg, titulo);
+    var pie = document.createElement('figcaption');
+    (leyenda || []).forEach(function (item) {
+      var s = document.createElement('span');
+      var marca = document.createElement('i');
+      marca.style.background = item.color;
+      s.appendChild(marca);
+      s.appendChild(document.createTextNode(item.nombre));
+      pie.appendChild(s);
+    });
+    if (nota) {
+      var n = document.createElement('span');
+      n.textContent = nota;
+      pie.appendChild(n);
+    }
+    fig.appendChild(pie);
+    return svg;
+  }
+
+  // o: {titulo, x, ejeX, ejeY, series: [{tipo: barras|linea|area, valores,
+  //     color, colores, nombre}], lineas: [{y, color, nombre}], nota}
+  function cartesiano(o) {
+    var leyenda = [];
+    var todos = [];
+    o.series.forEach(function (s) {
+      todos = todos.concat(s.valores);
+      if (s.tipo !== 'linea') { todos.push(0); }
+      if (s.nombre) { leyenda.push({color: s.color, nombre: s.nombre}); }
+    });
+    (o.lineas || []).forEach(function (l) {
+      todos.push(l.y);
+      leyenda.push({color: l.color, nombre: l.nombre});
+    });
+    var min = Math.min.apply(null, todos), max = Math.max.apply(null, todos);
+    var margen = (max - min) * 0.05 || Math.abs(max) * 0.05 || 1;
+    if (max === min) {
+      // Serie plana (p. ej. todo en 0): se abre el rango para poder dibujarla
+      min -= margen;
+      max += margen;
+    } else {
+      if (min !== 0) { min -= margen; }
+      if (max !== 0) { max += margen; }
+    }
+
+    var svg = figura(o.titulo, leyenda, o.nota);
+    var n = o.x.length;
+    var banda = (ANCHO - M.izq - M.der) / n;
+    function px(i) { return M.izq + banda * (i + 0.5); }
+    function py(v) { return M.sup + (max - v) / (max - min) * (ALTO - M.sup - M.inf); }
+
+    for (var k = 0; k <= 4; k++) {
+      var v = min + (max - min) * k / 4;
+      el('line', {x1: M.izq, x2: ANCHO - M.der, y1: py(v), y2: py(v), 'class': 'rejilla'}, svg);
+      el('text', {x: M.izq - 6, y: py(v) + 4, 'text-anchor': 'end'}, svg, fmt(v, Math.abs(max - min) >= 100 ? 0 : 2));
+    }
+    var paso = Math.ceil(n / 20);
+    o.x.forEach(function (etiqueta, i) {
+      if (i % paso === 0) {
+        el('text', {x: px(i), y: ALTO - M.inf + 16, 'text-anchor': 'middle'}, svg, etiqueta);
+      }
+    });
+    el('text', {x: (ANCHO + M.izq) / 2, y: ALTO - 6, 'text-anchor': 'middle'}, svg, o.ejeX);
+    el('text', {x: 14, y: (ALTO + M.sup - M.inf) / 2, 'text-anchor': 'middle',
+                transform: 'rotate(-90 14 ' + (ALTO + M.sup - M.inf) / 2 + ')'}, svg, o.ejeY);
+    el('line', {x1: M.izq, x2: ANCHO - M.der, y1: py(0), y2: py(0), stroke: '#000', 'stroke-width': 0.5}, svg);
+
+    o.series.forEach(function (s) {
+      if (s.tipo === 'barras') {
+        s.valores.forEach(function (v, i) {
+          var r = el('rect', {x: px(i) - banda * 0.4, width: banda * 0.8,
+                              y: Math.min(py(v), py(0)), height: Math.abs(py(v) - py(0)),
+                              fill: s.colores ? s.colores[i] : s.color, 'fill-opacity': 0.7}, svg);
+          el('title', {}, r, o.x[i] + ': ' + fmt(v));
+        });
+        return;
+      }
+      var puntos = s.valores.map(function (v, i) { return px(i) + ',' + py(v); });
+      if (s.tipo === 'area') {
+        el('polygon', {points: px(0) + ',' + py(0) + ' ' + puntos.join(' ') + ' ' + px(n - 1) + ',' + py(0),
+                       fill: s.color, 'fill-opacity': 0.3}, svg);
+      }
+      el('polyline', {points: puntos.join(' '), fill: 'none', stroke: s.color, 'stroke-width': 2}, svg);
+      if (n <= 120) {
+        s.valores.forEach(function (v, i) {
+          var c = el('circle', {cx: px(i), cy: py(v), r: 3.5, fill: s.color}, svg);
+          el('title', {}, c, o.x[i] + ': ' + fmt(v));
+        });
+      }
+    });
+
+    (o.lineas || []).forEach(function (l) {
+      el('line', {x1: M.izq, x2: ANCHO - M.der, y1: py(l.y), y2: py(l.y), stroke: l.color,
+                  'stroke-dasharray': '6 4', 'stroke-width': 1.5}, svg);
+    });
+  }
+
+  function pastel(titulo, nombres, valores, nota) {
+    var total = suma(valores);
+    var svg = figura(titulo, [], nota);
+    var cx = ANCHO / 2, cy = ALTO / 2 + 12, r = 112;
+    var angulo = Math.PI / 2;
+    valores.forEach(function (v, i) {
+      var fin = angulo + 2 * Math.PI * v / total;
+      var color = SET3[i % SET3.length];
+      var forma;
+      if (valores.length === 1) {
+        forma = el('circle', {cx: cx, cy: cy, r: r, fill: color}, svg);
+      } else {
+        forma = el('path', {d: 'M' + cx + ',' + cy +
+                            ' L' + (cx + r * Math.cos(angulo)) + ',' + (cy - r * Math.sin(angulo)) +
+                            ' A' + r + ',' + r + ' 0 ' + (fin - angulo > Math.PI ? 1 : 0) + ' 0 ' +
+                            (cx + r * Math.cos(fin)) + ',' + (cy - r * Math.sin(fin)) + ' Z',
+                            fill: color, stroke: '#fff'}, svg);
+      }
+      el('title', {}, forma, nombres[i].replace('\\n', ' '));
+      var medio = (angulo + fin) / 2;
+      el('text', {x: cx + r * 0.6 * Math.cos(medio), y: cy - r * 0.6 * Math.sin(medio) + 4,
+                  'text-anchor': 'middle', 'font-weight': 'bold'}, svg, fmt(v / total * 100, 1) + '%');
+      var etiqueta = nombres[i].split('\\n');
+      var ex = cx + r * 1.18 * Math.cos(medio), ey = cy - r * 1.18 * Math.sin(medio);
+      var texto = el('text', {x: ex, y: ey, 'text-anchor': Math.cos(medio) >= 0 ? 'start' : 'end'}, svg, etiqueta[0]);
+      if (etiqueta[1]) { el('tspan', {x: ex, dy: 13}, texto, etiqueta[1]); }
+      angulo = fin;
+    });
+  }
+
+  function dias(d) { return d.numero_dia.map(String); }
+
+  // Las mismas vistas que DIBUJANTES en features/graficos.py
+  var VISTAS = {
+    progreso: function (d) {
+      cartesiano({titulo: 'Evolución del Capital - Ciclo #' + d.ciclo_id, x: dias(d), ejeX: 'Día', ejeY: 'Capital (USD)',
+                  series: [{tipo: 'linea', valores: d.capital_inicial, color: C.capital, nombre: 'Capital Inicial'},
+                           {tipo: 'linea', valores: d.capital_final, color: C.ganancia, nombre: 'Capital Final'}]});
+      cartesiano({titulo: 'Ganancia Neta por Día', x: dias(d), ejeX: 'Día', ejeY: 'Ganancia Neta (USD)',
+                  series: [{tipo: 'barras', valores: d.ganancia_neta, colores: signo(d.ganancia_neta)}]});
+    },
+    roi: function (d) {
+      cartesiano({titulo: 'ROI Acumulado - Ciclo #' + d.ciclo_id, x: dias(d), ejeX: 'Día', ejeY: 'ROI Acumulado (%)',
+                  series: [{tipo: 'area', valores: d.roi_acumulado, color: C.ganancia}],
+                  lineas: [{y: d.roi_objetivo, color: C.objetivo, nombre: 'Objetivo: ' + fmt(d.roi_objetivo, 1) + '%'}],
+                  nota: 'ROI Final: ' + fmt(d.roi_acumulado[d.roi_acumulado.length - 1]) + '%'});
+    },
+    comisiones: function (d) {
+      var prom = promedio(d.comisiones);
+      cartesiano({titulo: 'Comisiones por Día - Ciclo #' + d.ciclo_id, x: dias(d), ejeX: 'Día', ejeY: 'Comisiones Pagadas (USD)',
+                  series: [{tipo: 'barras', valores: d.comisiones, color: C.comision}],
+                  lineas: [{y: prom, color: 'red', nombre: 'Promedio: $' + fmt(prom)}],
+                  nota: 'Total comisiones: $' + fmt(suma(d.comisiones))});
+    },
+    ventas_dia: function (d) {
+      cartesiano({titulo: 'Ventas Realizadas por Día - Ciclo #' + d.ciclo_id, x: dias(d), ejeX: 'Día', ejeY: 'Número de Ventas',
+                  series: [{tipo: 'barras', valores: d.num_ventas, color: C.capital}],
+                  lineas: [{y: d.limites[0], color: 'green', nombre: 'Mínimo recomendado: ' + d.limites[0]},
+                           {y: d.limites[1], color: 'red', nombre: 'Máximo recomendado: ' + d.limites[1]}],
+                  nota: 'Promedio: ' + fmt(promedio(d.num_ventas), 1) + ' ventas/día'});
+    },
+    distribucion: function (d) {
+      pastel('Distribución de Capital por Cripto - Ciclo #' + d.ciclo_id, d.nombres, d.valores,
+             'Total: $' + fmt(suma(d.valores)));
+    },
+    comparativo_ciclos: function (d) {
+      cartesiano({titulo: 'Ganancia Total por Ciclo', x: d.ids, ejeX: 'Ciclo', ejeY: 'Ganancia Total (USD)',
+                  series: [{tipo: 'barras', valores: d.ganancias, color: C.ganancia}]});
+      cartesiano({titulo: 'ROI por Ciclo', x: d.ids, ejeX: 'Ciclo', ejeY: 'ROI (%)',
+                  series: [{tipo: 'barras', valores: d.rois, color: C.objetivo}]});
+    },
+    eficiencia_ciclos: function (d) {
+      var prom = promedio(d.eficiencia);
+      cartesiano({titulo: 'Eficiencia por Ciclo (Ganancia/Día)', x: d.ids, ejeX: 'Ciclo', ejeY: 'Ganancia Promedio por Día (USD)',
+                  series: [{tipo: 'barras', valores: d.eficiencia, colores: signo(d.eficiencia)}],
+                  lineas: [{y: prom, color: 'red', nombre: 'Promedio: $' + fmt(prom) + '/día'}]});
+    }
+  };
+
+  pagina.vistas.forEach(function (vista) { VISTAS[vista.tipo](vista.datos); });
+
+  if (pagina.ciclos) {
+    var tabla = document.createElement('table');
+    tabla.innerHTML = '<tr><th>Ciclo</th><th>Inicio</th><th>Estado</th><th>Días</th>' +
+                      '<th>Ganancia (USD)</th><th>ROI (%)</th></tr>';
+    pagina.ciclos.forEach(function (c) {
+      var fila = tabla.insertRow();
+      var enlace = document.createElement('a');
+      enlace.href = 'ciclo_' + c.id + '.html';
+      enlace.textContent = '#' + c.id;
+      fila.insertCell().appendChild(enlace);
+      [c.fecha_inicio, c.estado, c.dias_operados,
+       c.ganancia_total === null ? null : fmt(c.ganancia_total),
+       c.roi_total === null ? null : fmt(c.roi_total)].forEach(function (v) {
+        fila.insertCell().textContent = v === null ? '' : v;
+      });
+    });
+    main.appendChild(tabla);
+  }
+
+  if (!main.childNodes.length) {
+    var aviso = document.createElement('p');
+    aviso.className = 'aviso';
+    aviso.textContent = 'No hay datos suficientes para generar gráficos.';
+    main.appendChild(aviso);
+  }
+})();
+</script>
+</body>
+</html>
+"""
+
+
+class ExportadorHTML:
+    """
+    Exporta los dashboards a HTML autocontenido
+    
+    Usa los mismos datos que GeneradorGraficos (ver _datos_*), pero en
+    lugar de dibujarlos los incrusta como JSON en una página que los
+    dibuja en el navegador. No necesita matplotlib.
+    """
+    
+    def __init__(self, directorio: Path = HTML_DIR):
+        """
+        Args:
+            directorio: Carpeta de salida de las páginas
+        """
+        self.directorio = Path(directorio)
+        self.directorio.mkdir(parents=True, exist_ok=True)
+        self.colores = dict(COLORES)
+    
+    def _escribir(self, nombre: str, titulo: str, vistas: List[tuple],
+                  ciclos: Optional[List[Dict]] = None) -> Path:
+        """
+        Escribe una página con sus datos incrustados
         
-        # Total
-        total = sum(valores)
-        plt.text(0, -1.3, f'Total: ${total:.2f}',
-                ha='center', fontsize=12, fontweight='bold',
-                bbox=dict(boxstyle='round', facecolor='lightblue', alpha=0.5))
+        Args:
+            nombre: Nombre del archivo sin extensión
+            titulo: Título de la página
+            vistas: (tipo, datos) de cada vista, en orden; las de datos None se omiten
+            ciclos: Filas de la tabla de ciclos (solo en el índice)
         
-        # Guardar
-        archivo = GRAFICOS_DIR / f"ciclo_{ciclo_id}_distribucion_{self.timestamp}.png"
-        plt.tight_layout()
-        plt.savefig(archivo, dpi=300, bbox_inches='tight')
-        plt.close()
+        Returns:
+            Path: Ruta de la página
+        """
+        pagina = {
+            'colores': self.colores,
+            'vistas': [{'tipo': tipo, 'datos': datos} for tipo, datos in vistas if datos is not None],
+        }
+        if ciclos is not None:
+            pagina['ciclos'] = ciclos
+        
+        # "<" escapado: ningún dato puede cerrar el <script> que lo contiene
+        datos = json.dumps(pagina, ensure_ascii=False, separators=(',', ':')).replace('<', '\\u003c')
+        navegacion = '' if nombre == 'index' else '<a href="index.html">← Todos los ciclos</a>'
+        
+        contenido = (PLANTILLA_HTML
+                     .replace('__TITULO__', html.escape(titulo))
+                     .replace('__NAVEGACION__', navegacion)
+                     .replace('__DATOS__', datos))
+        
+        archivo = self.directorio / f"{nombre}.html"
+        temporal = archivo.with_name(f".{archivo.stem}.{os.getpid()}.tmp")
+        
+        try:
+            temporal.write_text(contenido, encoding='utf-8')
+            os.replace(temporal, archivo)
+        finally:
+            temporal.unlink(missing_ok=True)
         
-        print(f"✅ Gráfico de distribución generado: {archivo.name}")
         return archivo
     
-    # ===================================================================
-    # DASHBOARD COMPLETO
-    # ===================================================================
-    
-    def generar_dashboard_ciclo(self, ciclo_id: int) -> List[Path]:
+    def exportar_ciclo(self, ciclo: Union[int, DatosCiclo]) -> Optional[Path]:
         """
-        Genera todos los gráficos de un ciclo
+        Página con el dashboard de un ciclo (las vistas de generar_dashboard_ciclo)
         
         Args:
-            ciclo_id: ID del ciclo
+            ciclo: ID del ciclo o sus datos ya cargados (DatosCiclo)
         
         Returns:
-            Lista de archivos generados
+            Path: Ruta de la página (None si el ciclo no existe)
         """
-        print(f"\n📊 Generando dashboard completo del ciclo #{ciclo_id}...")
+        ciclo = DatosCiclo.obtener(ciclo)
+        if not ciclo.existe:
+            print(f"❌ Ciclo #{ciclo.ciclo_id} no encontrado")
+            return None
         
-        archivos = []
+        vistas = [(tipo, datos) for tipo, _, datos in _trabajos_dashboard(ciclo)]
+        return self._escribir(f"ciclo_{ciclo.ciclo_id}", f"Dashboard - Ciclo #{ciclo.ciclo_id}", vistas)
+    
+    def exportar_indice(self) -> Path:
+        """
+        Página índice: comparativo y eficiencia de ciclos y enlaces a los
+        ciclos ya exportados en el directorio
+        
+        Returns:
+            Path: Ruta de index.html
+        """
+        ciclos = _leer_columnas("""
+            SELECT id, fecha_inicio, estado, dias_operados, ganancia_total, roi_total
+            FROM ciclos
+            ORDER BY id
+        """)
         
-        # Progreso
-        archivo = self.grafico_progreso_ciclo(ciclo_id)
-        if archivo:
-            archivos.append(archivo)
+        filas = [dict(zip(ciclos, fila)) for fila in zip(*ciclos.values())]
+        filas = [fila for fila in filas if (self.directorio / f"ciclo_{fila['id']}.html").exists()]
         
-        # ROI
-        archivo = self.grafico_roi_ciclo(ciclo_id)
-        if archivo:
-            archivos.append(archivo)
+        vistas = [
+            ('comparativo_ciclos', _datos_comparativo(_leer_ciclos_comparativo())),
+            ('eficiencia_ciclos', _datos_eficiencia(_leer_ciclos_eficiencia())),
+        ]
+        return self._escribir('index', "Ciclos de arbitraje", vistas, filas)
+    
+    def exportar_ciclos(self, ciclo_ids: Optional[Iterable[int]] = None) -> List[Path]:
+        """
+        Exporta el dashboard de varios ciclos y el índice que los enlaza
         
-        # Comisiones
-        archivo = self.grafico_comisiones_ciclo(ciclo_id)
-        if archivo:
-            archivos.append(archivo)
+        Args:
+            ciclo_ids: Ciclos a exportar (None = todos)
         
-        # Ventas por día
-        archivo = self.grafico_ventas_por_dia(ciclo_id)
-        if archivo:
-            archivos.append(archivo)
+        Returns:
+            list: Páginas escritas (la última es index.html, que enlaza
+                  también los ciclos exportados antes)
+        """
+        if ciclo_ids is None:
+            ciclo_ids = [fila[0] for fila in db.execute_query(
+                "SELECT id FROM ciclos ORDER BY id", formato='tupla'
+            )]
+        ciclo_ids = list(ciclo_ids)
         
-        # Distribución
-        archivo = self.grafico_distribucion_criptos(ciclo_id)
-        if archivo:
-            archivos.append(archivo)
+        print(f"\n🌐 Exportando {len(ciclo_ids)} dashboard(s) HTML...")
         
-        print(f"\n✅ {len(archivos)} gráfico(s) generado(s)")
-        print(f"📂 Ubicación: {GRAFICOS_DIR.absolute()}")
+        inicio = time.perf_counter()
+        archivos = []
+        
+        for ciclo_id in ciclo_ids:
+            try:
+                archivo = self.exportar_ciclo(ciclo_id)
+            except Exception as e:
+                print(f"   ❌ Ciclo #{ciclo_id}: {e}")
+                log.error(f"Error al exportar a HTML el ciclo #{ciclo_id}", str(e))
+                continue
+            
+            if archivo:
+                archivos.append(archivo)
+        
+        exportados = len(archivos)
+        archivos.append(self.exportar_indice())
+        
+        print(f"\n✅ {exportados}/{len(ciclo_ids)} ciclo(s) exportado(s) a HTML "
+              f"en {time.perf_counter() - inicio:.2f} s")
+        print(f"📂 Ubicación: {self.directorio.absolute()} (abrir index.html)")
         
         return archivos
 
@@ -550,7 +1503,9 @@ def menu_graficos():
         print("[8] Eficiencia de ciclos")
         print("[9] Dashboard del ciclo activo")
         print("[10] Ver gráficos generados")
-        print("[11] Volver")
+        print(f"[11] Resolución y formato ({generador.dpi} dpi, {generador.formato.upper()})")
+        print("[12] Exportar dashboards HTML")
+        print("[13] Volver")
         print("="*70)
         
         opcion = input("\nSelecciona: ").strip()
@@ -624,12 +1579,39 @@ def menu_graficos():
             input("\nPresiona Enter...")
         
         elif opcion == "11":
+            try:
+                dpi = int(input(f"\nDPI ({generador.dpi}): ").strip() or generador.dpi)
+                formato = input(f"Formato ({'/'.join(FORMATOS_GRAFICO)}) [{generador.formato}]: ").strip().lower()
+                generador = GeneradorGraficos(dpi=dpi, formato=formato or generador.formato)
+                print(f"✅ Gráficos en {generador.dpi} dpi, {generador.formato.upper()}")
+            except ValueError as e:
+                print(f"❌ Valor inválido: {e}")
+            input("\nPresiona Enter...")
+        
+        elif opcion == "12":
+            menu_exportar_html()
+            input("\nPresiona Enter...")
+        
+        elif opcion == "13":
             break
         
         else:
             print("❌ Opción inválida")
 
 
+def menu_exportar_html():
+    """Exporta a HTML el dashboard de un ciclo o de todos (no necesita matplotlib)"""
+    entrada = input("\nIDs de ciclo separados por coma (Enter = todos): ").strip()
+    
+    try:
+        ciclo_ids = [int(x) for x in entrada.split(',')] if entrada else None
+    except ValueError:
+        print("❌ IDs inválidos")
+        return
+    
+    ExportadorHTML().exportar_ciclos(ciclo_ids)
+
+
 def listar_graficos_generados():
     """Lista todos los gráficos generados"""
     
@@ -637,7 +1619,8 @@ def listar_graficos_generados():
     print("GRÁFICOS GENERADOS")
     print("="*70)
     
-    graficos = list(GRAFICOS_DIR.glob("*.png"))
+    graficos = [archivo for formato in FORMATOS_GRAFICO
+                for archivo in GRAFICOS_DIR.glob(f"*.{formato}")]
     
     if not graficos:
         print("\n⚠️  No hay gráficos generados")
@@ -667,15 +1650,14 @@ def listar_graficos_generados():
 # ===================================================================
 
 def verificar_matplotlib():
-    """Verifica si matplotlib está instalado"""
-    try:
-        import matplotlib
+    """Verifica si matplotlib está instalado (sin importarlo)"""
+    if importlib.util.find_spec('matplotlib') is not None:
         return True
-    except ImportError:
-        print("\n❌ matplotlib no está instalado")
-        print("\nPara instalar, ejecuta:")
-        print("pip install matplotlib --break-system-packages")
-        return False
+    
+    print("\n❌ matplotlib no está instalado")
+    print("\nPara instalar, ejecuta:")
+    print("pip install matplotlib --break-system-packages")
+    return False
 
 
 # ===================================================================
@@ -11,6 +11,7 @@ from datetime import datetime
 from typing import Optional, List
 from core.db_manager import db
 from core.logger import log
+from core.migraciones import asegurar_esquema
 
 
 # ===================================================================
@@ -20,34 +21,8 @@ from core.logger import log
 def inicializar_tabla_notas():
     """Crea la tabla de notas si no existe"""
     
-    with db.get_cursor(commit=True) as cursor:
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS notas (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                tipo TEXT NOT NULL,
-                referencia_id INTEGER,
-                titulo TEXT NOT NULL,
-                contenido TEXT NOT NULL,
-                prioridad TEXT DEFAULT 'normal',
-                etiquetas TEXT,
-                fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                fecha_modificacion TIMESTAMP,
-                autor TEXT DEFAULT 'Operador'
-            )
-        """)
-        
-        # Índices para búsqueda rápida
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_notas_tipo 
-            ON notas(tipo)
-        """)
-        
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_notas_referencia 
-            ON notas(tipo, referencia_id)
-        """)
-    
-    log.info("Tabla de notas inicializada", categoria='general')
+    # La tabla y sus índices forman parte de las migraciones (core/migraciones.py)
+    asegurar_esquema()
 
 
 # Inicializar al importar
@@ -8,10 +8,20 @@ Exporta datos a CSV, TXT y genera resúmenes ejecutivos
 """
 
 import csv
+import importlib.util
+import io
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import closing, redirect_stdout
+from itertools import chain, groupby
+from operator import attrgetter
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Iterable
 from core.db_manager import db
+from core.logger import log
 from core.queries import queries
 
 
@@ -23,6 +33,58 @@ REPORTES_DIR = Path("reportes")
 REPORTES_DIR.mkdir(exist_ok=True)
 
 
+# ===================================================================
+# CONFIGURACIÓN
+# ===================================================================
+
+# Exportación en lote: procesos de trabajo (por defecto uno por núcleo).
+# Con pocos ciclos no compensa arrancar procesos y se exporta en línea.
+EXPORTACION_TRABAJADORES = int(os.environ.get('ARBITRAJE_TRABAJADORES', 0)) or os.cpu_count() or 1
+EXPORTACION_MIN_PARALELO = 4
+
+
+# ===================================================================
+# CONSULTAS
+# ===================================================================
+# core/plan_consultas.py audita estas mismas constantes
+
+# Ventas de un ciclo con su día y cripto, agrupables por día (ver
+# _stream_ventas_ciclo). Parámetros: (ciclo_id,)
+_SQL_VENTAS_CICLO = """
+    SELECT 
+        v.dia_id,
+        d.numero_dia,
+        d.fecha,
+        c.nombre as cripto,
+        c.simbolo,
+        v.cantidad,
+        v.precio_unitario,
+        v.costo_total,
+        v.monto_venta,
+        v.comision,
+        v.efectivo_recibido,
+        v.ganancia_bruta,
+        v.ganancia_neta
+    FROM ventas v
+    JOIN dias d ON v.dia_id = d.id
+    JOIN criptomonedas c ON v.cripto_id = c.id
+    WHERE d.ciclo_id = ? {filtro_estado}
+    ORDER BY d.numero_dia, d.id, v.fecha
+"""
+SQL_VENTAS_CICLO = _SQL_VENTAS_CICLO.format(filtro_estado="")
+SQL_VENTAS_CICLO_CERRADOS = _SQL_VENTAS_CICLO.format(filtro_estado="AND d.estado = 'cerrado'")
+
+# Días del ciclo con su número de ventas (de resumen_dia, sin una consulta
+# por día). Parámetros: (ciclo_id,)
+SQL_DIAS_CICLO_CSV = """
+    SELECT d.*, COALESCE(rd.num_ventas, 0) as num_ventas
+    FROM dias d
+    LEFT JOIN resumen_dia rd ON rd.dia_id = d.id
+    WHERE d.ciclo_id = ?
+    ORDER BY d.numero_dia
+"""
+
+
 # ===================================================================
 # GENERADOR DE REPORTES
 # ===================================================================
@@ -30,8 +92,8 @@ REPORTES_DIR.mkdir(exist_ok=True)
 class GeneradorReportes:
     """Genera reportes en diferentes formatos"""
     
-    def __init__(self):
-        self.timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    def __init__(self, timestamp: Optional[str] = None):
+        self.timestamp = timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
     
     # ===================================================================
     # REPORTES DE CICLO
@@ -57,13 +119,22 @@ class GeneradorReportes:
         dias = db.execute_query("""
             SELECT * FROM dias
             WHERE ciclo_id = ?
-            ORDER BY numero_dia
+            ORDER BY numero_dia, id
         """, (ciclo_id,))
         
+        # Ventas de los días cerrados en una sola consulta, en el mismo orden
+        # que los días: se consumen día a día a medida que se escribe
+        lotes_ventas = self._stream_ventas_ciclo(ciclo_id, solo_cerrados=True)
+        
         # Crear archivo
         archivo = REPORTES_DIR / f"reporte_ciclo_{ciclo_id}_{self.timestamp}.txt"
         
-        with open(archivo, 'w', encoding='utf-8') as f:
+        # closing() devuelve al pool la conexión del stream aunque quedaran
+        # filas o la escritura falle a mitad
+        with closing(lotes_ventas), open(archivo, 'w', encoding='utf-8') as f:
+            ventas_por_dia = groupby(chain.from_iterable(lotes_ventas), key=attrgetter('dia_id'))
+            grupo = next(ventas_por_dia, None)
+            
             # Encabezado
             f.write("="*70 + "\n")
             f.write(f"REPORTE COMPLETO - CICLO #{ciclo_id}\n")
@@ -90,25 +161,17 @@ class GeneradorReportes:
             
             f.write("\n")
             
-            # Estadísticas generales
-            stats = db.execute_query("""
-                SELECT 
-                    COUNT(*) as total_dias,
-                    COALESCE(SUM(ganancia_neta), 0) as ganancia_total,
-                    COALESCE(AVG(ganancia_neta), 0) as ganancia_promedio,
-                    COALESCE(MAX(ganancia_neta), 0) as mejor_dia,
-                    COALESCE(MIN(ganancia_neta), 0) as peor_dia
-                FROM dias
-                WHERE ciclo_id = ? AND estado = 'cerrado'
-            """, (ciclo_id,), fetch_one=True)
+            # Estadísticas generales (precalculadas en resumen_ciclo)
+            stats = queries.obtener_resumen_ciclo(ciclo_id)
             
-            if stats['total_dias'] > 0:
+            if stats and stats['dias_cerrados'] > 0:
+                ganancia_promedio = stats['ganancia_dias'] / stats['dias_cerrados']
                 f.write("📈 ESTADÍSTICAS\n")
                 f.write("-"*70 + "\n")
-                f.write(f"Ganancia promedio por día: ${stats['ganancia_promedio']:.2f}\n")
+                f.write(f"Ganancia promedio por día: ${ganancia_promedio:.2f}\n")
                 f.write(f"Mejor día: ${stats['mejor_dia']:.2f}\n")
                 f.write(f"Peor día: ${stats['peor_dia']:.2f}\n")
-                f.write(f"Ganancia total acumulada: ${stats['ganancia_total']:.2f}\n")
+                f.write(f"Ganancia total acumulada: ${stats['ganancia_dias']:.2f}\n")
                 f.write("\n")
             
             # Detalle de días
@@ -128,15 +191,19 @@ class GeneradorReportes:
                         f.write(f"Comisiones: ${dia['comisiones_pagadas']:.2f}\n")
                         
                         # Ventas del día
-                        ventas = queries.obtener_ventas_dia(dia['id'])
+                        ventas = []
+                        if grupo is not None and grupo[0] == dia['id']:
+                            ventas = list(grupo[1])
+                            grupo = next(ventas_por_dia, None)
+                        
                         f.write(f"Ventas realizadas: {len(ventas)}\n")
                         
                         if ventas:
                             f.write("\n  VENTAS:\n")
                             for i, venta in enumerate(ventas, 1):
-                                f.write(f"    [{i}] {venta['cantidad']:.8f} {venta['simbolo']} ")
-                                f.write(f"@ ${venta['precio_unitario']:.4f} = ")
-                                f.write(f"${venta['efectivo_recibido']:.2f}\n")
+                                f.write(f"    [{i}] {venta.cantidad:.8f} {venta.simbolo} ")
+                                f.write(f"@ ${venta.precio_unitario:.4f} = ")
+                                f.write(f"${venta.efectivo_recibido:.2f}\n")
                     
                     f.write("\n")
             
@@ -176,13 +243,11 @@ class GeneradorReportes:
         Returns:
             Path: Ruta del archivo generado
         """
-        dias = db.execute_query("""
-            SELECT * FROM dias
-            WHERE ciclo_id = ?
-            ORDER BY numero_dia
-        """, (ciclo_id,))
+        lotes = db.stream(SQL_DIAS_CICLO_CSV, (ciclo_id,))
+        
+        primer_lote = next(lotes, None)
         
-        if not dias:
+        if primer_lote is None:
             print(f"❌ No hay días en el ciclo #{ciclo_id}")
             return None
         
@@ -198,9 +263,7 @@ class GeneradorReportes:
             ])
             
             # Datos
-            for dia in dias:
-                num_ventas = queries.contar_ventas_dia(dia['id'])
-                
+            for dia in chain.from_iterable(chain([primer_lote], lotes)):
                 writer.writerow([
                     dia['numero_dia'],
                     dia['fecha'],
@@ -210,7 +273,7 @@ class GeneradorReportes:
                     f"{dia['ganancia_neta']:.2f}" if dia['ganancia_neta'] else "",
                     f"{dia['comisiones_pagadas']:.2f}" if dia['comisiones_pagadas'] else "",
                     f"{dia['efectivo_recibido']:.2f}" if dia['efectivo_recibido'] else "",
-                    num_ventas
+                    dia['num_ventas']
                 ])
         
         print(f"✅ Reporte CSV generado: {archivo.name}")
@@ -230,28 +293,11 @@ class GeneradorReportes:
         Returns:
             Path: Ruta del archivo generado
         """
-        ventas = db.execute_query("""
-            SELECT 
-                d.numero_dia,
-                d.fecha,
-                c.nombre as cripto,
-                c.simbolo,
-                v.cantidad,
-                v.precio_unitario,
-                v.costo_total,
-                v.monto_venta,
-                v.comision,
-                v.efectivo_recibido,
-                v.ganancia_bruta,
-                v.ganancia_neta
-            FROM ventas v
-            JOIN dias d ON v.dia_id = d.id
-            JOIN criptomonedas c ON v.cripto_id = c.id
-            WHERE d.ciclo_id = ?
-            ORDER BY d.numero_dia, v.fecha
-        """, (ciclo_id,))
+        lotes = self._stream_ventas_ciclo(ciclo_id)
+        
+        primer_lote = next(lotes, None)
         
-        if not ventas:
+        if primer_lote is None:
             print(f"❌ No hay ventas en el ciclo #{ciclo_id}")
             return None
         
@@ -268,25 +314,48 @@ class GeneradorReportes:
             ])
             
             # Datos
-            for venta in ventas:
-                writer.writerow([
-                    venta['numero_dia'],
-                    venta['fecha'],
-                    venta['cripto'],
-                    venta['simbolo'],
-                    f"{venta['cantidad']:.8f}",
-                    f"{venta['precio_unitario']:.4f}",
-                    f"{venta['costo_total']:.2f}",
-                    f"{venta['monto_venta']:.2f}",
-                    f"{venta['comision']:.2f}",
-                    f"{venta['efectivo_recibido']:.2f}",
-                    f"{venta['ganancia_bruta']:.2f}",
-                    f"{venta['ganancia_neta']:.2f}"
-                ])
+            for lote in chain([primer_lote], lotes):
+                writer.writerows(map(self._fila_venta_csv, lote))
         
         print(f"✅ Reporte de ventas generado: {archivo.name}")
         return archivo
     
+    @staticmethod
+    def _stream_ventas_ciclo(ciclo_id: int, solo_cerrados: bool = False):
+        """
+        Ventas del ciclo unidas a su día y cripto, en una sola consulta
+        
+        Ordenadas por día y fecha, en lotes de namedtuples: la memoria no
+        crece con el historial de ventas y se pueden agrupar por dia_id.
+        
+        Args:
+            ciclo_id: ID del ciclo
+            solo_cerrados: Si es True, solo las ventas de días cerrados
+        
+        Returns:
+            Iterator: Lotes de filas (ver db.stream)
+        """
+        query = SQL_VENTAS_CICLO_CERRADOS if solo_cerrados else SQL_VENTAS_CICLO
+        return db.stream(query, (ciclo_id,), formato='fila')
+    
+    @staticmethod
+    def _fila_venta_csv(venta) -> list:
+        """Formatea una venta (namedtuple) como fila del CSV de ventas"""
+        return [
+            venta.numero_dia,
+            venta.fecha,
+            venta.cripto,
+            venta.simbolo,
+            f"{venta.cantidad:.8f}",
+            f"{venta.precio_unitario:.4f}",
+            f"{venta.costo_total:.2f}",
+            f"{venta.monto_venta:.2f}",
+            f"{venta.comision:.2f}",
+            f"{venta.efectivo_recibido:.2f}",
+            f"{venta.ganancia_bruta:.2f}",
+            f"{venta.ganancia_neta:.2f}"
+        ]
+    
     # ===================================================================
     # REPORTE CONSOLIDADO
     # ===================================================================
@@ -298,12 +367,14 @@ class GeneradorReportes:
         Returns:
             Path: Ruta del archivo generado
         """
-        ciclos = db.execute_query("""
+        lotes = db.stream("""
             SELECT * FROM ciclos
             ORDER BY id DESC
         """)
         
-        if not ciclos:
+        primer_lote = next(lotes, None)
+        
+        if primer_lote is None:
             print("❌ No hay ciclos registrados")
             return None
         
@@ -340,7 +411,7 @@ class GeneradorReportes:
             f.write("📅 DETALLE POR CICLO\n")
             f.write("="*70 + "\n\n")
             
-            for ciclo in ciclos:
+            for ciclo in chain.from_iterable(chain([primer_lote], lotes)):
                 estado_emoji = "🔄" if ciclo['estado'] == 'activo' else "✅"
                 
                 f.write(f"{estado_emoji} CICLO #{ciclo['id']} - {ciclo['estado'].upper()}\n")
@@ -379,13 +450,15 @@ class GeneradorReportes:
         Returns:
             Path: Ruta del archivo generado
         """
-        ciclos = db.execute_query("""
+        lotes = db.stream("""
             SELECT * FROM ciclos
             WHERE estado = 'cerrado'
             ORDER BY id
         """)
         
-        if not ciclos:
+        primer_lote = next(lotes, None)
+        
+        if primer_lote is None:
             print("❌ No hay ciclos cerrados")
             return None
         
@@ -402,7 +475,7 @@ class GeneradorReportes:
             ])
             
             # Datos
-            for ciclo in ciclos:
+            for ciclo in chain.from_iterable(chain([primer_lote], lotes)):
                 ganancia_diaria = ciclo['ganancia_total'] / ciclo['dias_operados'] if ciclo['dias_operados'] > 0 else 0
                 roi_diario = ciclo['roi_total'] / ciclo['dias_operados'] if ciclo['dias_operados'] > 0 else 0
                 
@@ -442,8 +515,9 @@ def menu_reportes():
         print("[4] Reporte consolidado de todos los ciclos (TXT)")
         print("[5] Reporte de rendimiento (CSV)")
         print("[6] Generar todos los reportes del ciclo activo")
-        print("[7] Ver reportes generados")
-        print("[8] Volver")
+        print("[7] Exportar varios ciclos (en paralelo)")
+        print("[8] Ver reportes generados")
+        print("[9] Volver")
         print("="*70)
         
         opcion = input("\nSelecciona: ").strip()
@@ -493,10 +567,20 @@ def menu_reportes():
             input("\nPresiona Enter...")
         
         elif opcion == "7":
-            listar_reportes_generados()
+            entrada = input("\nIDs de ciclo separados por coma (Enter = todos): ").strip()
+            try:
+                ciclo_ids = [int(x) for x in entrada.split(',')] if entrada else None
+                graficos = input("¿Incluir dashboards de gráficos? (s/n): ").lower() == 's'
+                exportar_ciclos(ciclo_ids, graficos)
+            except ValueError:
+                print("❌ IDs inválidos")
             input("\nPresiona Enter...")
         
         elif opcion == "8":
+            listar_reportes_generados()
+            input("\nPresiona Enter...")
+        
+        elif opcion == "9":
             break
         
         else:
@@ -571,6 +655,155 @@ def exportar_ciclo_completo(ciclo_id: int):
     return archivos
 
 
+# ===================================================================
+# EXPORTACIÓN EN LOTE
+# ===================================================================
+
+def _inicializar_trabajador():
+    """Prepara un proceso de exportación: conexiones de solo lectura, sin ventanas"""
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+    db.cambiar_perfil('lectura')
+
+
+def _exportar_ciclo(ciclo_id: int, timestamp: str, graficos: bool) -> Dict:
+    """
+    Genera los reportes (y opcionalmente el dashboard) de un ciclo
+    
+    Se ejecuta en los procesos de trabajo: la salida por pantalla de los
+    generadores se descarta y los errores se devuelven en el resultado.
+    
+    Args:
+        ciclo_id: ID del ciclo
+        timestamp: Sufijo común a todos los archivos del lote
+        graficos: Si es True, genera también el dashboard del ciclo
+    
+    Returns:
+        dict: {'ciclo_id', 'archivos', 'duracion', 'error'}
+    """
+    resultado = {'ciclo_id': ciclo_id, 'archivos': [], 'duracion': 0.0, 'error': None}
+    inicio = time.perf_counter()
+    
+    try:
+        with redirect_stdout(io.StringIO()):
+            generador = GeneradorReportes(timestamp)
+            archivos = [
+                generador.generar_reporte_ciclo_txt(ciclo_id),
+                generador.generar_reporte_ciclo_csv(ciclo_id),
+                generador.generar_reporte_ventas_csv(ciclo_id),
+            ]
+            
+            if graficos:
+                from features.graficos import GeneradorGraficos
+                # Ya se está en un proceso de trabajo: sin pool anidado
+                archivos.extend(GeneradorGraficos(trabajadores=1).generar_dashboard_ciclo(ciclo_id))
+        
+        resultado['archivos'] = [str(archivo) for archivo in archivos if archivo]
+    except Exception as e:
+        resultado['error'] = f"{type(e).__name__}: {e}"
+        log.error(f"Error al exportar el ciclo #{ciclo_id}", resultado['error'])
+    finally:
+        # Los procesos de trabajo terminan sin ejecutar atexit
+        log.flush()
+    
+    resultado['duracion'] = time.perf_counter() - inicio
+    return resultado
+
+
+def exportar_ciclos(ciclo_ids: Optional[Iterable[int]] = None, graficos: bool = False,
+                    trabajadores: Optional[int] = None) -> List[Dict]:
+    """
+    Exporta los reportes de varios ciclos repartidos en procesos
+    
+    Cada proceso abre sus propias conexiones de solo lectura (perfil
+    'lectura'), así que la exportación no bloquea al operador. Muestra el
+    progreso a medida que terminan los ciclos y deja un resumen CSV con
+    los archivos, tiempos y errores de cada uno.
+    
+    Args:
+        ciclo_ids: Ciclos a exportar (None = todos)
+        graficos: Si es True, genera también el dashboard de cada ciclo
+        trabajadores: Procesos a usar (por defecto EXPORTACION_TRABAJADORES)
+    
+    Returns:
+        list: Resultado de cada ciclo, en el orden de ciclo_ids
+    """
+    if ciclo_ids is None:
+        ciclo_ids = [fila[0] for fila in db.execute_query(
+            "SELECT id FROM ciclos ORDER BY id", formato='tupla'
+        )]
+    ciclo_ids = list(ciclo_ids)
+    
+    if not ciclo_ids:
+        print("❌ No hay ciclos para exportar")
+        return []
+    
+    if graficos and importlib.util.find_spec('matplotlib') is None:
+        print("⚠️  matplotlib no está instalado: se exportan solo los reportes")
+        graficos = False
+    
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    trabajadores = min(trabajadores or EXPORTACION_TRABAJADORES, len(ciclo_ids))
+    paralelo = trabajadores > 1 and len(ciclo_ids) >= EXPORTACION_MIN_PARALELO
+    
+    print(f"\n📦 Exportando {len(ciclo_ids)} ciclo(s)"
+          f"{f' en {trabajadores} procesos' if paralelo else ''}...\n")
+    
+    resultados = {}
+    inicio = time.perf_counter()
+    
+    def mostrar_progreso(resultado):
+        resultados[resultado['ciclo_id']] = resultado
+        estado = f"❌ {resultado['error']}" if resultado['error'] else f"✅ {len(resultado['archivos'])} archivo(s)"
+        print(f"   [{len(resultados)}/{len(ciclo_ids)}] Ciclo #{resultado['ciclo_id']}: "
+              f"{estado} ({resultado['duracion']:.2f} s)")
+    
+    if paralelo:
+        # spawn: los procesos no heredan las conexiones abiertas de este
+        contexto = multiprocessing.get_context('spawn')
+        
+        with ProcessPoolExecutor(trabajadores, mp_context=contexto,
+                                 initializer=_inicializar_trabajador) as ejecutor:
+            pendientes = [ejecutor.submit(_exportar_ciclo, ciclo_id, timestamp, graficos)
+                          for ciclo_id in ciclo_ids]
+            for futuro in as_completed(pendientes):
+                mostrar_progreso(futuro.result())
+    else:
+        for ciclo_id in ciclo_ids:
+            mostrar_progreso(_exportar_ciclo(ciclo_id, timestamp, graficos))
+    
+    duracion = time.perf_counter() - inicio
+    resultados = [resultados[ciclo_id] for ciclo_id in ciclo_ids]
+    fallidos = [r for r in resultados if r['error']]
+    total_archivos = sum(len(r['archivos']) for r in resultados)
+    
+    # Resumen del lote
+    resumen = REPORTES_DIR / f"exportacion_{timestamp}.csv"
+    
+    with open(resumen, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Ciclo', 'Archivos', 'Duración (s)', 'Error', 'Rutas'])
+        for r in resultados:
+            writer.writerow([
+                r['ciclo_id'], len(r['archivos']), f"{r['duracion']:.3f}",
+                r['error'] or "", ";".join(r['archivos'])
+            ])
+    
+    print("\n" + "="*70)
+    print(f"✅ {len(resultados) - len(fallidos)}/{len(resultados)} ciclo(s) exportado(s), "
+          f"{total_archivos} archivo(s) en {duracion:.1f} s")
+    if fallidos:
+        ids_fallidos = ', '.join(f"#{r['ciclo_id']}" for r in fallidos)
+        print(f"❌ {len(fallidos)} con errores: {ids_fallidos}")
+    print(f"📄 Resumen: {resumen.name}")
+    print(f"📂 Ubicación: {REPORTES_DIR.absolute()}")
+    print("="*70)
+    
+    log.info(f"Exportación en lote: {len(resultados)} ciclos, {total_archivos} archivos, "
+             f"{len(fallidos)} errores, {duracion:.1f} s", categoria='general')
+    
+    return resultados
+
+
 # ===================================================================
 # EJECUCIÓN DIRECTA
 # ===================================================================
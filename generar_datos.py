@@ -0,0 +1,461 @@
+# -*- coding: utf-8 -*-
+"""
+=============================================================================
+GENERADOR DE CARGA SINTÉTICA
+=============================================================================
+Crea una base de datos con volumen de producción para medir consultas,
+reportes, gráficos y mantenimiento: ciclos, días, compras, ventas,
+movimientos de efectivo_banco, alertas y notas.
+
+Los precios siguen una caminata aleatoria por cripto (las stablecoins
+oscilan cerca de 1 USD) y cada venta se calcula con la misma Calculadora
+que usa el sistema, así los montos y los *_micro son coherentes.
+
+Uso:
+    python generar_datos.py --ciclos 500 --dias 30 --ventas 50
+    ARBITRAJE_DB=data/arbitraje_carga.db python main.py
+"""
+
+import argparse
+import math
+import os
+import random
+import sqlite3
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+from core.calculos import calc, CAMPOS_VENTA
+from core.migraciones import migrar
+from core.resumenes import SQL_TRIGGERS, crear_tablas_resumen, reconstruir_resumenes
+
+
+# ===================================================================
+# CONFIGURACIÓN
+# ===================================================================
+
+DB_CARGA = 'data/arbitraje_carga.db'
+
+# Volumen por defecto (producción: 500 ciclos × 30 días × 50 ventas)
+CICLOS_DEFAULT = 20
+DIAS_DEFAULT = 30
+VENTAS_DEFAULT = 20
+
+# Precio inicial por símbolo; las que no figuran se tratan como stablecoin
+PRECIOS_INICIALES = {'BTC': 60000.0, 'ETH': 3000.0, 'BNB': 500.0}
+VOLATILIDAD_DIARIA = 0.035      # Desvío del retorno diario de las volátiles
+VOLATILIDAD_STABLE = 0.002      # Desvío de las stablecoins alrededor de 1 USD
+
+# Prima P2P sobre el costo promedio: media y desvío (fracción). Con estos
+# valores ~3% de los días cierran con pérdida
+PRIMA_MEDIA = 0.012
+PRIMA_DESVIO = 0.006
+
+INVERSION_MIN = 500.0
+INVERSION_MAX = 5000.0
+FRACCION_VENTA_DIA = (0.3, 0.9)     # Parte de la bóveda que se vende en el día
+PROB_REINVERSION = 0.9              # Días cuyo efectivo se reinvierte al cierre
+PROB_NOTA_DIA = 0.1
+
+HORA_APERTURA = 9               # Las ventas se reparten entre estas horas
+HORA_CIERRE = 21
+
+
+# ===================================================================
+# CLASE GENERADORA
+# ===================================================================
+
+class GeneradorCarga:
+    """Genera historial sintético sobre una conexión SQLite"""
+    
+    def __init__(self, conn: sqlite3.Connection, ciclos: int, dias: int,
+                 ventas: int, semilla: int = 42):
+        """
+        Args:
+            conn: Conexión a una BD ya migrada
+            ciclos: Número de ciclos (el último queda activo)
+            dias: Días por ciclo
+            ventas: Ventas promedio por día
+            semilla: Semilla aleatoria (misma semilla = mismos datos)
+        """
+        self.conn = conn
+        self.ciclos = ciclos
+        self.dias = dias
+        self.ventas = ventas
+        self.rnd = random.Random(semilla)
+        
+        config = conn.execute("""
+            SELECT comision_default, limite_ventas_max FROM config WHERE id = 1
+        """).fetchone()
+        self.comision = config[0]
+        self.limite_ventas = config[1]
+        
+        self.criptos = conn.execute("SELECT id, simbolo FROM criptomonedas ORDER BY id").fetchall()
+        self.simbolos = dict(self.criptos)
+        self.precios = {
+            cripto_id: PRECIOS_INICIALES.get(simbolo, 1.0)
+            for cripto_id, simbolo in self.criptos
+        }
+        
+        self.filas = {tabla: 0 for tabla in ('ciclos', 'dias', 'compras', 'ventas',
+                                             'efectivo_banco', 'alertas', 'notas')}
+    
+    # ===================================================================
+    # PRECIOS
+    # ===================================================================
+    
+    def _avanzar_precios(self):
+        """Mueve un día la caminata de precios de todas las criptos"""
+        for cripto_id, simbolo in self.criptos:
+            if simbolo in PRECIOS_INICIALES:
+                retorno = self.rnd.gauss(0, VOLATILIDAD_DIARIA)
+                self.precios[cripto_id] *= math.exp(retorno - VOLATILIDAD_DIARIA ** 2 / 2)
+            else:
+                self.precios[cripto_id] = 1.0 + self.rnd.gauss(0, VOLATILIDAD_STABLE)
+    
+    # ===================================================================
+    # INSERCIONES
+    # ===================================================================
+    
+    def _comprar(self, boveda: Dict, ciclo_id: int, cripto_id: int,
+                 monto: float, fecha: str) -> tuple:
+        """Registra la compra en la bóveda en memoria y devuelve su fila"""
+        tasa = self.precios[cripto_id]
+        cantidad = monto / tasa
+        
+        cantidad_anterior, precio_anterior = boveda.get(cripto_id, (0.0, 0.0))
+        precio_promedio = calc.calcular_promedio_ponderado(
+            cantidad_anterior, precio_anterior, cantidad, tasa
+        )
+        boveda[cripto_id] = (cantidad_anterior + cantidad, precio_promedio)
+        
+        return (ciclo_id, cripto_id, cantidad, round(monto, 2), tasa, fecha)
+    
+    def _alerta(self, alertas: List, tipo: str, nivel: str, titulo: str,
+                mensaje: str, referencia_tipo: str, referencia_id: int,
+                fecha: str, leida: int):
+        """Agrega una fila de alerta con las mismas columnas que crear_alerta"""
+        alertas.append((tipo, nivel, titulo, mensaje, referencia_tipo,
+                        referencia_id, leida, fecha))
+    
+    def _ventas_del_dia(self, dia_id: int, cripto_id: int, costo: float,
+                        disponible: float, precio_publicado: float,
+                        fecha: datetime) -> List[tuple]:
+        """Filas de ventas de un día, calculadas por columnas"""
+        n = max(1, self.rnd.randint(self.ventas // 2, self.ventas * 3 // 2))
+        total = disponible * self.rnd.uniform(*FRACCION_VENTA_DIA)
+        
+        pesos = [self.rnd.random() + 0.1 for _ in range(n)]
+        suma = sum(pesos)
+        cantidades = [total * p / suma for p in pesos]
+        precios = [precio_publicado * (1 + self.rnd.gauss(0, 0.001)) for _ in range(n)]
+        
+        columnas = calc.calcular_ventas_columnas(cantidades, costo, precios, self.comision)
+        micros = [calc.a_micro_lote(columnas[campo]) for campo in CAMPOS_VENTA]
+        
+        segundos = sorted(self.rnd.randint(HORA_APERTURA * 3600, HORA_CIERRE * 3600)
+                          for _ in range(n))
+        
+        return [
+            (dia_id, cripto_id, cantidades[i], precios[i],
+             *(columnas[campo][i] for campo in CAMPOS_VENTA),
+             *(micro[i] for micro in micros),
+             (fecha + timedelta(seconds=segundos[i])).strftime('%Y-%m-%d %H:%M:%S'))
+            for i in range(n)
+        ]
+    
+    def _generar_ciclo(self, numero: int, inicio: datetime, activo: bool):
+        """Genera un ciclo completo y lo confirma en una transacción"""
+        cursor = self.conn.cursor()
+        leida = 0 if activo else 1
+        
+        inversion = round(self.rnd.uniform(INVERSION_MIN, INVERSION_MAX), 2)
+        cursor.execute("""
+            INSERT INTO ciclos (fecha_inicio, fecha_fin_estimada, dias_planificados,
+                                inversion_inicial, estado)
+            VALUES (?, ?, ?, ?, 'activo')
+        """, (inicio.strftime('%Y-%m-%d'),
+              (inicio + timedelta(days=self.dias)).strftime('%Y-%m-%d'),
+              self.dias, inversion))
+        ciclo_id = cursor.lastrowid
+        
+        # Fondeo inicial repartido entre 1 a 3 criptos
+        boveda = {}
+        compras = []
+        fondeo = self.rnd.sample([c[0] for c in self.criptos], self.rnd.randint(1, 3))
+        fecha_fondeo = (inicio + timedelta(hours=8)).strftime('%Y-%m-%d %H:%M:%S')
+        for cripto_id in fondeo:
+            compras.append(self._comprar(boveda, ciclo_id, cripto_id,
+                                         inversion / len(fondeo), fecha_fondeo))
+        
+        ventas, efectivo, alertas, notas = [], [], [], []
+        ganancia_ciclo = 0.0
+        dias_cerrados = 0
+        
+        for numero_dia in range(1, self.dias + 1):
+            self._avanzar_precios()
+            fecha = inicio + timedelta(days=numero_dia - 1)
+            abierto = activo and numero_dia == self.dias
+            
+            cripto_id = max(boveda, key=lambda c: boveda[c][0] * boveda[c][1])
+            disponible, costo = boveda[cripto_id]
+            capital_inicial = sum(c * p for c, p in boveda.values())
+            precio_publicado = costo * (1 + self.rnd.gauss(PRIMA_MEDIA, PRIMA_DESVIO))
+            
+            cursor.execute("""
+                INSERT INTO dias (ciclo_id, numero_dia, fecha, capital_inicial,
+                                  cripto_operada_id, precio_publicado, estado)
+                VALUES (?, ?, ?, ?, ?, ?, 'abierto')
+            """, (ciclo_id, numero_dia, (fecha + timedelta(hours=HORA_APERTURA)).strftime('%Y-%m-%d %H:%M:%S'),
+                  capital_inicial, cripto_id, precio_publicado))
+            dia_id = cursor.lastrowid
+            
+            filas = self._ventas_del_dia(dia_id, cripto_id, costo, disponible,
+                                         precio_publicado, fecha)
+            ventas.extend(filas)
+            
+            vendido = sum(f[2] for f in filas)
+            boveda[cripto_id] = (disponible - vendido, costo)
+            
+            # Interés compuesto: el efectivo del día vuelve a la bóveda al cierre
+            reinvertir = not abierto and self.rnd.random() < PROB_REINVERSION
+            sufijo = " (Reinvertido)" if reinvertir else ""
+            efectivo.extend(
+                (ciclo_id, dia_id, f[7], f"Venta de {f[2]:.8f} {self.simbolos[cripto_id]}{sufijo}", f[-1])
+                for f in filas
+            )
+            
+            if len(filas) >= self.limite_ventas:
+                self._alerta(alertas, 'limite_ventas_max', 'advertencia',
+                             'Límite máximo de ventas alcanzado',
+                             f"Día #{numero_dia}: {len(filas)} ventas", 'dia', dia_id,
+                             filas[-1][-1], leida)
+            
+            if abierto:
+                continue
+            
+            # Cierre del día (mismos totales que cerrar_dia)
+            efectivo_dia = calc.sumar_montos(f[7] for f in filas)
+            comisiones = calc.sumar_montos(f[6] for f in filas)
+            ganancia_bruta = calc.sumar_montos(f[8] for f in filas)
+            ganancia_neta = calc.sumar_montos(f[9] for f in filas)
+            capital_final = sum(c * p for c, p in boveda.values()) + efectivo_dia
+            cierre = (fecha + timedelta(hours=HORA_CIERRE, minutes=30)).strftime('%Y-%m-%d %H:%M:%S')
+            
+            cursor.execute("""
+                UPDATE dias SET capital_final = ?, efectivo_recibido = ?,
+                    comisiones_pagadas = ?, ganancia_bruta = ?, ganancia_neta = ?,
+                    estado = 'cerrado', fecha_cierre = ?
+                WHERE id = ?
+            """, (capital_final, efectivo_dia, comisiones, ganancia_bruta,
+                  ganancia_neta, cierre, dia_id))
+            
+            ganancia_ciclo += ganancia_neta
+            dias_cerrados += 1
+            
+            if ganancia_neta < 0:
+                self._alerta(alertas, 'ganancia_negativa', 'error', 'Pérdida registrada',
+                             f"Día #{numero_dia} cerró con ${ganancia_neta:.2f}",
+                             'dia', dia_id, cierre, leida)
+            
+            if numero_dia == self.dias - 3:
+                self._alerta(alertas, 'ciclo_por_terminar', 'info', 'Ciclo por terminar',
+                             f"Quedan 3 días del ciclo #{ciclo_id}", 'ciclo', ciclo_id,
+                             cierre, leida)
+            
+            if self.rnd.random() < PROB_NOTA_DIA:
+                notas.append(('dia', dia_id, f"Día #{numero_dia}",
+                              f"Prima publicada {precio_publicado / costo - 1:.2%}, "
+                              f"{len(filas)} ventas", 'normal', 'p2p,operacion', cierre))
+            
+            if reinvertir:
+                compras.append(self._comprar(boveda, ciclo_id, cripto_id, efectivo_dia, cierre))
+        
+        cursor.executemany("""
+            INSERT INTO compras (ciclo_id, cripto_id, cantidad, monto_usd, tasa, fecha)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, compras)
+        cursor.executemany("""
+            INSERT INTO ventas (
+                dia_id, cripto_id, cantidad, precio_unitario,
+                costo_total, monto_venta, comision, efectivo_recibido,
+                ganancia_bruta, ganancia_neta,
+                costo_total_micro, monto_venta_micro, comision_micro,
+                efectivo_recibido_micro, ganancia_bruta_micro, ganancia_neta_micro,
+                fecha
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, ventas)
+        cursor.executemany("""
+            INSERT INTO efectivo_banco (ciclo_id, dia_id, monto, concepto, fecha)
+            VALUES (?, ?, ?, ?, ?)
+        """, efectivo)
+        cursor.executemany("""
+            INSERT INTO boveda_ciclo (ciclo_id, cripto_id, cantidad, precio_promedio)
+            VALUES (?, ?, ?, ?)
+        """, [(ciclo_id, c, cantidad, precio) for c, (cantidad, precio) in boveda.items()])
+        
+        if not activo:
+            capital_final = sum(c * p for c, p in boveda.values())
+            cursor.execute("""
+                UPDATE ciclos SET estado = 'cerrado', fecha_cierre = ?, dias_operados = ?,
+                    ganancia_total = ?, capital_final = ?, roi_total = ?
+                WHERE id = ?
+            """, ((inicio + timedelta(days=self.dias)).strftime('%Y-%m-%d %H:%M:%S'),
+                  dias_cerrados, ganancia_ciclo, capital_final,
+                  calc.calcular_roi(ganancia_ciclo, inversion), ciclo_id))
+            notas.append(('ciclo', ciclo_id, f"Cierre del ciclo #{numero}",
+                          f"Ganancia ${ganancia_ciclo:.2f} sobre ${inversion:.2f}",
+                          'alta' if ganancia_ciclo < 0 else 'normal', 'ciclo,cierre',
+                          (inicio + timedelta(days=self.dias)).strftime('%Y-%m-%d %H:%M:%S')))
+        else:
+            cursor.execute("UPDATE ciclos SET dias_operados = ?, ganancia_total = ? WHERE id = ?",
+                           (dias_cerrados, ganancia_ciclo, ciclo_id))
+        
+        cursor.executemany("""
+            INSERT INTO alertas (tipo, nivel, titulo, mensaje, referencia_tipo,
+                                 referencia_id, leida, fecha_creacion)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, alertas)
+        cursor.executemany("""
+            INSERT INTO notas (tipo, referencia_id, titulo, contenido, prioridad,
+                               etiquetas, fecha_creacion)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, notas)
+        
+        self.conn.commit()
+        
+        self.filas['ciclos'] += 1
+        self.filas['dias'] += self.dias
+        self.filas['compras'] += len(compras)
+        self.filas['ventas'] += len(ventas)
+        self.filas['efectivo_banco'] += len(efectivo)
+        self.filas['alertas'] += len(alertas)
+        self.filas['notas'] += len(notas)
+    
+    # ===================================================================
+    # GENERACIÓN
+    # ===================================================================
+    
+    def generar(self) -> Dict[str, int]:
+        """
+        Genera todos los ciclos, uno detrás de otro hasta hoy
+        
+        Los triggers de resumen se desactivan durante la carga y las tablas
+        resumen se recalculan una sola vez al final.
+        
+        Returns:
+            dict: Filas insertadas por tabla
+        """
+        for nombre in SQL_TRIGGERS:
+            self.conn.execute(f"DROP TRIGGER IF EXISTS {nombre}")
+        
+        inicio = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        inicio -= timedelta(days=self.ciclos * self.dias)
+        paso = max(1, self.ciclos // 10)
+        
+        for numero in range(1, self.ciclos + 1):
+            self._generar_ciclo(numero, inicio, activo=numero == self.ciclos)
+            inicio += timedelta(days=self.dias)
+            
+            if numero % paso == 0 or numero == self.ciclos:
+                print(f"   • Ciclo {numero}/{self.ciclos} ({self.filas['ventas']:,} ventas)")
+        
+        print("\n📈 Recalculando tablas resumen...")
+        crear_tablas_resumen(self.conn)
+        reconstruir_resumenes(self.conn)
+        self.conn.execute("ANALYZE")
+        self.conn.commit()
+        
+        return dict(self.filas)
+
+
+# ===================================================================
+# FUNCIÓN PRINCIPAL
+# ===================================================================
+
+def generar_base_carga(destino: str = DB_CARGA, ciclos: int = CICLOS_DEFAULT,
+                       dias: int = DIAS_DEFAULT, ventas: int = VENTAS_DEFAULT,
+                       semilla: int = 42, reemplazar: bool = False) -> Dict[str, int]:
+    """
+    Crea una BD nueva con el esquema actual y la llena con datos sintéticos
+    
+    Args:
+        destino: Archivo de la BD a crear
+        ciclos: Número de ciclos
+        dias: Días por ciclo
+        ventas: Ventas promedio por día
+        semilla: Semilla aleatoria
+        reemplazar: Sobrescribir el archivo si ya existe
+    
+    Returns:
+        dict: Filas insertadas por tabla
+    """
+    ruta = Path(destino)
+    
+    if ruta.exists():
+        if not reemplazar:
+            raise FileExistsError(f"{ruta} ya existe (usa --reemplazar para sobrescribirla)")
+        for archivo in (ruta, Path(f"{ruta}-wal"), Path(f"{ruta}-shm")):
+            if archivo.exists():
+                archivo.unlink()
+    
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    
+    conn = sqlite3.connect(ruta)
+    try:
+        # Es una BD descartable: se prioriza la velocidad de carga
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = OFF")
+        migrar(conn)
+        
+        return GeneradorCarga(conn, ciclos, dias, ventas, semilla).generar()
+    finally:
+        conn.close()
+
+
+def main():
+    """Punto de entrada por línea de comandos"""
+    parser = argparse.ArgumentParser(description="Genera una BD de carga sintética")
+    parser.add_argument('--destino', default=DB_CARGA, help=f"Archivo de salida (por defecto {DB_CARGA})")
+    parser.add_argument('--ciclos', type=int, default=CICLOS_DEFAULT, help="Número de ciclos")
+    parser.add_argument('--dias', type=int, default=DIAS_DEFAULT, help="Días por ciclo")
+    parser.add_argument('--ventas', type=int, default=VENTAS_DEFAULT, help="Ventas promedio por día")
+    parser.add_argument('--semilla', type=int, default=42, help="Semilla aleatoria")
+    parser.add_argument('--reemplazar', action='store_true', help="Sobrescribir la BD si existe")
+    args = parser.parse_args()
+    
+    if args.ciclos < 1 or args.dias < 5 or args.ventas < 1:
+        parser.error("Se requiere al menos 1 ciclo, 5 días por ciclo y 1 venta por día")
+    
+    print("\n" + "="*70)
+    print("GENERADOR DE CARGA SINTÉTICA")
+    print("="*70)
+    print(f"\n🔨 {args.ciclos} ciclos × {args.dias} días × ~{args.ventas} ventas → {args.destino}\n")
+    
+    inicio = time.perf_counter()
+    
+    try:
+        filas = generar_base_carga(args.destino, args.ciclos, args.dias, args.ventas,
+                                   args.semilla, args.reemplazar)
+    except FileExistsError as e:
+        print(f"❌ {e}")
+        return 1
+    
+    duracion = time.perf_counter() - inicio
+    
+    print("\n📋 Filas generadas:")
+    for tabla, total in filas.items():
+        print(f"   • {tabla}: {total:,}")
+    
+    tamaño = os.path.getsize(args.destino) / (1024 * 1024)
+    print(f"\n✅ BD generada en {duracion:.1f}s ({tamaño:.1f} MB)")
+    print(f"\n🚀 Para usarla: ARBITRAJE_DB={args.destino} python main.py")
+    return 0
+
+
+# ===================================================================
+# EJECUCIÓN DIRECTA
+# ===================================================================
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -10,13 +10,14 @@ import sqlite3
 import os
 from datetime import datetime
 from pathlib import Path
+from core.migraciones import migrar, version_actual, ULTIMA_VERSION
 
 
 # ===================================================================
 # CONFIGURACIÓN
 # ===================================================================
 
-DB_FILE = 'data/arbitraje.db'
+DB_FILE = os.environ.get('ARBITRAJE_DB', 'data/arbitraje.db')
 BACKUP_DIR = Path('backups')
 DATA_DIR = Path('data')
 
@@ -49,307 +50,32 @@ def hacer_backup_si_existe():
 
 
 # ===================================================================
-# CREACIÓN DE TABLAS
+# MIGRACIONES
 # ===================================================================
 
-def crear_tablas(conn):
-    """Crea todas las tablas del sistema"""
+def aplicar_migraciones(conn):
+    """
+    Lleva la base de datos a la última versión del esquema
     
-    cursor = conn.cursor()
-    
-    print("\n📋 Creando tablas...")
-    
-    # Tabla de configuración
-    print("   • config")
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS config (
-            id INTEGER PRIMARY KEY,
-            comision_default REAL DEFAULT 0.35,
-            ganancia_neta_default REAL DEFAULT 2.0,
-            modo_comision TEXT DEFAULT 'manual',
-            api_comision_activa INTEGER DEFAULT 0,
-            limite_ventas_min INTEGER DEFAULT 5,
-            limite_ventas_max INTEGER DEFAULT 8,
-            actualizado TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    # Tabla de criptomonedas
-    print("   • criptomonedas")
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS criptomonedas (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nombre TEXT NOT NULL,
-            simbolo TEXT NOT NULL UNIQUE,
-            tipo TEXT NOT NULL,
-            descripcion TEXT
-        )
-    """)
-    
-    # Tabla de ciclos
-    print("   • ciclos")
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS ciclos (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            fecha_inicio DATE NOT NULL,
-            fecha_fin_estimada DATE NOT NULL,
-            fecha_cierre TIMESTAMP,
-            dias_planificados INTEGER NOT NULL,
-            dias_operados INTEGER DEFAULT 0,
-            inversion_inicial REAL DEFAULT 0,
-            capital_final REAL,
-            ganancia_total REAL DEFAULT 0,
-            roi_total REAL,
-            estado TEXT DEFAULT 'activo',
-            CHECK(estado IN ('activo', 'cerrado'))
-        )
-    """)
-    
-    # Tabla de días
-    print("   • dias")
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS dias (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            ciclo_id INTEGER NOT NULL,
-            numero_dia INTEGER NOT NULL,
-            fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            fecha_cierre TIMESTAMP,
-            capital_inicial REAL NOT NULL,
-            capital_final REAL,
-            efectivo_recibido REAL DEFAULT 0,
-            cripto_operada_id INTEGER,
-            precio_publicado REAL,
-            comisiones_pagadas REAL DEFAULT 0,
-            ganancia_bruta REAL DEFAULT 0,
-            ganancia_neta REAL DEFAULT 0,
-            estado TEXT DEFAULT 'abierto',
-            FOREIGN KEY (ciclo_id) REFERENCES ciclos(id),
-            FOREIGN KEY (cripto_operada_id) REFERENCES criptomonedas(id),
-            CHECK(estado IN ('abierto', 'cerrado'))
-        )
-    """)
-    
-    # Tabla de ventas
-    print("   • ventas")
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS ventas (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            dia_id INTEGER NOT NULL,
-            cripto_id INTEGER NOT NULL,
-            cantidad REAL NOT NULL,
-            precio_unitario REAL NOT NULL,
-            costo_total REAL NOT NULL,
-            monto_venta REAL NOT NULL,
-            comision REAL NOT NULL,
-            efectivo_recibido REAL NOT NULL,
-            ganancia_bruta REAL NOT NULL,
-            ganancia_neta REAL NOT NULL,
-            fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (dia_id) REFERENCES dias(id),
-            FOREIGN KEY (cripto_id) REFERENCES criptomonedas(id)
-        )
-    """)
-    
-    # Tabla de bóveda por ciclo
-    print("   • boveda_ciclo")
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS boveda_ciclo (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            ciclo_id INTEGER NOT NULL,
-            cripto_id INTEGER NOT NULL,
-            cantidad REAL NOT NULL DEFAULT 0,
-            precio_promedio REAL NOT NULL DEFAULT 0,
-            FOREIGN KEY (ciclo_id) REFERENCES ciclos(id),
-            FOREIGN KEY (cripto_id) REFERENCES criptomonedas(id),
-            UNIQUE(ciclo_id, cripto_id)
-        )
-    """)
-    
-    # Tabla de compras
-    print("   • compras")
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS compras (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            ciclo_id INTEGER NOT NULL,
-            cripto_id INTEGER NOT NULL,
-            cantidad REAL NOT NULL,
-            monto_usd REAL NOT NULL,
-            tasa REAL NOT NULL,
-            fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (ciclo_id) REFERENCES ciclos(id),
-            FOREIGN KEY (cripto_id) REFERENCES criptomonedas(id)
-        )
-    """)
+    Args:
+        conn: Conexión SQLite
     
-    # Tabla de efectivo en banco
-    print("   • efectivo_banco")
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS efectivo_banco (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            ciclo_id INTEGER NOT NULL,
-            dia_id INTEGER,
-            monto REAL NOT NULL,
-            concepto TEXT,
-            fecha TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (ciclo_id) REFERENCES ciclos(id),
-            FOREIGN KEY (dia_id) REFERENCES dias(id)
-        )
-    """)
+    Returns:
+        list: Migraciones aplicadas
+    """
+    print(f"\n🔨 Versión del esquema: {version_actual(conn)} (última: {ULTIMA_VERSION})")
     
-    # Tabla de APIs configuradas
-    print("   • apis_config")
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS apis_config (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            nombre TEXT NOT NULL,
-            plataforma TEXT NOT NULL,
-            api_key TEXT,
-            api_secret TEXT,
-            activa INTEGER DEFAULT 1,
-            tipo TEXT,
-            fecha_registro TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            ultima_actualizacion TIMESTAMP
-        )
-    """)
+    aplicadas = migrar(conn)
     
-    # Tabla de comisiones por plataforma
-    print("   • comisiones_plataforma")
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS comisiones_plataforma (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            plataforma TEXT NOT NULL,
-            tipo_operacion TEXT NOT NULL,
-            comision REAL NOT NULL,
-            fecha_actualizacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    
-    # Tabla de notas
-    print("   • notas")
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS notas (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            tipo TEXT NOT NULL,
-            referencia_id INTEGER,
-            titulo TEXT NOT NULL,
-            contenido TEXT NOT NULL,
-            prioridad TEXT DEFAULT 'normal',
-            etiquetas TEXT,
-            fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            fecha_modificacion TIMESTAMP,
-            autor TEXT DEFAULT 'Operador'
-        )
-    """)
-    
-    # Tabla de alertas
-    print("   • alertas")
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS alertas (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            tipo TEXT NOT NULL,
-            nivel TEXT NOT NULL,
-            titulo TEXT NOT NULL,
-            mensaje TEXT NOT NULL,
-            referencia_tipo TEXT,
-            referencia_id INTEGER,
-            leida INTEGER DEFAULT 0,
-            fecha_creacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            fecha_lectura TIMESTAMP
-        )
-    """)
-    
-    # Tabla de configuración de alertas
-    print("   • config_alertas")
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS config_alertas (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            tipo_alerta TEXT NOT NULL UNIQUE,
-            activa INTEGER DEFAULT 1,
-            umbral REAL,
-            parametros TEXT
-        )
-    """)
-    
-    conn.commit()
-    print("✅ Tablas creadas exitosamente")
-
-
-def crear_indices(conn):
-    """Crea índices para mejorar rendimiento"""
-    
-    cursor = conn.cursor()
+    for migracion in aplicadas:
+        print(f"   • v{migracion.version}: {migracion.descripcion}")
     
-    print("\n📊 Creando índices...")
-    
-    indices = [
-        ("idx_dias_ciclo", "CREATE INDEX IF NOT EXISTS idx_dias_ciclo ON dias(ciclo_id)"),
-        ("idx_ventas_dia", "CREATE INDEX IF NOT EXISTS idx_ventas_dia ON ventas(dia_id)"),
-        ("idx_boveda_ciclo", "CREATE INDEX IF NOT EXISTS idx_boveda_ciclo ON boveda_ciclo(ciclo_id)"),
-        ("idx_compras_ciclo", "CREATE INDEX IF NOT EXISTS idx_compras_ciclo ON compras(ciclo_id)"),
-        ("idx_notas_tipo", "CREATE INDEX IF NOT EXISTS idx_notas_tipo ON notas(tipo)"),
-        ("idx_notas_referencia", "CREATE INDEX IF NOT EXISTS idx_notas_referencia ON notas(tipo, referencia_id)"),
-        ("idx_alertas_leida", "CREATE INDEX IF NOT EXISTS idx_alertas_leida ON alertas(leida)"),
-    ]
-    
-    for nombre, query in indices:
-        print(f"   • {nombre}")
-        cursor.execute(query)
-    
-    conn.commit()
-    print("✅ Índices creados exitosamente")
-
-
-def insertar_datos_iniciales(conn):
-    """Inserta datos iniciales del sistema"""
-    
-    cursor = conn.cursor()
-    
-    print("\n💾 Insertando datos iniciales...")
-    
-    # Configuración por defecto
-    print("   • Configuración por defecto")
-    cursor.execute("""
-        INSERT INTO config (id, comision_default, ganancia_neta_default)
-        VALUES (1, 0.35, 2.0)
-    """)
-    
-    # Criptomonedas por defecto
-    print("   • Criptomonedas")
-    criptos = [
-        ('Tether', 'USDT', 'stablecoin', 'Stablecoin vinculada al dólar estadounidense'),
-        ('USD Coin', 'USDC', 'stablecoin', 'Stablecoin respaldada por dólares en reserva'),
-        ('Binance USD', 'BUSD', 'stablecoin', 'Stablecoin emitida por Binance'),
-        ('Bitcoin', 'BTC', 'criptomoneda', 'La primera y más conocida criptomoneda'),
-        ('Ethereum', 'ETH', 'criptomoneda', 'Plataforma blockchain con contratos inteligentes'),
-        ('Binance Coin', 'BNB', 'criptomoneda', 'Token nativo de Binance'),
-        ('Dai', 'DAI', 'stablecoin', 'Stablecoin descentralizada'),
-    ]
-    
-    cursor.executemany("""
-        INSERT INTO criptomonedas (nombre, simbolo, tipo, descripcion)
-        VALUES (?, ?, ?, ?)
-    """, criptos)
-    
-    # Configuración de alertas por defecto
-    print("   • Configuración de alertas")
-    alertas_config = [
-        ('dia_abierto_largo', 1, 24),
-        ('limite_ventas', 1, None),
-        ('capital_bajo', 1, 100),
-        ('ganancia_negativa', 1, None),
-        ('ciclo_por_terminar', 1, 3),
-        ('sin_operar', 1, 3),
-        ('objetivo_alcanzado', 1, None),
-        ('rendimiento_bajo', 1, 1.0),
-    ]
-    
-    cursor.executemany("""
-        INSERT INTO config_alertas (tipo_alerta, activa, umbral)
-        VALUES (?, ?, ?)
-    """, alertas_config)
+    if aplicadas:
+        print(f"✅ Esquema actualizado a la versión {version_actual(conn)}")
+    else:
+        print("✅ El esquema ya está al día")
     
-    conn.commit()
-    print("✅ Datos iniciales insertados")
+    return aplicadas
 
 
 def verificar_integridad(conn):
@@ -446,14 +172,8 @@ def inicializar_base_datos():
         # Habilitar claves foráneas
         conn.execute("PRAGMA foreign_keys = ON")
         
-        # Crear tablas
-        crear_tablas(conn)
-        
-        # Crear índices
-        crear_indices(conn)
-        
-        # Insertar datos iniciales
-        insertar_datos_iniciales(conn)
+        # Tablas, datos iniciales, índices y tablas resumen
+        aplicar_migraciones(conn)
         
         # Verificar integridad
         if not verificar_integridad(conn):
@@ -493,7 +213,7 @@ def menu_inicializacion():
     print("INICIALIZACIÓN DE BASE DE DATOS")
     print("="*70)
     print("\n[1] Inicializar base de datos (ELIMINA DATOS ACTUALES)")
-    print("[2] Solo verificar estructura")
+    print("[2] Verificar estructura y aplicar migraciones pendientes")
     print("[3] Salir")
     print("="*70)
     
@@ -504,6 +224,7 @@ def menu_inicializacion():
     elif opcion == "2":
         if os.path.exists(DB_FILE):
             conn = sqlite3.connect(DB_FILE)
+            aplicar_migraciones(conn)
             verificar_integridad(conn)
             mostrar_resumen(conn)
             conn.close()
@@ -17,19 +17,9 @@ from core.logger import log
 from core.db_manager import db, verificar_conexion
 from core.queries import queries
 
-# Imports de módulos principales
-from modules.boveda import menu_boveda
-from modules.ciclos import menu_ciclos
-from modules.operador import menu_operador_avanzado, modulo_operador
-from modules.configuracion import menu_configuracion
-from modules.mantenimiento import menu_mantenimiento
-
-# Imports de nuevas funcionalidades
-from features.proyecciones import menu_proyecciones
-from features.reportes import menu_reportes
-from features.notas import menu_notas
-from features.alertas import menu_alertas, mostrar_banner_alertas, SistemaAlertas
-from features.graficos import menu_graficos, verificar_matplotlib
+# Los menús de modules/ y features/ se importan al elegir la opción:
+# el arranque no paga matplotlib, multiprocessing ni los directorios que
+# crean esos módulos hasta que se usan
 
 
 # ===================================================================
@@ -91,6 +81,8 @@ def verificar_alertas_inicio():
     """Verifica y muestra alertas al inicio"""
     try:
         # Verificar alertas del sistema
+        from features.alertas import SistemaAlertas, mostrar_banner_alertas
+        
         sistema = SistemaAlertas()
         sistema.verificar_todas()
         
@@ -122,8 +114,10 @@ def menu_operaciones():
         opcion = input("\nSelecciona: ").strip()
         
         if opcion == "1":
+            from modules.operador import modulo_operador
             modulo_operador()
         elif opcion == "2":
+            from modules.operador import menu_operador_avanzado
             menu_operador_avanzado()
         elif opcion == "3":
             break
@@ -150,15 +144,20 @@ def menu_analisis():
         opcion = input("\nSelecciona: ").strip()
         
         if opcion == "1":
+            from features.proyecciones import menu_proyecciones
             menu_proyecciones()
         elif opcion == "2":
+            from features.reportes import menu_reportes
             menu_reportes()
         elif opcion == "3":
+            from features.graficos import menu_graficos, menu_exportar_html, verificar_matplotlib
             if verificar_matplotlib():
                 menu_graficos()
             else:
                 print("\n⚠️  matplotlib no está instalado")
                 print("Instala con: pip install matplotlib --break-system-packages")
+                if input("\n¿Exportar dashboards HTML (no requieren matplotlib)? (s/n): ").lower() == 's':
+                    menu_exportar_html()
                 input("\nPresiona Enter...")
         elif opcion == "4":
             mostrar_estadisticas_detalladas()
@@ -189,16 +188,22 @@ def menu_gestion():
         opcion = input("\nSelecciona: ").strip()
         
         if opcion == "1":
+            from modules.boveda import menu_boveda
             menu_boveda()
         elif opcion == "2":
+            from modules.ciclos import menu_ciclos
             menu_ciclos()
         elif opcion == "3":
+            from modules.configuracion import menu_configuracion
             menu_configuracion()
         elif opcion == "4":
+            from features.notas import menu_notas
             menu_notas()
         elif opcion == "5":
+            from features.alertas import menu_alertas
             menu_alertas()
         elif opcion == "6":
+            from modules.mantenimiento import menu_mantenimiento
             menu_mantenimiento()
         elif opcion == "7":
             break
@@ -267,6 +272,7 @@ def mostrar_estadisticas_detalladas():
         print(f"   Límites de ventas: {config['limite_ventas_min']}-{config['limite_ventas_max']}/día")
     
     # Alertas pendientes
+    from features.alertas import SistemaAlertas
     sistema_alertas = SistemaAlertas()
     num_alertas = sistema_alertas.contar_alertas_no_leidas()
     
@@ -410,6 +416,7 @@ def confirmar_salida():
             print()
     
     # Alertas pendientes
+    from features.alertas import SistemaAlertas
     sistema_alertas = SistemaAlertas()
     num_alertas = sistema_alertas.contar_alertas_no_leidas()
     
@@ -451,6 +458,11 @@ def inicializar_sistema():
         for directorio in directorios:
             Path(directorio).mkdir(exist_ok=True)
         
+        # Aplicar migraciones de esquema pendientes (BDs de versiones anteriores)
+        from core.migraciones import asegurar_esquema
+        for migracion in asegurar_esquema():
+            print(f"✅ Migración v{migracion.version} aplicada: {migracion.descripcion}")
+        
         # Verificar alertas al inicio
         verificar_alertas_inicio()
         
@@ -13,6 +13,28 @@ from core.calculos import calc
 from core.db_manager import db
 
 
+# ===================================================================
+# CONSULTAS
+# ===================================================================
+# core/plan_consultas.py audita estas mismas constantes
+
+# Últimas 50 compras de todos los ciclos
+SQL_HISTORIAL_COMPRAS = """
+    SELECT 
+        co.fecha,
+        co.ciclo_id,
+        cr.nombre,
+        cr.simbolo,
+        co.cantidad,
+        co.monto_usd,
+        co.tasa
+    FROM compras co
+    JOIN criptomonedas cr ON co.cripto_id = cr.id
+    ORDER BY co.fecha DESC
+    LIMIT 50
+"""
+
+
 # ===================================================================
 # FUNCIONES DE CONSULTA
 # ===================================================================
@@ -330,20 +352,7 @@ def ver_historial():
     print("HISTORIAL DE TRANSACCIONES")
     print("="*60)
     
-    compras = db.execute_query("""
-        SELECT 
-            co.fecha,
-            co.ciclo_id,
-            cr.nombre,
-            cr.simbolo,
-            co.cantidad,
-            co.monto_usd,
-            co.tasa
-        FROM compras co
-        JOIN criptomonedas cr ON co.cripto_id = cr.id
-        ORDER BY co.fecha DESC
-        LIMIT 50
-    """)
+    compras = db.execute_query(SQL_HISTORIAL_COMPRAS)
     
     if not compras:
         print("\n⚠️  No hay transacciones registradas")
@@ -11,6 +11,7 @@ from datetime import datetime, timedelta
 from core.logger import log
 from core.calculos import calc
 from core.db_manager import db
+from core.queries import queries
 
 
 # ===================================================================
@@ -282,22 +283,13 @@ def cerrar_ciclo(ciclo_id):
         print("    Cierra el día primero")
         return False
     
+    # Días operados y ganancia total desde resumen_ciclo
+    resumen = queries.obtener_resumen_ciclo(ciclo_id)
+    dias_operados = resumen['dias_cerrados'] if resumen else 0
+    ganancia_total = resumen['ganancia_dias'] if resumen else 0
+    
     # Calcular estadísticas finales
     with db.get_cursor(commit=False) as cursor:
-        # Días operados
-        cursor.execute("""
-            SELECT COUNT(*) as total
-            FROM dias WHERE ciclo_id = ? AND estado = 'cerrado'
-        """, (ciclo_id,))
-        dias_operados = cursor.fetchone()['total']
-        
-        # Ganancia total
-        cursor.execute("""
-            SELECT COALESCE(SUM(ganancia_neta), 0) as total
-            FROM dias WHERE ciclo_id = ? AND estado = 'cerrado'
-        """, (ciclo_id,))
-        ganancia_total = cursor.fetchone()['total']
-        
         # Capital final (criptos en bóveda)
         cursor.execute("""
             SELECT COALESCE(SUM(cantidad * precio_promedio), 0) as capital
@@ -397,46 +389,28 @@ def mostrar_estadisticas_completas():
     print("ESTADÍSTICAS DE CICLOS")
     print("="*60)
     
-    with db.get_cursor(commit=False) as cursor:
-        # Total de ciclos
-        cursor.execute("SELECT COUNT(*) as total FROM ciclos")
-        total_ciclos = cursor.fetchone()['total']
-        
-        # Ciclos cerrados
-        cursor.execute("SELECT COUNT(*) as total FROM ciclos WHERE estado = 'cerrado'")
-        ciclos_cerrados = cursor.fetchone()['total']
-        
-        # Ciclo activo
-        cursor.execute("SELECT * FROM ciclos WHERE estado = 'activo' ORDER BY id DESC LIMIT 1")
-        ciclo_activo = cursor.fetchone()
-        
-        print(f"\n📊 GENERAL:")
-        print(f"    Total de ciclos: {total_ciclos}")
-        print(f"    Ciclos cerrados: {ciclos_cerrados}")
-        print(f"    Ciclos activos: {1 if ciclo_activo else 0}")
-        
-        if ciclo_activo:
-            print(f"\n🔄 CICLO ACTIVO (#{ciclo_activo['id']}):")
-            mostrar_info_ciclo(ciclo_activo['id'])
-        
-        if ciclos_cerrados > 0:
-            # Estadísticas de ciclos cerrados
-            cursor.execute("""
-                SELECT 
-                    COUNT(*) as total,
-                    AVG(dias_operados) as dias_promedio,
-                    SUM(ganancia_total) as ganancia_total,
-                    AVG(roi_total) as roi_promedio
-                FROM ciclos
-                WHERE estado = 'cerrado'
-            """)
-            
-            stats = cursor.fetchone()
-            
-            print(f"\n📈 HISTÓRICO (Ciclos cerrados):")
-            print(f"    Días promedio por ciclo: {stats['dias_promedio']:.1f}")
-            print(f"    Ganancia total acumulada: ${stats['ganancia_total']:.2f}")
-            print(f"    ROI promedio: {stats['roi_promedio']:.2f}%")
+    resumen = queries.obtener_resumen_global()
+    total_ciclos = resumen['total_ciclos']
+    ciclos_cerrados = resumen['ciclos_cerrados']
+    
+    # Ciclo activo
+    ciclo_activo = obtener_ciclo_activo()
+    
+    print(f"\n📊 GENERAL:")
+    print(f"    Total de ciclos: {total_ciclos}")
+    print(f"    Ciclos cerrados: {ciclos_cerrados}")
+    print(f"    Ciclos activos: {1 if ciclo_activo else 0}")
+    
+    if ciclo_activo:
+        print(f"\n🔄 CICLO ACTIVO (#{ciclo_activo['id']}):")
+        mostrar_info_ciclo(ciclo_activo['id'])
+    
+    if ciclos_cerrados > 0:
+        # Estadísticas de ciclos cerrados (precalculadas en resumen_global)
+        print(f"\n📈 HISTÓRICO (Ciclos cerrados):")
+        print(f"    Días promedio por ciclo: {resumen['dias_promedio_cerrados']:.1f}")
+        print(f"    Ganancia total acumulada: ${resumen['ganancia_ciclos_cerrados']:.2f}")
+        print(f"    ROI promedio: {resumen['roi_promedio_cerrados'] or 0:.2f}%")
     
     print("="*60)
 
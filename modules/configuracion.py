@@ -15,6 +15,8 @@ import json
 from datetime import datetime
 from core.logger import log
 from core.db_manager import db
+from core.queries import queries
+from core.migraciones import asegurar_esquema
 
 
 # ===================================================================
@@ -24,56 +26,9 @@ from core.db_manager import db
 def inicializar_tablas_config():
     """Crea las tablas de configuración si no existen"""
     
-    with db.get_cursor(commit=True) as cursor:
-        # Tabla de configuración general
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS config (
-                id INTEGER PRIMARY KEY,
-                comision_default REAL DEFAULT 0.35,
-                ganancia_neta_default REAL DEFAULT 2.0,
-                modo_comision TEXT DEFAULT 'manual',
-                api_comision_activa INTEGER DEFAULT 0,
-                limite_ventas_min INTEGER DEFAULT 3,
-                limite_ventas_max INTEGER DEFAULT 5,
-                actualizado TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Tabla de APIs configuradas
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS apis_config (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                nombre TEXT NOT NULL,
-                plataforma TEXT NOT NULL,
-                api_key TEXT,
-                api_secret TEXT,
-                activa INTEGER DEFAULT 1,
-                tipo TEXT,
-                fecha_registro TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                ultima_actualizacion TIMESTAMP
-            )
-        """)
-        
-        # Tabla de comisiones por plataforma
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS comisiones_plataforma (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                plataforma TEXT NOT NULL,
-                tipo_operacion TEXT NOT NULL,
-                comision REAL NOT NULL,
-                fecha_actualizacion TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Insertar config por defecto si no existe
-        cursor.execute("SELECT COUNT(*) as total FROM config")
-        if cursor.fetchone()['total'] == 0:
-            cursor.execute("""
-                INSERT INTO config (id, comision_default, ganancia_neta_default)
-                VALUES (1, 0.35, 2.0)
-            """)
-    
-    log.info("Tablas de configuración inicializadas", categoria='general')
+    # config, apis_config y comisiones_plataforma se crean en la migración v1
+    if asegurar_esquema():
+        queries.invalidar_cache('config')
 
 
 # ===================================================================
@@ -82,10 +37,7 @@ def inicializar_tablas_config():
 
 def obtener_comision_actual():
     """Obtiene la comisión configurada actualmente"""
-    return db.execute_query("""
-        SELECT comision_default, modo_comision, api_comision_activa
-        FROM config WHERE id = 1
-    """, fetch_one=True)
+    return queries.obtener_config()
 
 
 def modificar_comision_manual(nueva_comision):
@@ -105,6 +57,7 @@ def modificar_comision_manual(nueva_comision):
             actualizado = datetime('now')
         WHERE id = 1
     """, (nueva_comision,))
+    queries.invalidar_cache('config')
     
     log.info(
         f"Comisión actualizada manualmente: {comision_anterior}% → {nueva_comision}%",
@@ -203,6 +156,7 @@ def actualizar_comision_automatica():
                 actualizado = datetime('now')
             WHERE id = 1
         """, (comision_obtenida,))
+        queries.invalidar_cache('config')
         
         print(f"✅ Comisión actualizada desde API: {comision_obtenida}%")
         log.info(f"Comisión actualizada automáticamente: {comision_obtenida}%", categoria='general')
@@ -220,11 +174,7 @@ def actualizar_comision_automatica():
 
 def obtener_ganancia_objetivo():
     """Obtiene la ganancia objetivo configurada"""
-    resultado = db.execute_query(
-        "SELECT ganancia_neta_default FROM config WHERE id = 1",
-        fetch_one=True
-    )
-    return resultado['ganancia_neta_default']
+    return queries.obtener_config()['ganancia_neta_default']
 
 
 def modificar_ganancia_objetivo(nueva_ganancia):
@@ -242,6 +192,7 @@ def modificar_ganancia_objetivo(nueva_ganancia):
             actualizado = datetime('now')
         WHERE id = 1
     """, (nueva_ganancia,))
+    queries.invalidar_cache('config')
     
     log.info(
         f"Ganancia objetivo actualizada: {ganancia_anterior}% → {nueva_ganancia}%",
@@ -258,10 +209,7 @@ def modificar_ganancia_objetivo(nueva_ganancia):
 
 def obtener_limites_ventas():
     """Obtiene los límites de ventas configurados"""
-    return db.execute_query("""
-        SELECT limite_ventas_min, limite_ventas_max
-        FROM config WHERE id = 1
-    """, fetch_one=True)
+    return queries.obtener_config()
 
 
 def modificar_limites_ventas(minimo, maximo):
@@ -279,6 +227,7 @@ def modificar_limites_ventas(minimo, maximo):
             actualizado = datetime('now')
         WHERE id = 1
     """, (minimo, maximo))
+    queries.invalidar_cache('config')
     
     log.info(f"Límites de ventas actualizados: {minimo}-{maximo}", categoria='general')
     print(f"✅ Límites actualizados: {minimo}-{maximo} ventas/día")
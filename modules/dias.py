@@ -11,6 +11,76 @@ from datetime import datetime, timedelta
 from core.logger import log
 from core.calculos import calc
 from core.db_manager import db
+from core.queries import queries
+
+
+# ===================================================================
+# CONSULTAS
+# ===================================================================
+# Sentencias de registrar_venta (una por venta) y lecturas por día;
+# core/plan_consultas.py audita estas mismas constantes
+
+# Contexto de la venta en una sola lectura: día, cripto, bóveda, comisión
+# y número de ventas previas del día. Parámetros: (cripto_id, dia_id)
+SQL_CONTEXTO_VENTA = """
+    SELECT 
+        d.ciclo_id,
+        c.nombre,
+        c.simbolo,
+        bc.cantidad,
+        bc.precio_promedio,
+        (SELECT comision_default FROM config WHERE id = 1) as comision_default,
+        (SELECT COUNT(*) FROM ventas WHERE dia_id = d.id) as ventas_previas
+    FROM dias d
+    LEFT JOIN criptomonedas c ON c.id = ?
+    LEFT JOIN boveda_ciclo bc 
+        ON bc.ciclo_id = d.ciclo_id AND bc.cripto_id = c.id
+    WHERE d.id = ?
+"""
+
+# Descuento de bóveda con guarda de saldo.
+# Parámetros: (cantidad, ciclo_id, cripto_id, cantidad)
+SQL_DESCONTAR_BOVEDA = """
+    UPDATE boveda_ciclo
+    SET cantidad = cantidad - ?
+    WHERE ciclo_id = ? AND cripto_id = ? AND cantidad >= ?
+"""
+
+# Criptos con saldo en la bóveda del ciclo. Parámetros: (ciclo_id,)
+SQL_CRIPTOS_DISPONIBLES = """
+    SELECT 
+        c.id,
+        c.nombre,
+        c.simbolo,
+        bc.cantidad,
+        bc.precio_promedio,
+        (bc.cantidad * bc.precio_promedio) as valor_usd
+    FROM boveda_ciclo bc
+    JOIN criptomonedas c ON bc.cripto_id = c.id
+    WHERE bc.ciclo_id = ? AND bc.cantidad > 0
+    ORDER BY c.nombre
+"""
+
+# Resumen por día del ciclo. Parámetros: (ciclo_id,)
+SQL_RESUMEN_DIAS = """
+    SELECT 
+        numero_dia,
+        fecha,
+        capital_inicial,
+        capital_final,
+        ganancia_neta,
+        estado
+    FROM dias
+    WHERE ciclo_id = ?
+    ORDER BY numero_dia
+"""
+
+# Número del próximo día del ciclo. Parámetros: (ciclo_id,)
+SQL_SIGUIENTE_DIA = """
+    SELECT COALESCE(MAX(numero_dia), 0) + 1 as siguiente_dia
+    FROM dias
+    WHERE ciclo_id = ?
+"""
 
 
 # ===================================================================
@@ -18,12 +88,8 @@ from core.db_manager import db
 # ===================================================================
 
 def obtener_cripto_por_id(cripto_id):
-    """Obtiene información de una criptomoneda"""
-    return db.execute_query("""
-        SELECT id, nombre, simbolo, tipo
-        FROM criptomonedas
-        WHERE id = ?
-    """, (cripto_id,), fetch_one=True)
+    """Obtiene información de una criptomoneda (catálogo en caché)"""
+    return queries.obtener_cripto_por_id(cripto_id)
 
 
 def obtener_costo_promedio(cripto_id, ciclo_id):
@@ -50,19 +116,7 @@ def obtener_cantidad_disponible(cripto_id, ciclo_id):
 
 def obtener_criptos_disponibles(ciclo_id):
     """Obtiene todas las criptos con cantidad > 0 en un ciclo"""
-    return db.execute_query("""
-        SELECT 
-            c.id,
-            c.nombre,
-            c.simbolo,
-            bc.cantidad,
-            bc.precio_promedio,
-            (bc.cantidad * bc.precio_promedio) as valor_usd
-        FROM boveda_ciclo bc
-        JOIN criptomonedas c ON bc.cripto_id = c.id
-        WHERE bc.ciclo_id = ? AND bc.cantidad > 0
-        ORDER BY c.nombre
-    """, (ciclo_id,))
+    return db.execute_query(SQL_CRIPTOS_DISPONIBLES, (ciclo_id,))
 
 
 def calcular_capital_actual_criptos(ciclo_id):
@@ -122,18 +176,7 @@ def contar_ventas_del_dia(dia_id):
 
 def obtener_resumen_dias(ciclo_id):
     """Obtiene resumen de todos los días de un ciclo"""
-    return db.execute_query("""
-        SELECT 
-            numero_dia,
-            fecha,
-            capital_inicial,
-            capital_final,
-            ganancia_neta,
-            estado
-        FROM dias
-        WHERE ciclo_id = ?
-        ORDER BY numero_dia
-    """, (ciclo_id,))
+    return db.execute_query(SQL_RESUMEN_DIAS, (ciclo_id,))
 
 
 # ===================================================================
@@ -153,11 +196,7 @@ def iniciar_dia(ciclo_id):
         return dia_actual['id']
     
     # Calcular número de día
-    resultado = db.execute_query("""
-        SELECT COALESCE(MAX(numero_dia), 0) + 1 as siguiente_dia
-        FROM dias
-        WHERE ciclo_id = ?
-    """, (ciclo_id,), fetch_one=True)
+    resultado = db.execute_query(SQL_SIGUIENTE_DIA, (ciclo_id,), fetch_one=True)
     numero_dia = resultado['siguiente_dia']
     
     # Calcular capital inicial del día
@@ -206,11 +245,8 @@ def definir_precio_venta(dia_id, cripto_id, precio_publicado):
     cripto = obtener_cripto_por_id(cripto_id)
     costo_promedio = obtener_costo_promedio(cripto_id, ciclo_id)
     
-    # Obtener configuración
-    config = db.execute_query(
-        "SELECT comision_default, ganancia_neta_default FROM config WHERE id = 1",
-        fetch_one=True
-    )
+    # Obtener configuración (desde caché)
+    config = queries.obtener_config()
     comision = config['comision_default']
     ganancia_objetivo = config['ganancia_neta_default']
     
@@ -257,69 +293,72 @@ def registrar_venta(dia_id, cripto_id, cantidad, precio_unitario):
     
     Returns:
         bool: True si se registró correctamente
-    """
-    
-    # Obtener día
-    dia = obtener_dia(dia_id)
-    if not dia:
-        log.error("Día no encontrado", f"dia_id={dia_id}")
-        return False
-    
-    ciclo_id = dia['ciclo_id']
-    
-    # Obtener cripto
-    cripto = obtener_cripto_por_id(cripto_id)
-    if not cripto:
-        log.error("Cripto no encontrada", f"cripto_id={cripto_id}")
-        return False
     
-    # Obtener costo promedio
-    costo_unitario = obtener_costo_promedio(cripto_id, ciclo_id)
-    
-    if costo_unitario == 0:
-        log.error("Costo promedio es 0", f"cripto_id={cripto_id}")
-        return False
-    
-    # Verificar cantidad disponible
-    cantidad_disponible = obtener_cantidad_disponible(cripto_id, ciclo_id)
-    
-    if cantidad > cantidad_disponible:
-        log.error(
-            "Cantidad insuficiente",
-            f"Solicitado: {cantidad}, Disponible: {cantidad_disponible}"
-        )
-        return False
-    
-    # Obtener comisión
-    config = db.execute_query(
-        "SELECT comision_default FROM config WHERE id = 1",
-        fetch_one=True
-    )
-    comision_pct = config['comision_default']
-    
-    # Calcular valores de la venta
-    resultado_venta = calc.calcular_venta(
-        cantidad=cantidad,
-        costo_unitario=costo_unitario,
-        precio_venta=precio_unitario
-    )
-    
-    if not resultado_venta:
-        log.error("Error al calcular venta")
-        return False
+    Todo el flujo (lectura de contexto, descuento de bóveda y escrituras)
+    corre en una sola transacción IMMEDIATE sobre una única conexión.
+    """
     
-    # Usar transacción para garantizar consistencia
     try:
         with db.transaction() as conn:
             cursor = conn.cursor()
             
-            # 1. Insertar venta
+            # 1. Contexto de la venta en una sola lectura: día, cripto,
+            #    bóveda, comisión y número de ventas previas del día
+            cursor.execute(SQL_CONTEXTO_VENTA, (cripto_id, dia_id))
+            contexto = cursor.fetchone()
+            
+            if not contexto:
+                log.error("Día no encontrado", f"dia_id={dia_id}")
+                return False
+            
+            if contexto['nombre'] is None:
+                log.error("Cripto no encontrada", f"cripto_id={cripto_id}")
+                return False
+            
+            ciclo_id = contexto['ciclo_id']
+            costo_unitario = contexto['precio_promedio'] or 0
+            cantidad_disponible = contexto['cantidad'] or 0
+            
+            if costo_unitario == 0:
+                log.error("Costo promedio es 0", f"cripto_id={cripto_id}")
+                return False
+            
+            if cantidad > cantidad_disponible:
+                log.error(
+                    "Cantidad insuficiente",
+                    f"Solicitado: {cantidad}, Disponible: {cantidad_disponible}"
+                )
+                return False
+            
+            # Calcular valores de la venta
+            resultado_venta = calc.calcular_venta(
+                cantidad=cantidad,
+                costo_unitario=costo_unitario,
+                precio_venta=precio_unitario,
+                comision_pct=contexto['comision_default']
+            )
+            
+            if not resultado_venta:
+                log.error("Error al calcular venta")
+                return False
+            
+            # 2. Descontar de bóveda con guarda de saldo
+            cursor.execute(SQL_DESCONTAR_BOVEDA, (cantidad, ciclo_id, cripto_id, cantidad))
+            
+            if cursor.rowcount != 1:
+                log.error("Cantidad insuficiente", f"cripto_id={cripto_id}")
+                return False
+            
+            # 3. Insertar venta
             cursor.execute("""
                 INSERT INTO ventas (
                     dia_id, cripto_id, cantidad, precio_unitario,
                     costo_total, monto_venta, comision, efectivo_recibido,
-                    ganancia_bruta, ganancia_neta, fecha
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
+                    ganancia_bruta, ganancia_neta,
+                    costo_total_micro, monto_venta_micro, comision_micro,
+                    efectivo_recibido_micro, ganancia_bruta_micro, ganancia_neta_micro,
+                    fecha
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
             """, (
                 dia_id,
                 cripto_id,
@@ -330,17 +369,11 @@ def registrar_venta(dia_id, cripto_id, cantidad, precio_unitario):
                 resultado_venta['comision'],
                 resultado_venta['efectivo_recibido'],
                 resultado_venta['ganancia_bruta'],
-                resultado_venta['ganancia_neta']
+                resultado_venta['ganancia_neta'],
+                *calc.montos_micro(resultado_venta)
             ))
             
-            # 2. Actualizar bóveda (restar cantidad vendida)
-            cursor.execute("""
-                UPDATE boveda_ciclo
-                SET cantidad = cantidad - ?
-                WHERE ciclo_id = ? AND cripto_id = ?
-            """, (cantidad, ciclo_id, cripto_id))
-            
-            # 3. Registrar efectivo recibido
+            # 4. Registrar efectivo recibido
             cursor.execute("""
                 INSERT INTO efectivo_banco (ciclo_id, dia_id, monto, concepto, fecha)
                 VALUES (?, ?, ?, ?, datetime('now'))
@@ -348,27 +381,25 @@ def registrar_venta(dia_id, cripto_id, cantidad, precio_unitario):
                 ciclo_id,
                 dia_id,
                 resultado_venta['efectivo_recibido'],
-                f"Venta de {cantidad:.8f} {cripto['simbolo']}"
+                f"Venta de {cantidad:.8f} {contexto['simbolo']}"
             ))
             
             # Commit automático al salir del context manager
         
-        # Contar número de venta
-        num_venta = contar_ventas_del_dia(dia_id)
-        
         # REGISTRAR EN LOG
         log.venta_registrada(
-            venta_num=num_venta,
-            cripto=cripto['nombre'],
+            venta_num=contexto['ventas_previas'] + 1,
+            cripto=contexto['nombre'],
             cantidad_vendida=cantidad,
             precio_unitario=precio_unitario,
             monto_total=resultado_venta['efectivo_recibido'],
             comision_pagada=resultado_venta['comision'],
-            ganancia_neta=resultado_venta['ganancia_neta']
+            ganancia_neta=resultado_venta['ganancia_neta'],
+            ciclo_id=contexto['ciclo_id']
         )
         
         return True
-        
+    
     except Exception as e:
         log.error("Error al registrar venta", str(e))
         return False
@@ -424,16 +455,14 @@ def cerrar_dia(dia_id, ciclo_id):
     # Capital final total
     capital_final_total = capital_final_criptos + efectivo_recibido
     
-    # Calcular totales del día
-    totales = db.execute_query("""
-        SELECT 
-            COALESCE(SUM(monto_venta), 0) as monto_total,
-            COALESCE(SUM(comision), 0) as comisiones_total,
-            COALESCE(SUM(ganancia_bruta), 0) as ganancia_bruta_total,
-            COALESCE(SUM(ganancia_neta), 0) as ganancia_neta_total
-        FROM ventas
-        WHERE dia_id = ?
-    """, (dia_id,), fetch_one=True)
+    # Totales del día desde resumen_dia (mantenido por triggers en micro-unidades)
+    resumen = queries.obtener_resumen_dia(dia_id)
+    totales = {
+        'monto_total': resumen['monto_venta'] if resumen else 0,
+        'comisiones_total': resumen['comision'] if resumen else 0,
+        'ganancia_bruta_total': resumen['ganancia_bruta'] if resumen else 0,
+        'ganancia_neta_total': resumen['ganancia_neta'] if resumen else 0
+    }
     
     # Actualizar día
     db.execute_update("""
@@ -615,7 +644,7 @@ def aplicar_interes_compuesto(dia_id, ciclo_id):
         print(f"    ${efectivo:.2f} reinvertidos en {cantidad:.8f} {cripto['simbolo']}")
         
         return True
-        
+    
     except ValueError:
         print("❌ Entrada inválida")
         return False
@@ -642,12 +671,10 @@ def validar_limite_ventas(dia_id):
     
     num_ventas = contar_ventas_del_dia(dia_id)
     
-    limites = db.execute_query(
-        "SELECT limite_ventas_min, limite_ventas_max FROM config WHERE id = 1",
-        fetch_one=True
-    )
+    # Límites desde la caché de configuración
+    _, limite_max = queries.obtener_limites_ventas()
     
-    if num_ventas >= limites['limite_ventas_max']:
+    if num_ventas >= limite_max:
         return False
     
     return True
@@ -12,12 +12,15 @@ Gestiona el mantenimiento de la base de datos y el sistema:
 ✅ Ahora usa db_manager para conexiones seguras
 """
 
-import os
-import shutil
+import sqlite3
 from datetime import datetime, timedelta
 from pathlib import Path
 from core.logger import log
-from core.db_manager import db
+from core.db_manager import db, perfilador
+from core.queries import queries
+from core.resumenes import verificar_resumenes, reconstruir_resumenes
+from core.plan_consultas import auditar_consultas
+from core.migraciones import asegurar_esquema
 
 
 # ===================================================================
@@ -30,20 +33,48 @@ BACKUP_DIR.mkdir(exist_ok=True)
 LOGS_DIR = Path("logs")
 LOGS_DIR.mkdir(exist_ok=True)
 
+# Llamadas de una misma sentencia desde una misma función a partir de las
+# cuales el perfilador la marca como posible N+1 (consulta dentro de un bucle)
+UMBRAL_N_MAS_1 = 20
+
 
 # ===================================================================
 # BACKUPS
 # ===================================================================
 
+def _copiar_bd(origen: Path, destino: Path):
+    """
+    Copia una BD con la API de backup de SQLite
+    
+    A diferencia de copiar el archivo, incluye lo que aún está en el WAL
+    y obtiene una instantánea consistente aunque haya escrituras en curso.
+    
+    Args:
+        origen: BD a copiar
+        destino: BD que se sobrescribe (se crea si no existe)
+    """
+    conn_origen = sqlite3.connect(origen)
+    try:
+        conn_destino = sqlite3.connect(destino)
+        try:
+            conn_origen.backup(conn_destino)
+        finally:
+            conn_destino.close()
+    finally:
+        conn_origen.close()
+
+
 def crear_backup():
     """Crea un backup completo de la base de datos"""
     
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    # Con microsegundos: el backup de seguridad de restaurar_backup no
+    # debe pisar el backup que se está restaurando
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
     backup_file = BACKUP_DIR / f"arbitraje_backup_{timestamp}.db"
     
     try:
-        # Copiar archivo de base de datos directamente
-        shutil.copy2('arbitraje.db', backup_file)
+        # Copia consistente de la BD en uso, incluido lo pendiente en el WAL
+        _copiar_bd(db.db_path, backup_file)
         
         # Calcular tamaño del backup
         tamaño_mb = backup_file.stat().st_size / (1024 * 1024)
@@ -122,8 +153,17 @@ def restaurar_backup(backup_file):
         print("\nCreando backup de seguridad de la BD actual...")
         backup_seguridad = crear_backup()
         
-        # Copiar el backup sobre la BD actual
-        shutil.copy2(backup_file, 'arbitraje.db')
+        # Cerrar las conexiones persistentes antes de sobrescribir el archivo
+        db.cerrar()
+        
+        # Copiar el backup sobre la BD en uso (a través de SQLite, así el
+        # WAL de la BD actual no queda desfasado respecto del archivo)
+        _copiar_bd(backup_file, db.db_path)
+        queries.invalidar_cache()
+        
+        # Un backup de una versión anterior queda con el esquema al día
+        for migracion in asegurar_esquema(forzar=True):
+            print(f"   Migración v{migracion.version} aplicada: {migracion.descripcion}")
         
         log.info(f"Base de datos restaurada desde {backup_file.name}", categoria='general')
         
@@ -298,17 +338,17 @@ def optimizar_bd():
     try:
         with db.get_cursor(commit=True) as cursor:
             # 1. VACUUM - Reconstruye BD y recupera espacio
-            print("\n[1/3] Ejecutando VACUUM...")
+            print("\n[1/4] Ejecutando VACUUM...")
             cursor.execute("VACUUM")
             print("   ✅ VACUUM completado")
             
             # 2. ANALYZE - Actualiza estadísticas para optimizar queries
-            print("\n[2/3] Ejecutando ANALYZE...")
+            print("\n[2/4] Ejecutando ANALYZE...")
             cursor.execute("ANALYZE")
             print("   ✅ ANALYZE completado")
             
             # 3. Verificar índices
-            print("\n[3/3] Verificando índices...")
+            print("\n[3/4] Verificando índices...")
             cursor.execute("""
                 SELECT name FROM sqlite_master 
                 WHERE type='index' AND sql IS NOT NULL
@@ -316,6 +356,14 @@ def optimizar_bd():
             indices = cursor.fetchall()
             print(f"   ✅ {len(indices)} índice(s) activos")
         
+        # 4. Checkpoint del WAL (fuera de la transacción)
+        print("\n[4/4] Ejecutando checkpoint del WAL...")
+        resultado = db.checkpoint('TRUNCATE')
+        if resultado is None:
+            print(f"   ℹ️  Perfil '{db.perfil}': la BD no usa WAL")
+        else:
+            print(f"   ✅ {resultado['paginas_copiadas']} página(s) traspasadas")
+        
         log.info("Base de datos optimizada exitosamente", categoria='general')
         
         print("\n" + "="*60)
@@ -336,8 +384,8 @@ def obtener_info_sistema():
     info = {}
     
     # Tamaño de BD
-    if os.path.exists('arbitraje.db'):
-        tamaño_bytes = os.path.getsize('arbitraje.db')
+    if db.db_path.exists():
+        tamaño_bytes = db.db_path.stat().st_size
         info['tamaño_bd'] = tamaño_bytes / (1024 * 1024)  # MB
     else:
         info['tamaño_bd'] = 0
@@ -346,7 +394,8 @@ def obtener_info_sistema():
     backups = list(BACKUP_DIR.glob("*.db"))
     info['num_backups'] = len(backups)
     
-    # Tamaño de logs
+    # Tamaño de logs (con lo pendiente del escritor ya en disco)
+    log.flush()
     tamaño_logs = 0
     if LOGS_DIR.exists():
         for log_file in LOGS_DIR.glob("*.log"):
@@ -407,6 +456,222 @@ def mostrar_estadisticas_sistema():
     print("="*60)
 
 
+# ===================================================================
+# TABLAS RESUMEN
+# ===================================================================
+
+def verificar_tablas_resumen(reconstruir=None):
+    """
+    Compara las tablas resumen con el historial y las reconstruye si difieren
+    
+    Args:
+        reconstruir: True/False para no preguntar; None pregunta si hay diferencias
+    
+    Returns:
+        bool: True si los resúmenes quedaron consistentes
+    """
+    print("\n" + "="*60)
+    print("VERIFICACIÓN DE TABLAS RESUMEN")
+    print("="*60)
+    
+    try:
+        with db.get_cursor() as cursor:
+            diferencias = verificar_resumenes(cursor.connection)
+        
+        if not diferencias:
+            print("\n✅ Los resúmenes coinciden con ventas, días, ciclos y compras")
+            return True
+        
+        print(f"\n⚠️  {len(diferencias)} diferencia(s) encontradas:")
+        for diferencia in diferencias[:20]:
+            print(f"   • {diferencia}")
+        if len(diferencias) > 20:
+            print(f"   ... y {len(diferencias) - 20} más")
+        
+        if reconstruir is None:
+            reconstruir = input("\n¿Reconstruir los resúmenes desde el historial? (s/n): ").lower() == 's'
+        
+        if not reconstruir:
+            print("❌ Reconstrucción cancelada")
+            return False
+        
+        with db.transaction() as conn:
+            filas = reconstruir_resumenes(conn)
+        
+        log.advertencia(f"Tablas resumen reconstruidas ({len(diferencias)} diferencias)", categoria='general')
+        
+        print("\n✅ Resúmenes reconstruidos:")
+        for tabla, total in filas.items():
+            print(f"   • {tabla}: {total} fila(s)")
+        
+        return True
+        
+    except Exception as e:
+        log.error("Error al verificar tablas resumen", str(e))
+        print(f"\n❌ Error: {e}")
+        return False
+
+
+# ===================================================================
+# AUDITORÍA DE CONSULTAS
+# ===================================================================
+
+def auditar_planes_consultas(detalle=False):
+    """
+    Ejecuta EXPLAIN QUERY PLAN sobre las consultas registradas y marca
+    las que recorren tablas completas
+    
+    Args:
+        detalle: Si es True, muestra el plan de todas las consultas
+    
+    Returns:
+        int: Número de consultas con escaneos completos o errores
+    """
+    print("\n" + "="*60)
+    print("AUDITORÍA DE PLANES DE CONSULTA")
+    print("="*60)
+    
+    with db.get_cursor(commit=False) as cursor:
+        resultados = auditar_consultas(cursor.connection)
+    
+    problemas = 0
+    
+    for resultado in resultados:
+        if resultado['error']:
+            problemas += 1
+            print(f"\n   ❌ {resultado['origen']}: {resultado['error']}")
+        elif resultado['escaneos']:
+            problemas += 1
+            print(f"\n   ⚠️  {resultado['origen']}: escaneo completo de {', '.join(resultado['escaneos'])}")
+        elif detalle:
+            print(f"\n   ✅ {resultado['origen']}")
+        else:
+            continue
+        
+        for paso in resultado['plan']:
+            print(f"      {paso}")
+    
+    print("\n" + "="*60)
+    if problemas:
+        print(f"⚠️  {problemas} de {len(resultados)} consulta(s) sin índice adecuado")
+        print("   Ejecuta inicializar_bd.py → [2] para crear los índices faltantes")
+        log.advertencia(f"Auditoría de consultas: {problemas} sin índice adecuado", categoria='general')
+    else:
+        print(f"✅ Las {len(resultados)} consultas registradas usan índices")
+    print("="*60)
+    
+    return problemas
+
+
+# ===================================================================
+# PERFILADOR SQL
+# ===================================================================
+
+def mostrar_perfil_sql(limite=15, orden='tiempo_total'):
+    """
+    Muestra las sentencias más costosas registradas por el perfilador
+    
+    Args:
+        limite: Número de sentencias a mostrar
+        orden: Criterio (tiempo_total, llamadas, tiempo_max, filas)
+    
+    Returns:
+        int: Sentencias marcadas como posible N+1
+    """
+    print("\n" + "="*60)
+    print("PERFIL DE SENTENCIAS SQL")
+    print("="*60)
+    
+    sentencias = perfilador.informe(orden)
+    
+    if not sentencias:
+        estado = "activo" if perfilador.activo else "inactivo"
+        print(f"\nℹ️  Sin sentencias registradas (perfilador {estado})")
+        return 0
+    
+    llamadas = sum(s['llamadas'] for s in sentencias)
+    tiempo = sum(s['tiempo_total'] for s in sentencias)
+    if perfilador.desde:
+        print(f"\nDesde: {perfilador.desde:%Y-%m-%d %H:%M:%S}")
+    print(f"Sentencias distintas: {len(sentencias)}  |  Llamadas: {llamadas}  |  Tiempo: {tiempo*1000:.1f} ms")
+    
+    sospechosas = 0
+    
+    for i, sentencia in enumerate(sentencias[:limite], 1):
+        sql = sentencia['sql']
+        print(f"\n[{i}] {sql[:100]}{'...' if len(sql) > 100 else ''}")
+        print(f"    Llamadas: {sentencia['llamadas']}  |  Total: {sentencia['tiempo_total']*1000:.2f} ms"
+              f"  |  Máx: {sentencia['tiempo_max']*1000:.2f} ms  |  Filas: {sentencia['filas']}")
+        
+        for origen, veces in list(sentencia['origenes'].items())[:3]:
+            marca = ""
+            if veces >= UMBRAL_N_MAS_1:
+                marca = "  ⚠️  posible N+1"
+                sospechosas += 1
+            print(f"    {veces:>6}× {origen}{marca}")
+    
+    print("\n" + "="*60)
+    if sospechosas:
+        print(f"⚠️  {sospechosas} origen(es) repiten la misma sentencia {UMBRAL_N_MAS_1}+ veces")
+        print("   Suele indicar una consulta dentro de un bucle que puede resolverse con un JOIN")
+    print("="*60)
+    
+    return sospechosas
+
+
+def menu_perfilador_sql():
+    """Submenú del perfilador SQL"""
+    
+    while True:
+        estado = "🟢 activo" if perfilador.activo else "⚪ inactivo"
+        print("\n" + "="*60)
+        print(f"PERFILADOR SQL ({estado})")
+        print("="*60)
+        print("[1] Desactivar" if perfilador.activo else "[1] Activar")
+        print("[2] Ver sentencias más costosas")
+        print("[3] Ver sentencias más repetidas")
+        print("[4] Guardar informe en archivo")
+        print("[5] Reiniciar contadores")
+        print("[6] Volver")
+        print("="*60)
+        
+        opcion = input("\nSelecciona: ").strip()
+        
+        if opcion == "1":
+            db.activar_perfilador(not perfilador.activo)
+            if perfilador.activo:
+                print("✅ Perfilador activado: usa el sistema y vuelve aquí para ver el resultado")
+            else:
+                print("✅ Perfilador desactivado (los datos se conservan)")
+            log.info(f"Perfilador SQL {'activado' if perfilador.activo else 'desactivado'}", categoria='general')
+        
+        elif opcion == "2":
+            mostrar_perfil_sql()
+            input("\nPresiona Enter...")
+        
+        elif opcion == "3":
+            mostrar_perfil_sql(orden='llamadas')
+            input("\nPresiona Enter...")
+        
+        elif opcion == "4":
+            try:
+                ruta = perfilador.volcar()
+                print(f"✅ Informe guardado en {ruta}")
+            except OSError as e:
+                print(f"❌ Error al guardar el informe: {e}")
+                log.error("Error al guardar el perfil SQL", str(e))
+        
+        elif opcion == "5":
+            perfilador.reiniciar()
+            print("✅ Contadores reiniciados")
+        
+        elif opcion == "6":
+            break
+        
+        else:
+            print("❌ Opción inválida")
+
+
 # ===================================================================
 # LIMPIEZA
 # ===================================================================
@@ -604,7 +869,11 @@ def menu_mantenimiento():
         print("[7] Optimizar Base de Datos")
         print("[8] Limpiar Ciclos Antiguos")
         print("[9] Estadísticas del Sistema")
-        print("[10] Volver")
+        print("[10] Consultar Logs Estructurados")
+        print("[11] Verificar/Reconstruir Resúmenes")
+        print("[12] Auditar Planes de Consultas")
+        print("[13] Perfilador SQL")
+        print("[14] Volver")
         print("="*60)
         
         opcion = input("\nSelecciona: ").strip()
@@ -659,6 +928,23 @@ def menu_mantenimiento():
             input("\nPresiona Enter...")
         
         elif opcion == "10":
+            from features.consulta_logs import menu_consulta_logs
+            menu_consulta_logs()
+            input("\nPresiona Enter...")
+        
+        elif opcion == "11":
+            verificar_tablas_resumen()
+            input("\nPresiona Enter...")
+        
+        elif opcion == "12":
+            ver_todo = input("\n¿Mostrar el plan de todas las consultas? (s/n): ").lower() == 's'
+            auditar_planes_consultas(ver_todo)
+            input("\nPresiona Enter...")
+        
+        elif opcion == "13":
+            menu_perfilador_sql()
+        
+        elif opcion == "14":
             break
         
         else:
@@ -10,13 +10,17 @@ CORRECCIONES:
 - Alertas de límite de ventas funcionando
 """
 
-from datetime import datetime
+import csv
+import json
+from pathlib import Path
 from typing import Optional, Dict, List
 from core.db_manager import db
 from core.logger import log
 from core.calculos import calc
 from core.queries import queries
-from core.validaciones import validar_cantidad_positiva, validar_precio_positivo
+from core.validaciones import (
+    validar_cantidad_positiva, validar_precio_positivo, validar_ventas_lote
+)
 
 
 # ===================================================================
@@ -64,62 +68,67 @@ def registrar_venta_manual(dia_id: int, cripto_id: int, cantidad: float,
     if not venta_calculada:
         raise ValueError("Error al calcular la venta")
     
-    # Insertar venta en BD
-    venta_id = db.execute_update("""
-        INSERT INTO ventas (
-            dia_id, cripto_id, cantidad, precio_unitario,
-            costo_total, monto_venta, comision, efectivo_recibido,
-            ganancia_bruta, ganancia_neta
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, (
-        dia_id,
-        cripto_id,
-        cantidad,
-        precio_unitario,
-        venta_calculada['costo_total'],
-        venta_calculada['monto_venta'],
-        venta_calculada['comision'],
-        venta_calculada['efectivo_recibido'],
-        venta_calculada['ganancia_bruta'],
-        venta_calculada['ganancia_neta']
-    ))
-    
-    # ⭐ CRÍTICO: ACTUALIZAR BÓVEDA
-    with db.get_cursor(commit=True) as cursor:
-        # Restar cantidad de la bóveda
-        cursor.execute("""
-            UPDATE boveda_ciclo
-            SET cantidad = cantidad - ?
-            WHERE ciclo_id = ? AND cripto_id = ?
-        """, (cantidad, dia['ciclo_id'], cripto_id))
-        
-        # Verificar que no quedó negativa
-        cursor.execute("""
-            SELECT cantidad FROM boveda_ciclo
-            WHERE ciclo_id = ? AND cripto_id = ?
-        """, (dia['ciclo_id'], cripto_id))
-        
-        result = cursor.fetchone()
-        if result and result['cantidad'] < 0:
-            # Rollback automático por el context manager
-            raise ValueError("Error: cantidad en bóveda insuficiente")
-    
-    # Actualizar totales del día
-    with db.get_cursor(commit=True) as cursor:
-        cursor.execute("""
-            UPDATE dias
-            SET efectivo_recibido = efectivo_recibido + ?,
-                comisiones_pagadas = comisiones_pagadas + ?,
-                ganancia_bruta = ganancia_bruta + ?,
-                ganancia_neta = ganancia_neta + ?
-            WHERE id = ?
+    # Todas las escrituras de la venta en una sola transacción (un commit)
+    with db.transaction():
+        # Insertar venta en BD
+        venta_id = db.execute_update("""
+            INSERT INTO ventas (
+                dia_id, cripto_id, cantidad, precio_unitario,
+                costo_total, monto_venta, comision, efectivo_recibido,
+                ganancia_bruta, ganancia_neta,
+                costo_total_micro, monto_venta_micro, comision_micro,
+                efectivo_recibido_micro, ganancia_bruta_micro, ganancia_neta_micro
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """, (
-            venta_calculada['efectivo_recibido'],
+            dia_id,
+            cripto_id,
+            cantidad,
+            precio_unitario,
+            venta_calculada['costo_total'],
+            venta_calculada['monto_venta'],
             venta_calculada['comision'],
+            venta_calculada['efectivo_recibido'],
             venta_calculada['ganancia_bruta'],
             venta_calculada['ganancia_neta'],
-            dia_id
+            *calc.montos_micro(venta_calculada)
         ))
+        
+        # ⭐ CRÍTICO: ACTUALIZAR BÓVEDA
+        with db.get_cursor(commit=True) as cursor:
+            # Restar cantidad de la bóveda
+            cursor.execute("""
+                UPDATE boveda_ciclo
+                SET cantidad = cantidad - ?
+                WHERE ciclo_id = ? AND cripto_id = ?
+            """, (cantidad, dia['ciclo_id'], cripto_id))
+            
+            # Verificar que no quedó negativa
+            cursor.execute("""
+                SELECT cantidad FROM boveda_ciclo
+                WHERE ciclo_id = ? AND cripto_id = ?
+            """, (dia['ciclo_id'], cripto_id))
+            
+            result = cursor.fetchone()
+            if result and result['cantidad'] < 0:
+                # Rollback automático de toda la venta por la transacción
+                raise ValueError("Error: cantidad en bóveda insuficiente")
+        
+        # Actualizar totales del día
+        with db.get_cursor(commit=True) as cursor:
+            cursor.execute("""
+                UPDATE dias
+                SET efectivo_recibido = efectivo_recibido + ?,
+                    comisiones_pagadas = comisiones_pagadas + ?,
+                    ganancia_bruta = ganancia_bruta + ?,
+                    ganancia_neta = ganancia_neta + ?
+                WHERE id = ?
+            """, (
+                venta_calculada['efectivo_recibido'],
+                venta_calculada['comision'],
+                venta_calculada['ganancia_bruta'],
+                venta_calculada['ganancia_neta'],
+                dia_id
+            ))
     
     # Log
     cripto = db.execute_query(
@@ -135,7 +144,8 @@ def registrar_venta_manual(dia_id: int, cripto_id: int, cantidad: float,
         precio_unitario,
         venta_calculada['monto_venta'],
         venta_calculada['comision'],
-        venta_calculada['ganancia_neta']
+        venta_calculada['ganancia_neta'],
+        ciclo_id=dia['ciclo_id']
     )
     
     return venta_id
@@ -160,6 +170,201 @@ def obtener_cantidad_disponible(ciclo_id: int, cripto_id: int) -> float:
     return boveda['cantidad'] if boveda else 0
 
 
+# ===================================================================
+# IMPORTACIÓN MASIVA DE VENTAS
+# ===================================================================
+
+def leer_archivo_ventas(ruta: str) -> List[Dict]:
+    """
+    Lee un archivo de ventas (CSV o JSON) exportado del exchange
+    
+    CSV: encabezados cripto, cantidad, precio (o precio_unitario).
+    JSON: lista de objetos con las mismas claves.
+    La cripto puede indicarse por símbolo o por ID.
+    
+    Args:
+        ruta: Ruta del archivo .csv o .json
+    
+    Returns:
+        list: Dicts {'cripto', 'cantidad', 'precio'} en el orden del archivo
+    
+    Raises:
+        ValueError: Si el formato no es válido
+    """
+    archivo = Path(ruta)
+    
+    if archivo.suffix.lower() == '.json':
+        with open(archivo, encoding='utf-8') as f:
+            registros = json.load(f)
+        if not isinstance(registros, list):
+            raise ValueError("El JSON debe ser una lista de ventas")
+    elif archivo.suffix.lower() == '.csv':
+        with open(archivo, newline='', encoding='utf-8-sig') as f:
+            registros = list(csv.DictReader(f))
+    else:
+        raise ValueError("Formato no soportado (usa .csv o .json)")
+    
+    ventas = []
+    for fila, registro in enumerate(registros, 1):
+        try:
+            precio = registro.get('precio', registro.get('precio_unitario'))
+            ventas.append({
+                'cripto': str(registro['cripto']).strip(),
+                'cantidad': float(registro['cantidad']),
+                'precio': float(precio)
+            })
+        except (KeyError, TypeError, ValueError, AttributeError):
+            raise ValueError(f"Fila {fila}: se esperan cripto, cantidad y precio")
+    
+    return ventas
+
+
+def importar_ventas_lote(dia_id: int, ventas: List[Dict], comision_pct: float) -> Dict:
+    """
+    Registra un lote de ventas del día en una sola transacción
+    
+    Valida todas las filas antes de escribir; si alguna falla no se
+    registra ninguna. Las ventas se insertan con executemany y la bóveda
+    y el día se actualizan una vez por cripto con los totales agregados.
+    
+    Args:
+        dia_id: ID del día (debe estar abierto)
+        ventas: Dicts {'cripto', 'cantidad', 'precio'} (ver leer_archivo_ventas)
+        comision_pct: Comisión de la plataforma
+    
+    Returns:
+        dict: importadas, errores [(fila, mensaje)] y totales por símbolo
+    
+    Raises:
+        ValueError: Si el día no existe o no está abierto
+    """
+    resumen = {'importadas': 0, 'errores': [], 'por_cripto': {}}
+    
+    if not ventas:
+        return resumen
+    
+    with db.transaction() as conn:
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT ciclo_id, estado FROM dias WHERE id = ?", (dia_id,))
+        dia = cursor.fetchone()
+        
+        if not dia:
+            raise ValueError("Día no encontrado")
+        if dia['estado'] != 'abierto':
+            raise ValueError("El día no está abierto")
+        
+        ciclo_id = dia['ciclo_id']
+        
+        # Bóveda del ciclo y catálogo de criptos en una sola lectura
+        cursor.execute("""
+            SELECT c.id, c.simbolo, bc.cantidad, bc.precio_promedio
+            FROM criptomonedas c
+            JOIN boveda_ciclo bc ON bc.cripto_id = c.id
+            WHERE bc.ciclo_id = ?
+        """, (ciclo_id,))
+        boveda = {fila['id']: fila for fila in cursor.fetchall()}
+        por_simbolo = {fila['simbolo'].upper(): cid for cid, fila in boveda.items()}
+        
+        # Resolver cripto por símbolo o ID (None si no está en bóveda)
+        lote = []
+        for venta in ventas:
+            cripto = venta['cripto']
+            cripto_id = int(cripto) if cripto.isdigit() else por_simbolo.get(cripto.upper())
+            lote.append((cripto_id, venta['cantidad'], venta['precio']))
+        
+        errores = validar_ventas_lote(
+            lote, {cid: fila['cantidad'] for cid, fila in boveda.items()}
+        )
+        if errores:
+            resumen['errores'] = errores
+            return resumen
+        
+        calculadas = calc.calcular_ventas_lote(
+            [(cantidad, boveda[cripto_id]['precio_promedio'], precio)
+             for cripto_id, cantidad, precio in lote],
+            comision_pct
+        )
+        
+        errores = [(fila, "Error al calcular la venta")
+                   for fila, venta in enumerate(calculadas, 1) if not venta]
+        if errores:
+            resumen['errores'] = errores
+            return resumen
+        
+        # 1. Insertar todas las ventas
+        cursor.executemany("""
+            INSERT INTO ventas (
+                dia_id, cripto_id, cantidad, precio_unitario,
+                costo_total, monto_venta, comision, efectivo_recibido,
+                ganancia_bruta, ganancia_neta,
+                costo_total_micro, monto_venta_micro, comision_micro,
+                efectivo_recibido_micro, ganancia_bruta_micro, ganancia_neta_micro
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (dia_id, cripto_id, cantidad, precio,
+             v['costo_total'], v['monto_venta'], v['comision'],
+             v['efectivo_recibido'], v['ganancia_bruta'], v['ganancia_neta'],
+             *calc.montos_micro(v))
+            for (cripto_id, cantidad, precio), v in zip(lote, calculadas)
+        ])
+        
+        # Totales agregados por cripto (montos sumados en micro-unidades)
+        campos_dia = ('efectivo_recibido', 'comision', 'ganancia_bruta', 'ganancia_neta')
+        totales = {}
+        for (cripto_id, cantidad, _), v in zip(lote, calculadas):
+            t = totales.setdefault(cripto_id, dict.fromkeys(('ventas', 'cantidad') + campos_dia, 0))
+            t['ventas'] += 1
+            t['cantidad'] += cantidad
+            for campo in campos_dia:
+                t[campo] += calc.a_micro(v[campo])
+        
+        for cripto_id, t in totales.items():
+            for campo in campos_dia:
+                t[campo] = calc.desde_micro(t[campo])
+            
+            # 2. Bóveda: un descuento por cripto, con guarda de saldo
+            cursor.execute("""
+                UPDATE boveda_ciclo
+                SET cantidad = cantidad - ?
+                WHERE ciclo_id = ? AND cripto_id = ? AND cantidad >= ?
+            """, (t['cantidad'], ciclo_id, cripto_id, t['cantidad']))
+            
+            if cursor.rowcount != 1:
+                # Rollback automático de todo el lote por la transacción
+                raise ValueError("Error: cantidad en bóveda insuficiente")
+            
+            # 3. Totales del día
+            cursor.execute("""
+                UPDATE dias
+                SET efectivo_recibido = efectivo_recibido + ?,
+                    comisiones_pagadas = comisiones_pagadas + ?,
+                    ganancia_bruta = ganancia_bruta + ?,
+                    ganancia_neta = ganancia_neta + ?
+                WHERE id = ?
+            """, (
+                t['efectivo_recibido'],
+                t['comision'],
+                t['ganancia_bruta'],
+                t['ganancia_neta'],
+                dia_id
+            ))
+            
+            resumen['por_cripto'][boveda[cripto_id]['simbolo']] = t
+        
+        resumen['importadas'] = len(lote)
+    
+    # Log
+    log.info(
+        f"Importación de {resumen['importadas']} ventas en día #{dia_id}: " +
+        ", ".join(f"{simbolo} x{t['ventas']} (${t['efectivo_recibido']:.2f})"
+                  for simbolo, t in resumen['por_cripto'].items()),
+        categoria='operaciones'
+    )
+    
+    return resumen
+
+
 # ===================================================================
 # FUNCIONES DE GESTIÓN DE DÍAS
 # ===================================================================
@@ -238,11 +443,11 @@ def cerrar_dia_operacion(dia_id: int) -> bool:
             print("❌ Cierre cancelado")
             return False
     
-    # Calcular totales desde las ventas
-    efectivo_total = sum(v['efectivo_recibido'] for v in ventas) if ventas else 0
-    comisiones_total = sum(v['comision'] for v in ventas) if ventas else 0
-    ganancia_bruta_total = sum(v['ganancia_bruta'] for v in ventas) if ventas else 0
-    ganancia_neta_total = sum(v['ganancia_neta'] for v in ventas) if ventas else 0
+    # Calcular totales desde las ventas (suma exacta en micro-unidades)
+    efectivo_total = calc.sumar_montos([v['efectivo_recibido'] for v in ventas]) if ventas else 0
+    comisiones_total = calc.sumar_montos([v['comision'] for v in ventas]) if ventas else 0
+    ganancia_bruta_total = calc.sumar_montos([v['ganancia_bruta'] for v in ventas]) if ventas else 0
+    ganancia_neta_total = calc.sumar_montos([v['ganancia_neta'] for v in ventas]) if ventas else 0
     
     # Capital final
     capital_final = dia['capital_inicial'] + ganancia_neta_total
@@ -256,10 +461,10 @@ def cerrar_dia_operacion(dia_id: int) -> bool:
             ganancia_bruta = ?,
             ganancia_neta = ?,
             estado = 'cerrado',
-            fecha_cierre = ?
+            fecha_cierre = datetime('now')
         WHERE id = ?
     """, (capital_final, efectivo_total, comisiones_total,
-          ganancia_bruta_total, ganancia_neta_total, datetime.now(), dia_id))
+          ganancia_bruta_total, ganancia_neta_total, dia_id))
     
     # Actualizar ciclo
     with db.get_cursor(commit=True) as cursor:
@@ -729,7 +934,8 @@ def menu_operador_avanzado():
         print("[3] Ver historial de días")
         print("[4] Ver ventas de un día")
         print("[5] Aplicar interés compuesto")
-        print("[6] Volver")
+        print("[6] Importar ventas desde archivo (CSV/JSON)")
+        print("[7] Volver")
         print("="*60)
         
         opcion = input("\nSelecciona: ").strip()
@@ -745,6 +951,8 @@ def menu_operador_avanzado():
         elif opcion == "5":
             aplicar_interes_manual()
         elif opcion == "6":
+            importar_ventas_archivo()
+        elif opcion == "7":
             break
         else:
             print("❌ Opción inválida")
@@ -929,6 +1137,74 @@ def aplicar_interes_manual():
     input("\nPresiona Enter...")
 
 
+def importar_ventas_archivo():
+    """Importa las ventas del día abierto desde un archivo del exchange"""
+    
+    ciclo = queries.obtener_ciclo_activo()
+    if not ciclo:
+        print("\n❌ No hay ciclo activo")
+        input("\nPresiona Enter...")
+        return
+    
+    dia = queries.obtener_dia_abierto(ciclo['id'])
+    
+    if not dia:
+        print("\n⚠️  No hay día abierto")
+        input("\nPresiona Enter...")
+        return
+    
+    ruta = input("\nRuta del archivo (.csv / .json): ").strip().strip('"')
+    
+    try:
+        ventas = leer_archivo_ventas(ruta)
+    except (OSError, ValueError) as e:
+        print(f"❌ No se pudo leer el archivo: {e}")
+        input("\nPresiona Enter...")
+        return
+    
+    if not ventas:
+        print("\n⚠️  El archivo no contiene ventas")
+        input("\nPresiona Enter...")
+        return
+    
+    print(f"\n{len(ventas)} venta(s) leídas para el día #{dia['numero_dia']}")
+    confirmar = input("¿Importar? (s/n): ").lower()
+    
+    if confirmar != 's':
+        print("❌ Importación cancelada")
+        input("\nPresiona Enter...")
+        return
+    
+    try:
+        resumen = importar_ventas_lote(dia['id'], ventas, queries.obtener_comision())
+    except Exception as e:
+        print(f"❌ Error al importar: {e}")
+        log.error("Error al importar ventas", str(e))
+        input("\nPresiona Enter...")
+        return
+    
+    if resumen['errores']:
+        print(f"\n❌ {len(resumen['errores'])} fila(s) con errores, no se importó nada:")
+        for fila, mensaje in resumen['errores'][:20]:
+            print(f"   Fila {fila}: {mensaje}")
+        if len(resumen['errores']) > 20:
+            print(f"   ... y {len(resumen['errores']) - 20} más")
+        input("\nPresiona Enter...")
+        return
+    
+    print("\n" + "="*60)
+    print(f"✅ {resumen['importadas']} VENTA(S) IMPORTADAS")
+    print("="*60)
+    
+    for simbolo, t in resumen['por_cripto'].items():
+        print(f"\n{simbolo}: {t['ventas']} venta(s)")
+        print(f"  Cantidad: {t['cantidad']:.8f}")
+        print(f"  Efectivo recibido: ${t['efectivo_recibido']:.2f}")
+        print(f"  Ganancia neta: ${t['ganancia_neta']:.2f}")
+    
+    input("\nPresiona Enter...")
+
+
 # ===================================================================
 # EJECUCIÓN DIRECTA
 # ===================================================================